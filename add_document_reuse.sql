@@ -0,0 +1,11 @@
+-- Whole-document result reuse for existing databases (new databases get these from create_all)
+ALTER TABLE content_submissions ADD COLUMN IF NOT EXISTS violations JSONB;
+ALTER TABLE content_submissions ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64);
+ALTER TABLE content_submissions ADD COLUMN IF NOT EXISTS rule_set_version BIGINT;
+-- Matches rule_set_versions.version on databases that added the column as INTEGER
+ALTER TABLE content_submissions ALTER COLUMN rule_set_version TYPE BIGINT;
+ALTER TABLE content_submissions ADD COLUMN IF NOT EXISTS reviewer_model VARCHAR(100);
+ALTER TABLE content_submissions ADD COLUMN IF NOT EXISTS source_submission_id UUID
+    REFERENCES content_submissions (submission_id);
+
+CREATE INDEX IF NOT EXISTS ix_content_submissions_file_hash ON content_submissions (file_hash);
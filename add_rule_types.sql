@@ -0,0 +1,9 @@
+-- Executable rule types for existing databases (new databases get them from create_all)
+DO $$ BEGIN
+    CREATE TYPE ruletype AS ENUM ('SEMANTIC', 'FORBIDDEN_PHRASE', 'REQUIRED_PHRASE', 'REGEX', 'LENGTH_LIMIT');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END $$;
+
+ALTER TABLE rules ADD COLUMN IF NOT EXISTS rule_type ruletype NOT NULL DEFAULT 'SEMANTIC';
+ALTER TABLE rules ADD COLUMN IF NOT EXISTS rule_params JSONB;
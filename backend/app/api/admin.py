@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.content import ContentSubmission
 from app.schemas.content import ContentListResponse, ContentApprovalRequest
 from app.services.audit_service import AuditService
@@ -12,15 +13,17 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 
 @router.get("/content", response_model=List[ContentListResponse])
 async def list_content(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     limit: int = 50,
     offset: int = 0
 ):
     """List all content submissions"""
     try:
-        submissions = db.query(ContentSubmission).order_by(
-            ContentSubmission.created_at.desc()
-        ).offset(offset).limit(limit).all()
+        submissions = (await db.execute(
+            select(ContentSubmission).order_by(
+                ContentSubmission.created_at.desc()
+            ).offset(offset).limit(limit)
+        )).scalars().all()
         
         return submissions
     except Exception as e:
@@ -30,13 +33,11 @@ async def list_content(
 @router.get("/content/{submission_id}")
 async def get_content_detail(
     submission_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get detailed compliance report for content"""
     try:
-        submission = db.query(ContentSubmission).filter(
-            ContentSubmission.submission_id == submission_id
-        ).first()
+        submission = await db.get(ContentSubmission, submission_id)
         
         if not submission:
             raise HTTPException(status_code=404, detail="Submission not found")
@@ -63,13 +64,11 @@ async def get_content_detail(
 async def approve_content(
     submission_id: UUID,
     request: ContentApprovalRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Approve content (admin action)"""
     try:
-        submission = db.query(ContentSubmission).filter(
-            ContentSubmission.submission_id == submission_id
-        ).first()
+        submission = await db.get(ContentSubmission, submission_id)
         
         if not submission:
             raise HTTPException(status_code=404, detail="Submission not found")
@@ -78,10 +77,10 @@ async def approve_content(
         submission.approval_status = request.status
         submission.approved_by = request.admin_id
         
-        db.commit()
+        await db.commit()
         
         # Audit log
-        AuditService.log_action(
+        await AuditService.log_action(
             db,
             action_type=f"content_{request.status}",
             actor_id=request.admin_id,
@@ -101,7 +100,7 @@ async def approve_content(
 async def reject_content(
     submission_id: UUID,
     request: ContentApprovalRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Reject content (admin action)"""
     try:
@@ -1,52 +1,79 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from app.database import get_db
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.schemas.content import (
     ContentGenerateRequest,
     ContentGenerateResponse,
     DocumentCheckResponse,
     ContentRewriteRequest,
-    RuleTriggered
+    RuleTriggered,
+    ViolationDetail
 )
 from app.services.content_service import ContentService
 from app.services.compliance_service import ComplianceService
-from app.providers.gemini_provider import GeminiProvider
-from app.providers.groq_provider import GroqProvider
-from app.providers.pinecone_provider import PineconeProvider
+from app.providers.registry import provider_registry
 from app.core.config import settings
+from app.core.uploads import UploadTooLarge, spool_upload
+from contextlib import AsyncExitStack, aclosing
+from typing import Dict
 from uuid import UUID
+import json
 
 router = APIRouter(prefix="/agent", tags=["Agent"])
 
 
-def get_content_service(db: Session = Depends(get_db)) -> ContentService:
+def get_content_service(db: AsyncSession = Depends(get_async_db)) -> ContentService:
     """Dependency for content service"""
-    # Select LLM providers based on config
-    print(f"DEBUG: DEFAULT_LLM_PROVIDER={settings.DEFAULT_LLM_PROVIDER}")
-    if settings.DEFAULT_LLM_PROVIDER == "gemini":
-        generator = GeminiProvider()
-    else:
-        generator = GroqProvider()
-    
-    if settings.REVIEWER_LLM_PROVIDER == "gemini":
-        reviewer = GeminiProvider()
-    else:
-        reviewer = GroqProvider()
-    
-    vector_provider = PineconeProvider()
-    
+    # Shared provider instances built once per process
     return ContentService(
         db=db,
-        generator_llm=generator,
-        reviewer_llm=reviewer,
-        vector_provider=vector_provider
+        generator_llm=provider_registry.get_llm(settings.DEFAULT_LLM_PROVIDER),
+        reviewer_llm=provider_registry.get_llm(settings.REVIEWER_LLM_PROVIDER),
+        vector_provider=provider_registry.get_vector(),
+        rule_relevance=provider_registry.get_rule_relevance()
     )
 
 
-def get_compliance_service(db: Session = Depends(get_db)) -> ComplianceService:
+def get_compliance_service(db: AsyncSession = Depends(get_async_db)) -> ComplianceService:
     """Dependency for compliance service"""
-    llm_provider = GeminiProvider() if settings.DEFAULT_LLM_PROVIDER == "gemini" else GroqProvider()
-    return ComplianceService(db=db, llm_provider=llm_provider)
+    llm_provider = provider_registry.get_llm(settings.DEFAULT_LLM_PROVIDER)
+    return ComplianceService(
+        db=db,
+        llm_provider=llm_provider,
+        vector_provider=provider_registry.get_vector(),
+        rule_relevance=provider_registry.get_rule_relevance("cl100k_base"),
+        verdict_cache=provider_registry.get_verdict_cache(),
+        extraction_cache=provider_registry.get_extraction_cache(),
+        document_processor=provider_registry.get_document_processor()
+    )
+
+
+def _generate_response(result: Dict) -> ContentGenerateResponse:
+    """Format a generate_content result as the API response"""
+    submission = result["submission"]
+    
+    rules_triggered = [
+        RuleTriggered(
+            rule_id=str(r["rule_id"]),
+            rule_text=r["rule_text"],
+            category=r["category"],
+            severity=r["severity"],
+            status=r["status"],
+            matches=r.get("matches")
+        )
+        for r in result["rules_triggered"]
+    ]
+    
+    return ContentGenerateResponse(
+        submission_id=submission.submission_id,
+        final_content=submission.final_content,
+        compliance_status=submission.compliance_status,
+        rules_triggered=rules_triggered,
+        created_at=submission.created_at,
+        timings=result.get("timings")
+    )
 
 
 @router.post("/generate", response_model=ContentGenerateResponse)
@@ -62,31 +89,43 @@ async def generate_content(
             use_prompt_enhancer=request.use_prompt_enhancer
         )
         
-        submission = result["submission"]
-        
-        # Format response
-        rules_triggered = [
-            RuleTriggered(
-                rule_id=str(r["rule_id"]),
-                rule_text=r["rule_text"],
-                category=r["category"],
-                severity=r["severity"],
-                status=r["status"]
-            )
-            for r in result["rules_triggered"]
-        ]
-        
-        return ContentGenerateResponse(
-            submission_id=submission.submission_id,
-            final_content=submission.final_content,
-            compliance_status=submission.compliance_status,
-            rules_triggered=rules_triggered,
-            created_at=submission.created_at
-        )
+        return _generate_response(result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate/stream")
+async def generate_content_stream(
+    request: ContentGenerateRequest,
+    service: ContentService = Depends(get_content_service)
+):
+    """Generate compliant content from prompt, streaming tokens as NDJSON
+    
+    One JSON object per line: a `token` event per fragment of generated text,
+    then a `verdict` event whose `result` has the same shape as the /generate
+    response. Tokens have not been reviewed until the verdict arrives. Errors
+    after the stream has started arrive as an `error` event.
+    """
+    async def events():
+        try:
+            async for event in service.generate_content_stream(
+                prompt=request.prompt,
+                user_id=request.user_id,
+                use_prompt_enhancer=request.use_prompt_enhancer
+            ):
+                if event["type"] == "verdict":
+                    event = {"type": "verdict", "result": _generate_response(event["result"]).model_dump(mode="json")}
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/check-document", response_model=DocumentCheckResponse)
 async def check_document(
     user_id: str,
@@ -95,34 +134,102 @@ async def check_document(
 ):
     """Upload and check document for compliance"""
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Check compliance
-        result = await service.check_document_compliance(
-            file_content=file_content,
-            filename=file.filename,
-            user_id=UUID(user_id)
-        )
+        # Spool to a temp file (hashed on the way) instead of reading it into memory
+        async with spool_upload(
+            file,
+            max_bytes=settings.DOCUMENT_UPLOAD_MAX_MB * 1024 * 1024,
+            directory=settings.UPLOAD_SPOOL_DIR
+        ) as upload:
+            # Check compliance
+            result = await service.check_document_compliance(
+                source=upload.path,
+                filename=upload.filename,
+                user_id=UUID(user_id),
+                file_hash=upload.sha256
+            )
         
         return DocumentCheckResponse(**result)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _document_event_line(event: Dict) -> str:
+    """Serialize a document check event as one NDJSON line"""
+    payload = dict(event)
+    if event.get("violation") is not None:
+        payload["violation"] = ViolationDetail(**event["violation"]).model_dump(mode="json")
+    if event["type"] == "summary":
+        payload["result"] = DocumentCheckResponse(**event["result"]).model_dump(mode="json")
+    return json.dumps(payload) + "\n"
+
+
+@router.post("/check-document/stream")
+async def check_document_stream(
+    user_id: str,
+    file: UploadFile = File(...),
+    service: ComplianceService = Depends(get_compliance_service)
+):
+    """Upload and check document for compliance, streaming progress as NDJSON
+    
+    One JSON object per line: `started`, `document` (document-level
+    violations), one `chunk` event per chunk as soon as its review completes,
+    then `summary`, whose `result` has the same shape as the /check-document
+    response. Errors after the stream has started arrive as an `error` event.
+    """
+    uploads = AsyncExitStack()
+    try:
+        user_uuid = UUID(user_id)
+        # Spool before streaming so size errors are still plain HTTP errors
+        upload = await uploads.enter_async_context(spool_upload(
+            file,
+            max_bytes=settings.DOCUMENT_UPLOAD_MAX_MB * 1024 * 1024,
+            directory=settings.UPLOAD_SPOOL_DIR
+        ))
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def events():
+        checks = service.iter_document_compliance(
+            source=upload.path,
+            filename=upload.filename,
+            user_id=user_uuid,
+            file_hash=upload.sha256
+        )
+        try:
+            async with aclosing(checks):
+                async for event in checks:
+                    yield _document_event_line(event)
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+    
+    # The spooled file is removed once the response is done or the client
+    # disconnects; exit callbacks run last-in first-out, so the check is
+    # closed before its file is unlinked
+    stream = events()
+    uploads.push_async_callback(stream.aclose)
+    return StreamingResponse(
+        stream,
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(uploads.aclose)
+    )
+
+
 @router.post("/rewrite")
 async def rewrite_content(
     request: ContentRewriteRequest,
     service: ComplianceService = Depends(get_compliance_service),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Rewrite violating content to be compliant"""
     try:
         # Get submission
         from app.models.content import ContentSubmission
-        submission = db.query(ContentSubmission).filter(
-            ContentSubmission.submission_id == request.submission_id
-        ).first()
+        submission = await db.get(ContentSubmission, request.submission_id)
         
         if not submission:
             raise HTTPException(status_code=404, detail="Submission not found")
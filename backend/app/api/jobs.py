@@ -0,0 +1,207 @@
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db, AsyncSessionLocal
+from app.models.job import JobStatus, JobType
+from app.schemas.content import DocumentCheckResponse
+from app.schemas.job import JobResponse
+from app.schemas.rule import RuleResponse
+from app.services.job_service import JobService
+from app.services.job_worker import JobContext
+from app.api.agent import get_compliance_service
+from app.api.super_admin import get_rule_service
+from app.core.config import settings
+from app.core.uploads import UploadTooLarge, spool_upload
+from typing import Dict
+from uuid import UUID
+import os
+import uuid
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def get_job_service(db: AsyncSession = Depends(get_async_db)) -> JobService:
+    """Dependency for job service"""
+    return JobService(db)
+
+
+async def _submit_upload_job(
+    service: JobService,
+    job_type: JobType,
+    file: UploadFile,
+    max_bytes: int,
+    created_by: UUID
+) -> JobResponse:
+    """Store the upload where every worker can read it and queue a job for it"""
+    job_id = uuid.uuid4()
+    try:
+        async with spool_upload(file, max_bytes=max_bytes, directory=settings.JOB_STORAGE_DIR) as upload:
+            # Keep the spooled file past the request (a missing file is fine for spool_upload's cleanup)
+            path = os.path.join(settings.JOB_STORAGE_DIR, f"{job_id}{os.path.splitext(upload.path)[1]}")
+            os.replace(upload.path, path)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    try:
+        job = await service.submit(
+            job_type,
+            payload={"path": path, "filename": upload.filename, "file_hash": upload.sha256},
+            created_by=created_by,
+            job_id=job_id
+        )
+    except Exception:
+        os.unlink(path)
+        raise
+    return JobResponse.model_validate(job)
+
+
+@router.post("/check-document", response_model=JobResponse, status_code=202)
+async def submit_document_check(
+    user_id: str,
+    file: UploadFile = File(...),
+    service: JobService = Depends(get_job_service)
+):
+    """Queue a document compliance check; the result matches the /agent/check-document response"""
+    try:
+        return await _submit_upload_job(
+            service,
+            JobType.DOCUMENT_CHECK,
+            file,
+            max_bytes=settings.DOCUMENT_UPLOAD_MAX_MB * 1024 * 1024,
+            created_by=UUID(user_id)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rules/extract", response_model=JobResponse, status_code=202)
+async def submit_rule_extraction(
+    created_by: str,
+    file: UploadFile = File(...),
+    service: JobService = Depends(get_job_service)
+):
+    """Queue rule extraction from a PDF; the result matches the /super-admin/rules/extract response"""
+    try:
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail="Only PDF files are supported")
+
+        return await _submit_upload_job(
+            service,
+            JobType.RULE_EXTRACTION,
+            file,
+            max_bytes=settings.RULE_PDF_UPLOAD_MAX_MB * 1024 * 1024,
+            created_by=UUID(created_by)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: UUID,
+    service: JobService = Depends(get_job_service)
+):
+    """Job status and progress"""
+    job = await service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(
+    job_id: UUID,
+    service: JobService = Depends(get_job_service)
+):
+    """Result of a completed job (409 while it is still queued or running, or if it failed)"""
+    job = await service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JobStatus.COMPLETED:
+        detail = f"Job is {job.status.value}"
+        if job.error:
+            detail += f": {job.error}"
+        raise HTTPException(status_code=409, detail=detail)
+    return job.result
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(
+    job_id: UUID,
+    service: JobService = Depends(get_job_service)
+):
+    """Cancel a queued job, or stop a running one at its next heartbeat"""
+    job = await service.request_cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+# Job handlers, run by the worker pool (app.services.job_worker) outside any request.
+# Each returns the JSON result stored on the job.
+
+async def run_document_check(ctx: JobContext) -> Dict:
+    """Document check that resumes from the chunks an interrupted attempt finished"""
+    async with AsyncSessionLocal() as db:
+        service = get_compliance_service(db)
+        progress = None
+        async for event in service.iter_document_compliance(
+            source=ctx.payload["path"],
+            filename=ctx.payload["filename"],
+            user_id=ctx.created_by,
+            file_hash=ctx.payload.get("file_hash"),
+            resume=ctx.progress
+        ):
+            if event["type"] == "started":
+                # Start from the saved chunks while they are valid (same rule set), so this checkpoint
+                # never drops work before the resumed chunks have been reported again
+                saved = ctx.progress or {}
+                if saved.get("rule_set_version") == event["rule_set_version"]:
+                    progress = {
+                        "rule_set_version": event["rule_set_version"],
+                        "chunks": dict(saved.get("chunks") or {}),
+                        "fallback_chunks": list(saved.get("fallback_chunks") or [])
+                    }
+                else:
+                    progress = {"rule_set_version": event["rule_set_version"], "chunks": {}, "fallback_chunks": []}
+                await ctx.checkpoint(progress, len(progress["chunks"]), event["total_chunks"], force=True)
+            elif event["type"] == "chunk":
+                progress["chunks"][str(event["chunk_index"])] = event["violation"]
+                if event["fallback"] and event["chunk_index"] not in progress["fallback_chunks"]:
+                    progress["fallback_chunks"].append(event["chunk_index"])
+                await ctx.checkpoint(progress, event["completed"], event["total_chunks"])
+            elif event["type"] == "summary":
+                return DocumentCheckResponse(**event["result"]).model_dump(mode="json")
+
+
+async def run_rule_extraction(ctx: JobContext) -> Dict:
+    """Rule extraction that neither repeats the LLM call nor inserts a rule twice when resumed"""
+    async with AsyncSessionLocal() as db:
+        service = get_rule_service(db)
+        progress = dict(ctx.progress or {})
+        async for event in service.iter_rule_extraction(
+            pdf_source=ctx.payload["path"],
+            created_by=ctx.created_by,
+            resume=ctx.progress
+        ):
+            if event["type"] == "extracted":
+                progress = {"candidates": event["candidates"], "created": dict(progress.get("created") or {})}
+                await ctx.checkpoint(progress, len(progress["created"]), len(event["candidates"]), force=True)
+            elif event["type"] == "rule":
+                progress["created"][str(event["index"])] = event["rule_id"]
+                await ctx.checkpoint(progress, len(progress["created"]), len(progress["candidates"]), force=True)
+            elif event["type"] == "summary":
+                rules = event["rules"]
+                return {
+                    "message": f"Extracted {len(rules)} rules",
+                    "rules": [RuleResponse.model_validate(r).model_dump(mode="json") for r in rules]
+                }
+
+
+JOB_HANDLERS = {
+    JobType.DOCUMENT_CHECK: run_document_check,
+    JobType.RULE_EXTRACTION: run_rule_extraction,
+}
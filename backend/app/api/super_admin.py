@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.schemas.rule import (
     RuleCreate,
     RuleUpdate,
@@ -11,10 +12,9 @@ from app.schemas.rule import (
 )
 from app.services.rule_service import RuleService
 from app.services.duplicate_detector import DuplicateDetector
-from app.providers.gemini_provider import GeminiProvider
-from app.providers.groq_provider import GroqProvider
-from app.providers.pinecone_provider import PineconeProvider
+from app.providers.registry import provider_registry
 from app.core.config import settings
+from app.core.uploads import UploadTooLarge, spool_upload
 from typing import List
 from app.models.user import User, UserRole
 from uuid import UUID
@@ -22,17 +22,22 @@ from uuid import UUID
 router = APIRouter(prefix="/super-admin", tags=["Super Admin"])
 
 
-def get_rule_service(db: Session = Depends(get_db)) -> RuleService:
+def get_rule_service(db: AsyncSession = Depends(get_async_db)) -> RuleService:
     """Dependency for rule service"""
-    llm_provider = GeminiProvider() if settings.DEFAULT_LLM_PROVIDER == "gemini" else GroqProvider()
-    vector_provider = PineconeProvider()
-    return RuleService(db=db, llm_provider=llm_provider, vector_provider=vector_provider)
+    llm_provider = provider_registry.get_llm(settings.DEFAULT_LLM_PROVIDER)
+    vector_provider = provider_registry.get_vector()
+    return RuleService(
+        db=db,
+        llm_provider=llm_provider,
+        vector_provider=vector_provider,
+        document_processor=provider_registry.get_document_processor()
+    )
 
 
-def get_duplicate_detector(db: Session = Depends(get_db)) -> DuplicateDetector:
+def get_duplicate_detector(db: AsyncSession = Depends(get_async_db)) -> DuplicateDetector:
     """Dependency for duplicate detector"""
-    llm_provider = GeminiProvider() if settings.DEFAULT_LLM_PROVIDER == "gemini" else GroqProvider()
-    vector_provider = PineconeProvider()
+    llm_provider = provider_registry.get_llm(settings.DEFAULT_LLM_PROVIDER)
+    vector_provider = provider_registry.get_vector()
     return DuplicateDetector(db=db, llm_provider=llm_provider, vector_provider=vector_provider)
 
 
@@ -48,7 +53,9 @@ async def create_rule(
             rule_text=rule.rule_text,
             category=rule.category,
             severity=rule.severity,
-            created_by=UUID(created_by)
+            created_by=UUID(created_by),
+            rule_type=rule.rule_type,
+            rule_params=rule.rule_params
         )
         return created_rule
     except Exception as e:
@@ -66,14 +73,17 @@ async def extract_rules_from_pdf(
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Extract rules
-        extracted_rules = await service.extract_rules_from_pdf(
-            pdf_content=file_content,
-            created_by=UUID(created_by)
-        )
+        # Spool to a temp file instead of reading it into memory
+        async with spool_upload(
+            file,
+            max_bytes=settings.RULE_PDF_UPLOAD_MAX_MB * 1024 * 1024,
+            directory=settings.UPLOAD_SPOOL_DIR
+        ) as upload:
+            # Extract rules
+            extracted_rules = await service.extract_rules_from_pdf(
+                pdf_source=upload.path,
+                created_by=UUID(created_by)
+            )
         
         return {
             "message": f"Extracted {len(extracted_rules)} rules",
@@ -81,24 +91,26 @@ async def extract_rules_from_pdf(
         }
     except HTTPException:
         raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/rules", response_model=List[RuleResponse])
 async def list_rules(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     include_inactive: bool = False
 ):
     """List all rules with versions"""
     try:
         from app.models.rule import Rule
         
-        query = db.query(Rule)
+        query = select(Rule)
         if not include_inactive:
-            query = query.filter(Rule.is_active == True)
+            query = query.where(Rule.is_active == True)
         
-        rules = query.order_by(Rule.created_at.desc()).all()
+        rules = (await db.execute(query.order_by(Rule.created_at.desc()))).scalars().all()
         return rules
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -118,7 +130,9 @@ async def update_rule(
             updated_by=UUID(updated_by),
             rule_text=rule_update.rule_text,
             category=rule_update.category,
-            severity=rule_update.severity
+            severity=rule_update.severity,
+            rule_type=rule_update.rule_type,
+            rule_params=rule_update.rule_params
         )
         return updated_rule
     except ValueError as e:
@@ -135,7 +149,7 @@ async def activate_rule(
 ):
     """Activate a rule"""
     try:
-        rule = service.activate_rule(rule_id, UUID(actor_id))
+        rule = await service.activate_rule(rule_id, UUID(actor_id))
         return {"message": "Rule activated", "rule": RuleResponse.model_validate(rule)}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -151,7 +165,7 @@ async def deactivate_rule(
 ):
     """Deactivate a rule"""
     try:
-        rule = service.deactivate_rule(rule_id, UUID(actor_id))
+        rule = await service.deactivate_rule(rule_id, UUID(actor_id))
         return {"message": "Rule deactivated", "rule": RuleResponse.model_validate(rule)}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -187,9 +201,11 @@ async def check_duplicate(
 
 
 @router.get("/debug/user")
-async def get_debug_user(db: Session = Depends(get_db)):
+async def get_debug_user(db: AsyncSession = Depends(get_async_db)):
     """Get the first super admin user for testing"""
-    user = db.query(User).filter(User.role == UserRole.SUPER_ADMIN).first()
+    user = (await db.execute(
+        select(User).where(User.role == UserRole.SUPER_ADMIN).limit(1)
+    )).scalars().first()
     if not user:
         raise HTTPException(status_code=404, detail="No super admin found")
     return {"user_id": str(user.user_id)}
@@ -199,9 +215,14 @@ async def get_debug_user(db: Session = Depends(get_db)):
 async def test_embedding():
     """Test embedding generation"""
     try:
-        from app.providers.gemini_provider import GeminiProvider
-        provider = GeminiProvider()
+        provider = provider_registry.get_embedding()
         vec = await provider.create_embedding("Test embedding for compliance POC")
         return {"dim": len(vec), "sample": vec[:5]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/debug/cache-stats")
+async def get_cache_stats():
+    """Cache hit/miss counters for this worker"""
+    return provider_registry.cache_stats()
@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class TieredCache:
+    """Two-tier key/value cache: in-memory LRU in front of a SQLite table
+
+    The SQLite tier survives restarts and is shared by all workers on the host
+    (WAL mode). Values must be JSON-serializable. When the disk tier grows past
+    `max_disk_entries`, the least recently used entries are evicted; entries
+    older than `ttl_seconds` are treated as misses.
+    """
+
+    # Evict at most once per this many writes to keep inserts cheap
+    EVICTION_INTERVAL = 100
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        memory_size: int = 1024,
+        max_disk_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.path = path
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._writes_since_eviction = 0
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the SQLite tier on first use"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.name} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{self.name}_accessed ON {self.name} (accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, value: Any):
+        """Insert into the memory tier, evicting the LRU entry if full"""
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a value, or None on miss"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get all cached values for `keys` (missing keys are omitted)"""
+        found = {}
+        with self._lock:
+            pending = []
+            for key in dict.fromkeys(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                    self.memory_hits += 1
+                else:
+                    pending.append(key)
+
+            if pending:
+                try:
+                    found_on_disk = self._read_disk(pending)
+                except sqlite3.Error as e:
+                    print(f"⚠️ {self.name} cache read failed: {str(e)}")
+                    found_on_disk = {}
+
+                for key, value in found_on_disk.items():
+                    self._remember(key, value)
+                    found[key] = value
+                self.disk_hits += len(found_on_disk)
+                self.misses += len(pending) - len(found_on_disk)
+
+        return found
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, Any]:
+        conn = self._connection()
+        now = time.time()
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, value, created_at FROM {self.name} WHERE key IN ({placeholders})",
+                batch
+            ).fetchall()
+            for key, value, created_at in rows:
+                if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                    continue
+                found[key] = json.loads(value)
+
+        if found:
+            conn.executemany(
+                f"UPDATE {self.name} SET accessed_at = ? WHERE key = ?",
+                [(now, key) for key in found]
+            )
+            conn.commit()
+        return found
+
+    def set(self, key: str, value: Any):
+        """Store a value in both tiers"""
+        self.set_many({key: value})
+
+    def set_many(self, items: Dict[str, Any]):
+        """Store several values in both tiers"""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
+            try:
+                conn = self._connection()
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {self.name} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    [(key, json.dumps(value), now, now) for key, value in items.items()]
+                )
+                conn.commit()
+
+                self._writes_since_eviction += len(items)
+                if self.max_disk_entries and self._writes_since_eviction >= self.EVICTION_INTERVAL:
+                    self._evict(conn)
+                    self._writes_since_eviction = 0
+            except sqlite3.Error as e:
+                print(f"⚠️ {self.name} cache write failed: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop expired entries, then least recently used ones beyond the size limit"""
+        if self.ttl_seconds is not None:
+            conn.execute(f"DELETE FROM {self.name} WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        count = conn.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+        excess = count - self.max_disk_entries
+        if excess > 0:
+            conn.execute(
+                f"DELETE FROM {self.name} WHERE key IN "
+                f"(SELECT key FROM {self.name} ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+        conn.commit()
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        """Close the SQLite connection (the cache reopens it on next use)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
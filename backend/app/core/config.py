@@ -22,6 +22,22 @@ class Settings(BaseSettings):
     EMBEDDING_MODEL: str = "llama-text-embed-v2"
     EMBEDDING_DIMENSIONS: int = 1024
     EMBEDDING_METRIC: str = "cosine"
+    EMBEDDING_PROVIDER: str = "gemini"  # Embedding backend composed with every LLM provider
+    EMBEDDING_MAX_CONCURRENCY: int = 8  # Concurrent embedding requests per worker
+    EMBEDDING_BATCH_SIZE: int = 100  # Texts per batch embedding request (Gemini max is 100)
+    
+    # Embedding Cache (in-memory LRU + SQLite on disk)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = ".cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_MEMORY_SIZE: int = 2048
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 100000
+    
+    # Provider transport: "http" (native async, pooled aiohttp) or "sdk" (vendor SDKs in a thread pool)
+    PROVIDER_TRANSPORT: str = "http"
+    HTTP_MAX_CONNECTIONS: int = 200
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 100
+    HTTP_KEEPALIVE_TIMEOUT: float = 60.0
+    HTTP_TIMEOUT: float = 120.0
     
     # LLM Selection
     DEFAULT_LLM_PROVIDER: str = "groq"  # gemini or groq
@@ -30,6 +46,58 @@ class Settings(BaseSettings):
     # Duplicate Detection
     SEMANTIC_SIMILARITY_THRESHOLD: float = 0.95
     
+    # Active Rule Cache
+    RULE_CACHE_VERSION_CHECK_INTERVAL: float = 2.0  # Seconds between rule-set version checks
+    RULE_SET_SNAPSHOT_PATH: str = ".cache/rule_set_snapshot.json"  # Compiled rules shared with new workers
+    
+    # Rule Relevance (which rules are sent with each prompt or chunk)
+    RULE_RELEVANCE_SOURCE: str = "local"  # local (cached rule vectors), pinecone or none
+    RULE_PROMPT_TOKEN_BUDGET: int = 1500  # Rule tokens per prompt; HIGH-severity rules are always included
+    RULE_RELEVANCE_TOP_K: int = 50  # Candidate rules per Pinecone query
+    
+    # Document Compliance Review
+    COMPLIANCE_CHUNK_CONCURRENCY: int = 8  # Max chunks reviewed by the LLM at once
+    COMPLIANCE_CHUNK_TIMEOUT: float = 60.0  # Seconds per review attempt
+    COMPLIANCE_CHUNK_MAX_RETRIES: int = 2
+    COMPLIANCE_CHUNK_RETRY_BACKOFF: float = 1.0  # Base delay in seconds, doubled per retry
+    COMPLIANCE_BATCH_REVIEW: bool = True  # Review several chunks per LLM call
+    COMPLIANCE_BATCH_TOKEN_BUDGET: int = 6000  # Chunk + rule tokens per batched review prompt
+    COMPLIANCE_BATCH_MAX_CHUNKS: int = 8
+    
+    # Chunk Verdict Cache (LLM review results per chunk, in-memory LRU + SQLite on disk)
+    VERDICT_CACHE_ENABLED: bool = True
+    VERDICT_CACHE_PATH: str = ".cache/verdicts.sqlite3"
+    VERDICT_CACHE_MEMORY_SIZE: int = 4096
+    VERDICT_CACHE_MAX_ENTRIES: int = 200000
+    VERDICT_CACHE_TTL_SECONDS: float = 30 * 24 * 3600.0
+    
+    # Document Reuse (uploads fingerprinted by SHA-256)
+    DOCUMENT_REUSE_ENABLED: bool = True  # Return the earlier result for an identical file and rule-set version
+    EXTRACTION_CACHE_ENABLED: bool = True  # Cache extracted document text by file hash
+    EXTRACTION_CACHE_PATH: str = ".cache/extractions.sqlite3"
+    EXTRACTION_CACHE_MEMORY_SIZE: int = 32  # Extracted documents can be large; keep few in memory
+    EXTRACTION_CACHE_MAX_ENTRIES: int = 5000
+    
+    # Document Processing Pool (PDF/DOCX extraction and tokenization)
+    DOCUMENT_PROCESS_WORKERS: int = 2  # Worker processes; 0 runs extraction in a thread instead
+    DOCUMENT_PROCESS_MEMORY_LIMIT_MB: int = 1024  # Address-space limit per worker; 0 disables
+    DOCUMENT_PROCESS_MAX_TASKS_PER_CHILD: int = 100  # Recycle workers after this many tasks; 0 never
+    DOCUMENT_PDF_PAGES_PER_TASK: int = 20  # Larger PDFs are split across workers in page ranges
+    
+    # Uploads (spooled to temp files, never read into memory whole)
+    DOCUMENT_UPLOAD_MAX_MB: int = 50  # /agent/check-document
+    RULE_PDF_UPLOAD_MAX_MB: int = 50  # /super-admin/rules/extract
+    UPLOAD_SPOOL_DIR: str = ""  # Temp directory for spooled uploads; empty uses the system default
+    
+    # Background Jobs (document checks and rule extraction outside the HTTP request)
+    JOB_WORKERS: int = 2  # Jobs run at once per process, independent of HTTP concurrency; 0 runs none here
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0  # Idle workers check for new jobs this often
+    JOB_LEASE_SECONDS: float = 120.0  # A job whose worker stops heartbeating is taken over after this
+    JOB_HEARTBEAT_SECONDS: float = 15.0  # Lease renewal and cancellation check interval
+    JOB_MAX_ATTEMPTS: int = 3  # Give up on a job after its worker was lost this many times
+    JOB_CHECKPOINT_INTERVAL_SECONDS: float = 1.0  # Minimum time between progress writes
+    JOB_STORAGE_DIR: str = ".cache/jobs"  # Uploads kept until their job finishes; must be shared by all workers
+    
     # Application
     APP_NAME: str = "Compliance AI POC"
     DEBUG: bool = False
@@ -0,0 +1,303 @@
+from contextlib import aclosing, contextmanager
+from functools import wraps
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+import asyncio
+import inspect
+import math
+import threading
+import time
+
+T = TypeVar("T")
+
+# Default latency buckets in seconds: LLM calls take seconds, local stages milliseconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# (metric name, type, help, [(sample name suffix, labels, value)])
+MetricFamily = Tuple[str, str, str, List[Tuple[str, Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def collect(self) -> MetricFamily:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            samples = [("_total", self._labels(key), value) for key, value in self._values.items()]
+        return self.name, self.type_name, self.documentation, samples
+
+
+class Histogram(_Metric):
+    """Observations bucketed per label set (cumulative buckets, sum and count)"""
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the duration of the block in seconds (also when it raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> MetricFamily:
+        samples = []
+        with self._lock:
+            for key, (counts, total) in self._values.items():
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, count in zip(self.buckets, counts):
+                    cumulative += count
+                    samples.append(("_bucket", dict(labels, le=_format_value(bound)), cumulative))
+                samples.append(("_sum", labels, total[0]))
+                samples.append(("_count", labels, cumulative))
+        return self.name, self.type_name, self.documentation, samples
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format
+
+    Counters and histograms are updated as work happens; collectors are
+    called at scrape time for values that already live elsewhere (e.g. cache
+    hit counters). Each worker process has its own registry, so scrape every
+    worker (or run one) to see all traffic.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        families = [metric.collect() for metric in list(self._metrics.values())]
+        for collector in list(self._collectors):
+            try:
+                families.extend(collector())
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {str(e)}")
+
+        lines = []
+        for name, type_name, documentation, samples in families:
+            # Counter samples carry the _total suffix, and so must their HELP/TYPE lines
+            header = f"{name}_total" if type_name == "counter" else name
+            lines.append(f"# HELP {header} {_escape(documentation)}")
+            lines.append(f"# TYPE {header} {type_name}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                             else f"{name}{suffix} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_DURATION = metrics.histogram(
+    "compliance_stage_duration_seconds",
+    "Duration of each pipeline stage",
+    ["pipeline", "stage"]
+)
+PROVIDER_REQUESTS = metrics.counter(
+    "compliance_provider_requests",
+    "Calls to LLM and embedding providers",
+    ["provider", "model", "operation", "outcome"]
+)
+PROVIDER_DURATION = metrics.histogram(
+    "compliance_provider_request_duration_seconds",
+    "Latency of LLM and embedding provider calls",
+    ["provider", "model", "operation"]
+)
+PROVIDER_TOKENS = metrics.counter(
+    "compliance_provider_tokens",
+    "Tokens reported by LLM providers",
+    ["provider", "model", "kind"]
+)
+
+
+def stage_timer(pipeline: str, stage: str):
+    """Context manager observing one pipeline stage's duration"""
+    return STAGE_DURATION.time(pipeline=pipeline, stage=stage)
+
+
+async def timed_iteration(iterator: AsyncIterator[T], pipeline: str, stage: str) -> AsyncIterator[T]:
+    """Yield from an async iterator, observing the time spent waiting on it as one stage
+
+    Time the consumer spends between items (e.g. writing a streamed
+    response) is not counted.
+    """
+    waited = 0.0
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+            finally:
+                waited += time.perf_counter() - started
+            yield item
+    finally:
+        STAGE_DURATION.observe(waited, pipeline=pipeline, stage=stage)
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
+
+
+def _model_label(provider, operation: str) -> str:
+    model = getattr(provider, "embedding_model" if operation.startswith("embed") else "model", "")
+    if not isinstance(model, str):
+        # SDK model objects (e.g. GenerativeModel) carry their name
+        model = getattr(model, "model_name", type(model).__name__)
+    # Gemini SDK names are prefixed with "models/", REST URLs and embedding settings may be too
+    return model[len("models/"):] if model.startswith("models/") else model
+
+
+def _record_call(provider_name: str, model: str, operation: str, started: float, outcome: str, result=None):
+    PROVIDER_DURATION.observe(time.perf_counter() - started, provider=provider_name, model=model, operation=operation)
+    PROVIDER_REQUESTS.inc(provider=provider_name, model=model, operation=operation, outcome=outcome)
+    usage = result.get("usage") if isinstance(result, dict) else None
+    if usage:
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage.get(kind):
+                PROVIDER_TOKENS.inc(usage[kind], provider=provider_name, model=model, kind=kind.split("_")[0])
+
+
+def instrument_provider_call(provider_name: str, operation: str):
+    """Decorate a provider method to record its calls, latency and token usage
+
+    Works on coroutine methods (token usage is read from the returned
+    `usage`) and on async generator methods, which are timed until the
+    stream ends. A stream the consumer stops early (client disconnect) is
+    recorded as `aborted`, not as an error, and closed right away.
+    """
+    def decorator(fn):
+        if inspect.isasyncgenfunction(fn):
+            @wraps(fn)
+            async def stream_wrapper(self, *args, **kwargs):
+                started = time.perf_counter()
+                outcome = "error"
+                stream = fn(self, *args, **kwargs)
+                try:
+                    async with aclosing(stream):
+                        async for item in stream:
+                            yield item
+                    outcome = "success"
+                except (GeneratorExit, asyncio.CancelledError):
+                    outcome = "aborted"
+                    raise
+                finally:
+                    _record_call(provider_name, _model_label(self, operation), operation, started, outcome)
+            return stream_wrapper
+
+        @wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await fn(self, *args, **kwargs)
+            except BaseException:
+                _record_call(provider_name, _model_label(self, operation), operation, started, "error")
+                raise
+            _record_call(provider_name, _model_label(self, operation), operation, started, "success", result)
+            return result
+        return wrapper
+    return decorator
+
+
+def cache_metric_families(stats: Dict[str, Optional[Dict]]) -> List[MetricFamily]:
+    """Metric families for TieredCache.stats() results keyed by cache name"""
+    lookups, hit_ratio, entries = [], [], []
+    for cache, values in stats.items():
+        if not values:
+            continue
+        for result, key in (("memory_hit", "memory_hits"), ("disk_hit", "disk_hits"), ("miss", "misses")):
+            lookups.append(("_total", {"cache": cache, "result": result}, values[key]))
+        hit_ratio.append(("", {"cache": cache}, values["hit_rate"]))
+        entries.append(("", {"cache": cache}, values["memory_entries"]))
+    return [
+        ("compliance_cache_lookups", "counter", "Cache lookups by outcome", lookups),
+        ("compliance_cache_hit_ratio", "gauge", "Share of cache lookups served from memory or disk", hit_ratio),
+        ("compliance_cache_memory_entries", "gauge", "Entries in the in-memory cache tier", entries),
+    ]
@@ -0,0 +1,76 @@
+from app.models.rule import RuleType
+from typing import Any, Dict, List, Optional, Pattern
+import re
+
+
+def _phrases(params: Dict) -> List[str]:
+    phrases = params.get("phrases")
+    if not isinstance(phrases, list) or not phrases:
+        raise ValueError("'phrases' must be a non-empty list of strings")
+    cleaned = [p.strip() for p in phrases if isinstance(p, str) and p.strip()]
+    if len(cleaned) != len(phrases):
+        raise ValueError("'phrases' must contain only non-empty strings")
+    return cleaned
+
+
+def compile_pattern(pattern: Any, ignore_case: bool = True) -> Pattern:
+    """Compile a rule's regular expression, raising ValueError if it is invalid"""
+    if not isinstance(pattern, str) or not pattern:
+        raise ValueError("Pattern must be a non-empty string")
+    try:
+        return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        raise ValueError(f"Invalid regular expression {pattern!r}: {str(e)}")
+
+
+def validate_rule_params(rule_type: RuleType, params: Optional[Dict]) -> Optional[Dict]:
+    """Validate and normalize `rule_params` for a rule type
+
+    Raises ValueError describing the first problem found. Expected params:
+    - SEMANTIC: none
+    - FORBIDDEN_PHRASE: {"phrases": [...]}
+    - REQUIRED_PHRASE: {"phrases": [...], "match": "all" | "any"}
+    - REGEX: {"pattern": "...", "ignore_case": true}
+    - LENGTH_LIMIT: {"max_chars": 160, "min_chars": 0, "target_pattern": "..."}
+      where the optional target pattern's first group selects the measured
+      text (e.g. a meta description line); without it the whole text is measured
+    """
+    if rule_type == RuleType.SEMANTIC:
+        if params:
+            raise ValueError("Semantic rules do not take rule_params")
+        return None
+
+    if not isinstance(params, dict):
+        raise ValueError(f"{rule_type.value} rules require rule_params")
+
+    if rule_type == RuleType.FORBIDDEN_PHRASE:
+        return {"phrases": _phrases(params)}
+
+    if rule_type == RuleType.REQUIRED_PHRASE:
+        match = params.get("match", "all")
+        if match not in ("all", "any"):
+            raise ValueError("'match' must be 'all' or 'any'")
+        return {"phrases": _phrases(params), "match": match}
+
+    if rule_type == RuleType.REGEX:
+        ignore_case = bool(params.get("ignore_case", True))
+        compile_pattern(params.get("pattern"), ignore_case)
+        return {"pattern": params["pattern"], "ignore_case": ignore_case}
+
+    if rule_type == RuleType.LENGTH_LIMIT:
+        normalized = {}
+        for key in ("max_chars", "min_chars"):
+            value = params.get(key)
+            if value is not None:
+                if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                    raise ValueError(f"'{key}' must be a non-negative integer")
+                normalized[key] = value
+        if not normalized:
+            raise ValueError("Length limits need 'max_chars' and/or 'min_chars'")
+        if params.get("target_pattern"):
+            if compile_pattern(params["target_pattern"]).groups < 1:
+                raise ValueError("'target_pattern' must have a capture group selecting the measured text")
+            normalized["target_pattern"] = params["target_pattern"]
+        return normalized
+
+    raise ValueError(f"Unsupported rule type: {rule_type}")
@@ -0,0 +1,126 @@
+from fastapi import UploadFile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+
+# Multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+SPOOL_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds its size limit"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File too large (limit is {max_bytes // (1024 * 1024)} MB)")
+        self.max_bytes = max_bytes
+
+
+@dataclass(frozen=True)
+class SpooledUpload:
+    """An uploaded file spooled to a named temp file, fingerprinted while it was written
+
+    The path can be handed to document processing workers, which open the
+    file themselves instead of receiving a pickled copy of its bytes.
+    """
+    path: str
+    filename: str
+    size: int
+    sha256: str
+
+
+def _write_block(handle, block: bytes):
+    handle.write(block)
+
+
+@asynccontextmanager
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int,
+    directory: Optional[str] = None
+) -> AsyncIterator[SpooledUpload]:
+    """Copy an upload to a named temp file in fixed-size blocks, hashing and size-checking as it goes
+
+    Memory use is one block regardless of file size. Starlette's multipart
+    parser has already received the whole body and spooled the file (in
+    memory up to 1 MB, then to an anonymous temp file) before the endpoint
+    runs, so this is a second disk copy: the price of a named file that
+    document workers can open by path, hashed in the same pass. For the same
+    reason, UploadTooLarge is raised only after the body was received; early
+    rejection comes from UploadSizeLimitMiddleware when a Content-Length is
+    sent. The temp file is deleted on exit.
+    """
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    suffix = os.path.splitext(file.filename or "")[1].lower()
+    handle = tempfile.NamedTemporaryFile(prefix="upload-", suffix=suffix, dir=directory or None, delete=False)
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with handle:
+            while True:
+                block = await file.read(SPOOL_BLOCK_SIZE)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(block)
+                await asyncio.to_thread(_write_block, handle, block)
+
+        yield SpooledUpload(path=handle.name, filename=file.filename, size=size, sha256=digest.hexdigest())
+    finally:
+        try:
+            os.unlink(handle.name)
+        except FileNotFoundError:
+            pass
+
+
+class UploadSizeLimitMiddleware:
+    """Rejects oversized uploads with 413 from their Content-Length header
+
+    Runs before the multipart body is read, so an oversized request is
+    refused without being received. Limits apply to a path and everything
+    below it. Uploads without a Content-Length (chunked) are received in full
+    and then rejected by `spool_upload`. Register it before CORSMiddleware so
+    that the 413 passes through CORS and the browser can read it.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    def _limit_for(self, path: str):
+        for prefix, max_bytes in self.limits.items():
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return max_bytes
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("method") == "POST":
+            max_bytes = self._limit_for(scope["path"])
+            if max_bytes is not None:
+                headers = dict(scope.get("headers") or [])
+                content_length = headers.get(b"content-length")
+                if content_length and content_length.isdigit() and (
+                    int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES
+                ):
+                    body = json.dumps({"detail": str(UploadTooLarge(max_bytes))}).encode("utf-8")
+                    await send({
+                        "type": "http.response.start",
+                        "status": 413,
+                        "headers": [
+                            (b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode("ascii")),
+                            (b"connection", b"close"),
+                        ],
+                    })
+                    await send({"type": "http.response.body", "body": body})
+                    return
+        await self.app(scope, receive, send)
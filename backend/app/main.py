@@ -1,17 +1,53 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import agent, admin, super_admin
-from app.database import engine, Base
+from fastapi.responses import PlainTextResponse
+from app.api import agent, admin, super_admin, jobs
+from app.database import engine, async_engine, Base
 from app.core.config import settings
+from app.core.uploads import UploadSizeLimitMiddleware
+from app.core.metrics import metrics
+from app.providers.registry import provider_registry
+from app.services.job_worker import JobWorkerPool
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build shared provider clients once per process and close them on shutdown
+    
+    Also runs this process's background job workers; running jobs are handed
+    back to the queue on shutdown.
+    """
+    await provider_registry.warm_up()
+    job_workers = JobWorkerPool(jobs.JOB_HANDLERS)
+    await job_workers.start()
+    yield
+    await job_workers.stop()
+    await provider_registry.shutdown()
+    await async_engine.dispose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     description="Compliance-First AI Content Generation & Validation POC",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# Refuse oversized uploads from Content-Length before their body is read. Added before CORS so
+# that CORS wraps it (the last middleware added runs first) and the 413 carries CORS headers
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/agent/check-document": settings.DOCUMENT_UPLOAD_MAX_MB * 1024 * 1024,
+        "/super-admin/rules/extract": settings.RULE_PDF_UPLOAD_MAX_MB * 1024 * 1024,
+        "/jobs/check-document": settings.DOCUMENT_UPLOAD_MAX_MB * 1024 * 1024,
+        "/jobs/rules/extract": settings.RULE_PDF_UPLOAD_MAX_MB * 1024 * 1024,
+    }
 )
 
 # CORS middleware
@@ -27,6 +63,7 @@ app.add_middleware(
 app.include_router(agent.router)
 app.include_router(admin.router)
 app.include_router(super_admin.router)
+app.include_router(jobs.router)
 
 
 @app.get("/")
@@ -50,6 +87,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage latency, provider call and token usage, and cache metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
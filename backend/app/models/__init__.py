@@ -1,6 +1,7 @@
 from app.models.user import User
-from app.models.rule import Rule
+from app.models.rule import Rule, RuleSetVersion
 from app.models.content import ContentSubmission
 from app.models.audit import AuditLog
+from app.models.job import Job
 
-__all__ = ["User", "Rule", "ContentSubmission", "AuditLog"]
+__all__ = ["User", "Rule", "RuleSetVersion", "ContentSubmission", "AuditLog", "Job"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum, BigInteger
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from datetime import datetime
 import uuid
@@ -36,6 +36,14 @@ class ContentSubmission(Base):
     # Compliance tracking
     compliance_status = Column(Enum(ComplianceStatus), nullable=False, default=ComplianceStatus.PENDING)
     rules_triggered = Column(JSONB)  # List of {rule_id, severity, status: "triggered"|"violated"}
+    violations = Column(JSONB)  # Document checks: per-chunk violation details, as returned to the client
+    
+    # Document reuse: byte-identical uploads checked under the same rule-set version and reviewer
+    # model share a result; only set when no chunk fell back to keyword matching
+    file_hash = Column(String(64), index=True)  # SHA-256 of the uploaded bytes
+    rule_set_version = Column(BigInteger)
+    reviewer_model = Column(String(100))
+    source_submission_id = Column(UUID(as_uuid=True), ForeignKey("content_submissions.submission_id"), nullable=True)
     
     # Admin approval
     approved_by = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=True)
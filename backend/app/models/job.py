@@ -0,0 +1,56 @@
+from sqlalchemy import Column, String, DateTime, Text, ForeignKey, Enum, Integer, Boolean
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from datetime import datetime
+import uuid
+import enum
+from app.database import Base
+
+
+class JobType(str, enum.Enum):
+    """Background job type"""
+    DOCUMENT_CHECK = "document_check"
+    RULE_EXTRACTION = "rule_extraction"
+
+
+class JobStatus(str, enum.Enum):
+    """Background job lifecycle"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class Job(Base):
+    """Persistent background job, claimed by worker pools with SELECT ... FOR UPDATE SKIP LOCKED"""
+    __tablename__ = "jobs"
+
+    job_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_type = Column(Enum(JobType), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED, index=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+
+    # Input (e.g. stored upload path and filename) and handler checkpoint for resuming
+    payload = Column(JSONB, nullable=False)
+    progress = Column(JSONB)
+    completed_steps = Column(Integer, nullable=False, default=0)
+    total_steps = Column(Integer)
+
+    # Outcome
+    result = Column(JSONB)
+    error = Column(Text)
+
+    # Claiming: a running job whose lease has expired is picked up again by another worker
+    attempts = Column(Integer, nullable=False, default=0)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    locked_by = Column(String(100))
+    locked_until = Column(DateTime)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Job {self.job_id} {self.job_type.value} ({self.status.value})>"
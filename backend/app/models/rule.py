@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, Enum, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, BigInteger, Boolean, DateTime, Text, ForeignKey, Enum, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -21,6 +21,15 @@ class RuleSeverity(str, enum.Enum):
     HIGH = "HIGH"
 
 
+class RuleType(str, enum.Enum):
+    """How a rule is evaluated: by the LLM reviewers or locally by code"""
+    SEMANTIC = "semantic"
+    FORBIDDEN_PHRASE = "forbidden_phrase"
+    REQUIRED_PHRASE = "required_phrase"
+    REGEX = "regex"
+    LENGTH_LIMIT = "length_limit"
+
+
 class Rule(Base):
     """Rule model with versioning and categorization"""
     __tablename__ = "rules"
@@ -32,6 +41,10 @@ class Rule(Base):
     is_active = Column(Boolean, default=True, index=True)
     version = Column(Integer, nullable=False, default=1)
     
+    # Deterministic rules carry their check parameters and skip the LLM
+    rule_type = Column(Enum(RuleType), nullable=False, default=RuleType.SEMANTIC, server_default=RuleType.SEMANTIC.name)
+    rule_params = Column(JSONB)  # e.g. {"phrases": [...]} or {"max_chars": 160}; see core/rule_params
+    
     # Audit fields
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -44,3 +57,19 @@ class Rule(Base):
     
     def __repr__(self):
         return f"<Rule {self.category.value} v{self.version} ({'active' if self.is_active else 'inactive'})>"
+
+
+class RuleSetVersion(Base):
+    """Single-row counter bumped on every rule change
+    
+    Workers compare it with the version of their cached active rules to pick
+    up changes made by other processes.
+    """
+    __tablename__ = "rule_set_versions"
+    
+    id = Column(Integer, primary_key=True, default=1)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<RuleSetVersion {self.version}>"
@@ -0,0 +1,61 @@
+from app.providers.embedding_provider import EmbeddingProvider
+from app.core.cache import TieredCache
+from typing import List
+import asyncio
+import hashlib
+
+
+class CachedEmbeddingProvider(EmbeddingProvider):
+    """Wraps any EmbeddingProvider with a persistent embedding cache
+
+    Embeddings are keyed by a hash of the embedding model and the text, so the
+    same text is only sent to the embedding API once across requests, scripts
+    and restarts.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, cache: TieredCache):
+        self.provider = provider
+        self.cache = cache
+
+    @property
+    def embedding_model(self) -> str:
+        return self.provider.embedding_model or type(self.provider).__name__
+
+    def cache_key(self, text: str) -> str:
+        """Content hash of the text under the current embedding model"""
+        return hashlib.sha256(f"{self.embedding_model}\0{text}".encode("utf-8")).hexdigest()
+
+    async def create_embedding(self, text: str) -> List[float]:
+        """Return the cached embedding, creating and storing it on a miss"""
+        key = self.cache_key(text)
+        embedding = await asyncio.to_thread(self.cache.get, key)
+        if embedding is None:
+            embedding = await self.provider.create_embedding(text)
+            await asyncio.to_thread(self.cache.set, key, embedding)
+        return embedding
+
+    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Serve cached embeddings and batch-embed only the misses"""
+        keys = [self.cache_key(t) for t in texts]
+        # The disk tier is SQLite, so cache I/O runs off the event loop
+        cached = await asyncio.to_thread(self.cache.get_many, keys)
+
+        # Deduplicate misses so repeated texts are embedded once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        if missing:
+            embeddings = await self.provider.create_embeddings(list(missing.values()))
+            created = dict(zip(missing.keys(), embeddings))
+            await asyncio.to_thread(self.cache.set_many, created)
+            cached.update(created)
+
+        return [cached[key] for key in keys]
+
+    async def warm_up(self):
+        await self.provider.warm_up()
+
+    async def close(self):
+        await self.provider.close()
@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from typing import List
+import asyncio
+
+
+class EmbeddingProvider(ABC):
+    """Abstract base class for embedding providers
+
+    Embeddings are a separate backend from text generation, so any LLM
+    provider can be composed with any embedding provider (Gemini, Bedrock
+    Titan, a local model, ...) and one long-lived instance can be shared.
+    """
+
+    # Identifier of the embedding model (used for cache keys and logging)
+    embedding_model: str = ""
+
+    @abstractmethod
+    async def create_embedding(self, text: str) -> List[float]:
+        """Create text embedding
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            List of float values (embedding vector)
+        """
+        pass
+
+    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings for many texts
+
+        Providers with a batch endpoint should override this; the default
+        issues one request per text concurrently.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding per text, in input order
+        """
+        return list(await asyncio.gather(*[self.create_embedding(t) for t in texts]))
+
+    async def warm_up(self):
+        """Open connections ahead of the first request (optional)"""
+        pass
+
+    async def close(self):
+        """Release network resources held by the provider (optional)"""
+        pass
@@ -0,0 +1,61 @@
+import google.generativeai as genai
+from app.providers.embedding_provider import EmbeddingProvider
+from app.core.config import settings
+from app.core.metrics import instrument_provider_call
+from typing import List, Optional
+import asyncio
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    """Gemini embedding provider implementation
+
+    Configured once and shared; concurrent embedding requests are capped by
+    EMBEDDING_MAX_CONCURRENCY so bursts cannot exhaust the executor or the
+    Gemini rate limit.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None):
+        genai.configure(api_key=settings.GEMINI_API_KEY)
+        self.embedding_model = "models/text-embedding-004"
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY))
+
+    @instrument_provider_call("gemini", "embed")
+    async def create_embedding(self, text: str) -> List[float]:
+        """Create embedding using Gemini embedding model"""
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_event_loop()
+                result = await loop.run_in_executor(
+                    None,
+                    lambda: genai.embed_content(
+                        model=self.embedding_model,
+                        content=text,
+                        task_type="retrieval_document"
+                    )
+                )
+            return result['embedding']
+        except Exception as e:
+            raise Exception(f"Gemini embedding failed: {str(e)}")
+
+    @instrument_provider_call("gemini", "embed_batch")
+    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings in batches with one Gemini request per batch"""
+        embeddings = []
+        try:
+            loop = asyncio.get_event_loop()
+            batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+            for i in range(0, len(texts), batch_size):
+                batch = texts[i:i + batch_size]
+                async with self._semaphore:
+                    result = await loop.run_in_executor(
+                        None,
+                        lambda: genai.embed_content(
+                            model=self.embedding_model,
+                            content=batch,
+                            task_type="retrieval_document"
+                        )
+                    )
+                embeddings.extend(result['embedding'])
+            return embeddings
+        except Exception as e:
+            raise Exception(f"Gemini batch embedding failed: {str(e)}")
@@ -0,0 +1,63 @@
+from app.providers.embedding_provider import EmbeddingProvider
+from app.providers.http_client import AsyncHTTPClient
+from app.core.config import settings
+from app.core.metrics import instrument_provider_call
+from typing import Dict, List, Optional
+import asyncio
+
+
+class GeminiHTTPEmbeddingProvider(EmbeddingProvider):
+    """Gemini embedding provider using the REST API over pooled aiohttp connections"""
+
+    API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+    def __init__(self, http_client: AsyncHTTPClient, max_concurrency: Optional[int] = None):
+        self.http_client = http_client
+        self.embedding_model = "models/text-embedding-004"
+        self.headers = {"x-goog-api-key": settings.GEMINI_API_KEY}
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY))
+
+    def _request(self, text: str) -> Dict:
+        return {
+            "model": self.embedding_model,
+            "content": {"parts": [{"text": text}]},
+            "taskType": "RETRIEVAL_DOCUMENT",
+        }
+
+    @instrument_provider_call("gemini", "embed")
+    async def create_embedding(self, text: str) -> List[float]:
+        """Create embedding using Gemini embedding model"""
+        try:
+            async with self._semaphore:
+                response = await self.http_client.post_json(
+                    f"{self.API_BASE}/{self.embedding_model}:embedContent",
+                    self._request(text),
+                    headers=self.headers
+                )
+            return response["embedding"]["values"]
+        except Exception as e:
+            raise Exception(f"Gemini embedding failed: {str(e)}")
+
+    @instrument_provider_call("gemini", "embed_batch")
+    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings in batches with one batchEmbedContents request per batch"""
+        batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with self._semaphore:
+                response = await self.http_client.post_json(
+                    f"{self.API_BASE}/{self.embedding_model}:batchEmbedContents",
+                    {"requests": [self._request(text) for text in batch]},
+                    headers=self.headers
+                )
+            return [e["values"] for e in response["embeddings"]]
+
+        try:
+            # Batches run concurrently, bounded by the semaphore
+            results = await asyncio.gather(*[
+                embed_batch(texts[i:i + batch_size])
+                for i in range(0, len(texts), batch_size)
+            ])
+            return [embedding for batch in results for embedding in batch]
+        except Exception as e:
+            raise Exception(f"Gemini batch embedding failed: {str(e)}")
@@ -0,0 +1,112 @@
+from app.providers.gemini_provider import GeminiProvider
+from app.providers.embedding_provider import EmbeddingProvider
+from app.providers.gemini_http_embedding_provider import GeminiHTTPEmbeddingProvider
+from app.providers.http_client import AsyncHTTPClient
+from app.core.config import settings
+from app.core.metrics import instrument_provider_call
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Optional
+
+
+class GeminiHTTPProvider(GeminiProvider):
+    """Gemini provider using the Generative Language REST API over pooled aiohttp connections
+
+    Only the transport differs from GeminiProvider: requests are awaited on the
+    event loop instead of occupying default executor threads. Structured output
+    handling is inherited.
+    """
+
+    API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+
+    def __init__(
+        self,
+        http_client: AsyncHTTPClient,
+        embedding_provider: Optional[EmbeddingProvider] = None
+    ):
+        self.http_client = http_client
+        self.model = "gemini-2.0-flash"
+        self.embedding_provider = embedding_provider or GeminiHTTPEmbeddingProvider(http_client)
+        self.headers = {"x-goog-api-key": settings.GEMINI_API_KEY}
+
+    @instrument_provider_call("gemini", "generate")
+    async def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> Dict:
+        """Generate text using Gemini"""
+        try:
+            # Combine system prompt and user prompt
+            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+
+            response = await self.http_client.post_json(
+                f"{self.API_BASE}/models/{self.model}:generateContent",
+                {
+                    "contents": [{"role": "user", "parts": [{"text": full_prompt}]}],
+                    "generationConfig": {
+                        "temperature": temperature,
+                        "maxOutputTokens": max_tokens,
+                    },
+                },
+                headers=self.headers
+            )
+
+            candidates = response.get("candidates") or []
+            if not candidates:
+                raise Exception(f"No candidates returned: {response.get('promptFeedback')}")
+            parts = candidates[0].get("content", {}).get("parts", [])
+
+            usage = response.get("usageMetadata") or {}
+            return {
+                "content": "".join(part.get("text", "") for part in parts),
+                "usage": {
+                    "prompt_tokens": usage.get("promptTokenCount", 0),
+                    "completion_tokens": usage.get("candidatesTokenCount", 0),
+                }
+            }
+        except Exception as e:
+            raise Exception(f"Gemini generation failed: {str(e)}")
+
+    @instrument_provider_call("gemini", "generate_stream")
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream generated text using Gemini (server-sent events)"""
+        try:
+            # Combine system prompt and user prompt
+            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+
+            events = self.http_client.stream_events(
+                f"{self.API_BASE}/models/{self.model}:streamGenerateContent?alt=sse",
+                {
+                    "contents": [{"role": "user", "parts": [{"text": full_prompt}]}],
+                    "generationConfig": {
+                        "temperature": temperature,
+                        "maxOutputTokens": max_tokens,
+                    },
+                },
+                headers=self.headers
+            )
+            async with aclosing(events):
+                async for event in events:
+                    candidates = event.get("candidates") or []
+                    if not candidates:
+                        continue
+                    parts = candidates[0].get("content", {}).get("parts", [])
+                    text = "".join(part.get("text", "") for part in parts)
+                    if text:
+                        yield text
+        except Exception as e:
+            raise Exception(f"Gemini streaming failed: {str(e)}")
+
+    async def close(self):
+        """The shared HTTP client is closed by the provider registry"""
+        pass
@@ -1,7 +1,11 @@
 import google.generativeai as genai
-from app.providers.llm_provider import LLMProvider
+from app.providers.llm_provider import LLMProvider, StructuredOutputError, iterate_in_executor
+from app.providers.embedding_provider import EmbeddingProvider
+from app.providers.gemini_embedding_provider import GeminiEmbeddingProvider
 from app.core.config import settings
-from typing import Dict, List, Optional
+from app.core.metrics import instrument_provider_call
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional
 import json
 import asyncio
 
@@ -9,11 +13,12 @@ import asyncio
 class GeminiProvider(LLMProvider):
     """Gemini AI provider implementation"""
     
-    def __init__(self):
+    def __init__(self, embedding_provider: Optional[EmbeddingProvider] = None):
         genai.configure(api_key=settings.GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-2.0-flash')
-        self.embedding_model = "models/text-embedding-004"
+        self.embedding_provider = embedding_provider or GeminiEmbeddingProvider()
         
+    @instrument_provider_call("gemini", "generate")
     async def generate(
         self,
         prompt: str,
@@ -53,6 +58,56 @@ class GeminiProvider(LLMProvider):
         except Exception as e:
             raise Exception(f"Gemini generation failed: {str(e)}")
     
+    @instrument_provider_call("gemini", "generate_stream")
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream generated text using Gemini"""
+        try:
+            # Combine system prompt and user prompt
+            full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
+            
+            # Configure generation
+            generation_config = genai.types.GenerationConfig(
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+            )
+            
+            # Open the stream and read each chunk in the thread pool
+            loop = asyncio.get_event_loop()
+            response = await loop.run_in_executor(
+                None,
+                lambda: self.model.generate_content(
+                    full_prompt,
+                    generation_config=generation_config,
+                    stream=True
+                )
+            )
+            chunks = iterate_in_executor(iter(response), close=lambda: self._cancel_stream(response))
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    # chunk.text raises for chunks without text parts (e.g. the final or a safety-blocked chunk)
+                    parts = chunk.candidates[0].content.parts if chunk.candidates else []
+                    text = "".join(part.text for part in parts if part.text)
+                    if text:
+                        yield text
+        except Exception as e:
+            raise Exception(f"Gemini streaming failed: {str(e)}")
+    
+    @staticmethod
+    def _cancel_stream(response):
+        """Cancel the call behind a streaming response (the SDK has no public close)"""
+        call = getattr(response, "_iterator", None)
+        for method in ("cancel", "close"):
+            if callable(getattr(call, method, None)):
+                getattr(call, method)()
+                return
+    
     async def generate_structured(
         self,
         prompt: str,
@@ -87,22 +142,6 @@ class GeminiProvider(LLMProvider):
             return parsed
             
         except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse JSON from Gemini response: {str(e)}\nContent: {result.get('content', '')}")
+            raise StructuredOutputError(f"Failed to parse JSON from Gemini response: {str(e)}\nContent: {result.get('content', '')}")
         except Exception as e:
             raise Exception(f"Gemini structured generation failed: {str(e)}")
-    
-    async def create_embedding(self, text: str) -> List[float]:
-        """Create embedding using Gemini embedding model"""
-        try:
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: genai.embed_content(
-                    model=self.embedding_model,
-                    content=text,
-                    task_type="retrieval_document"
-                )
-            )
-            return result['embedding']
-        except Exception as e:
-            raise Exception(f"Gemini embedding failed: {str(e)}")
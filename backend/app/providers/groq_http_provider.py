@@ -0,0 +1,106 @@
+from app.providers.groq_provider import GroqProvider
+from app.providers.embedding_provider import EmbeddingProvider
+from app.providers.http_client import AsyncHTTPClient
+from app.core.config import settings
+from app.core.metrics import instrument_provider_call
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, Optional
+
+
+class GroqHTTPProvider(GroqProvider):
+    """Groq provider using the OpenAI-compatible REST API over pooled aiohttp connections
+
+    Only the transport differs from GroqProvider: requests are awaited on the
+    event loop instead of occupying default executor threads. Structured output
+    handling is inherited.
+    """
+
+    API_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+    def __init__(
+        self,
+        http_client: AsyncHTTPClient,
+        embedding_provider: Optional[EmbeddingProvider] = None
+    ):
+        self.http_client = http_client
+        self.model = "llama-3.3-70b-versatile"
+        self.embedding_provider = embedding_provider
+        self.headers = {"Authorization": f"Bearer {settings.GROQ_API_KEY}"}
+
+    @instrument_provider_call("groq", "generate")
+    async def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> Dict:
+        """Generate text using Groq"""
+        try:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+            response = await self.http_client.post_json(
+                self.API_URL,
+                {
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                },
+                headers=self.headers
+            )
+
+            usage = response.get("usage") or {}
+            return {
+                "content": response["choices"][0]["message"]["content"],
+                "usage": {
+                    "prompt_tokens": usage.get("prompt_tokens", 0),
+                    "completion_tokens": usage.get("completion_tokens", 0),
+                }
+            }
+        except Exception as e:
+            raise Exception(f"Groq generation failed: {str(e)}")
+
+    @instrument_provider_call("groq", "generate_stream")
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream generated text using Groq (server-sent events)"""
+        try:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+            events = self.http_client.stream_events(
+                self.API_URL,
+                {
+                    "model": self.model,
+                    "messages": messages,
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "stream": True,
+                },
+                headers=self.headers
+            )
+            async with aclosing(events):
+                async for event in events:
+                    choices = event.get("choices") or []
+                    content = choices[0].get("delta", {}).get("content") if choices else None
+                    if content:
+                        yield content
+        except Exception as e:
+            raise Exception(f"Groq streaming failed: {str(e)}")
+
+    async def close(self):
+        """The shared HTTP client is closed by the provider registry"""
+        pass
@@ -1,18 +1,27 @@
 from groq import Groq
-from app.providers.llm_provider import LLMProvider
+from app.providers.llm_provider import LLMProvider, StructuredOutputError, iterate_in_executor
+from app.providers.embedding_provider import EmbeddingProvider
 from app.core.config import settings
-from typing import Dict, List, Optional
+from app.core.metrics import instrument_provider_call
+from contextlib import aclosing
+from typing import AsyncIterator, Dict, List, Optional
 import json
 import asyncio
 
 
 class GroqProvider(LLMProvider):
-    """Groq AI provider implementation"""
+    """Groq AI provider implementation
     
-    def __init__(self):
+    Groq doesn't provide embeddings; compose it with an EmbeddingProvider
+    (the registry shares one Gemini embedding provider).
+    """
+    
+    def __init__(self, embedding_provider: Optional[EmbeddingProvider] = None):
         self.client = Groq(api_key=settings.GROQ_API_KEY)
         self.model = "llama-3.3-70b-versatile"  # Updated to latest supported model
+        self.embedding_provider = embedding_provider
         
+    @instrument_provider_call("groq", "generate")
     async def generate(
         self,
         prompt: str,
@@ -50,6 +59,42 @@ class GroqProvider(LLMProvider):
         except Exception as e:
             raise Exception(f"Groq generation failed: {str(e)}")
     
+    @instrument_provider_call("groq", "generate_stream")
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Stream generated text using Groq"""
+        try:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+            
+            # Open the stream and read each delta in the thread pool
+            loop = asyncio.get_event_loop()
+            stream = await loop.run_in_executor(
+                None,
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    stream=True,
+                )
+            )
+            chunks = iterate_in_executor(iter(stream), close=stream.close)
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise Exception(f"Groq streaming failed: {str(e)}")
+    
     async def generate_structured(
         self,
         prompt: str,
@@ -85,13 +130,10 @@ class GroqProvider(LLMProvider):
             return parsed
             
         except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse JSON from Groq response: {str(e)}\nContent: {result.get('content', '')}")
+            raise StructuredOutputError(f"Failed to parse JSON from Groq response: {str(e)}\nContent: {result.get('content', '')}")
         except Exception as e:
             raise Exception(f"Groq structured generation failed: {str(e)}")
     
-    async def create_embedding(self, text: str) -> List[float]:
-        """Groq doesn't provide embeddings, use Gemini fallback"""
-        # For embeddings, we'll use Gemini as Groq doesn't provide this
-        from app.providers.gemini_provider import GeminiProvider
-        gemini = GeminiProvider()
-        return await gemini.create_embedding(text)
+    async def close(self):
+        """Close the underlying HTTP client"""
+        self.client.close()
@@ -0,0 +1,97 @@
+from app.core.config import settings
+from typing import AsyncIterator, Dict, Optional
+import aiohttp
+import asyncio
+import json
+
+
+class AsyncHTTPClient:
+    """Shared aiohttp session with a pooled keep-alive connector
+
+    One instance is shared by all HTTP-native providers so LLM, embedding and
+    vector calls reuse warm TLS connections instead of occupying executor
+    threads. The session is created lazily inside the running event loop.
+    """
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_connections_per_host: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        self.max_connections = max_connections or settings.HTTP_MAX_CONNECTIONS
+        self.max_connections_per_host = max_connections_per_host or settings.HTTP_MAX_CONNECTIONS_PER_HOST
+        self.timeout = timeout or settings.HTTP_TIMEOUT
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Get the shared session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            async with self._lock:
+                if self._session is None or self._session.closed:
+                    connector = aiohttp.TCPConnector(
+                        limit=self.max_connections,
+                        limit_per_host=self.max_connections_per_host,
+                        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                        ttl_dns_cache=300
+                    )
+                    self._session = aiohttp.ClientSession(
+                        connector=connector,
+                        timeout=aiohttp.ClientTimeout(total=self.timeout)
+                    )
+        return self._session
+
+    async def post_json(
+        self,
+        url: str,
+        payload: Dict,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Dict:
+        """POST a JSON body and return the decoded JSON response
+
+        Raises:
+            Exception: On non-2xx responses, including the response body
+        """
+        session = await self.session()
+        async with session.post(url, json=payload, headers=headers) as response:
+            if response.status >= 400:
+                body = await response.text()
+                raise Exception(f"HTTP {response.status} from {url.split('?')[0]}: {body[:500]}")
+            return await response.json(content_type=None)
+
+    async def stream_events(
+        self,
+        url: str,
+        payload: Dict,
+        headers: Optional[Dict[str, str]] = None
+    ) -> AsyncIterator[Dict]:
+        """POST a JSON body and yield the JSON `data:` payloads of a server-sent event stream
+
+        The total request timeout does not apply (a long generation is not an
+        error); instead each read must arrive within the client timeout.
+        Stops at an OpenAI-style `[DONE]` marker or when the stream ends.
+
+        Raises:
+            Exception: On non-2xx responses, including the response body
+        """
+        session = await self.session()
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=self.timeout)
+        async with session.post(url, json=payload, headers=headers, timeout=timeout) as response:
+            if response.status >= 400:
+                body = await response.text()
+                raise Exception(f"HTTP {response.status} from {url.split('?')[0]}: {body[:500]}")
+            async for line in response.content:
+                line = line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[len(b"data:"):].strip()
+                if data == b"[DONE]":
+                    break
+                yield json.loads(data)
+
+    async def close(self):
+        """Close the session and its connection pool"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,14 +1,55 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
+from app.providers.embedding_provider import EmbeddingProvider
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class StructuredOutputError(Exception):
+    """The model's response could not be parsed into the requested structure"""
+    pass
+
+
+async def iterate_in_executor(
+    iterator: Iterator[T],
+    close: Optional[Callable[[], None]] = None
+) -> AsyncIterator[T]:
+    """Consume a blocking iterator (e.g. an SDK response stream) without blocking the event loop
+
+    Each item is fetched in the default executor and yielded as soon as it arrives.
+    If the consumer stops early (e.g. the client disconnected), `close` is
+    called to release the underlying response; it must be safe to call while
+    a fetch is still blocked in the executor.
+    """
+    loop = asyncio.get_running_loop()
+    done = object()
+    exhausted = False
+    try:
+        while True:
+            item = await loop.run_in_executor(None, next, iterator, done)
+            if item is done:
+                exhausted = True
+                return
+            yield item
+    finally:
+        if not exhausted and close is not None:
+            try:
+                await loop.run_in_executor(None, close)
+            except Exception as e:
+                print(f"⚠️ Failed to close response stream: {str(e)}")
 
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers
     
     This abstraction allows swapping between Gemini, Groq, AWS Bedrock, etc.
-    without changing business logic.
+    without changing business logic. Embeddings are delegated to a separately
+    configured EmbeddingProvider, which can be shared between LLM providers.
     """
     
+    embedding_provider: Optional[EmbeddingProvider] = None
+    
     @abstractmethod
     async def generate(
         self,
@@ -31,6 +72,28 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Generate text from prompt, yielding text fragments as the model produces them
+        
+        Takes the same arguments as `generate`. Providers without native
+        streaming yield the whole completion as a single fragment.
+        """
+        result = await self.generate(
+            prompt,
+            system_prompt=system_prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **kwargs
+        )
+        yield result["content"]
+    
     @abstractmethod
     async def generate_structured(
         self,
@@ -51,9 +114,23 @@ class LLMProvider(ABC):
         """
         pass
     
-    @abstractmethod
+    @property
+    def model_name(self) -> str:
+        """Identifier of the generation model (used for cache keys and logging)"""
+        model = getattr(self, "model", None)
+        # SDK model objects expose model_name, e.g. "models/gemini-2.0-flash"
+        name = getattr(model, "model_name", model)
+        if not isinstance(name, str):
+            return type(self).__name__
+        return name[len("models/"):] if name.startswith("models/") else name
+    
+    @property
+    def embedding_model(self) -> str:
+        """Embedding model of the composed embedding provider"""
+        return self.embedding_provider.embedding_model if self.embedding_provider else ""
+    
     async def create_embedding(self, text: str) -> List[float]:
-        """Create text embedding
+        """Create text embedding via the composed embedding provider
         
         Args:
             text: Text to embed
@@ -61,4 +138,27 @@ class LLMProvider(ABC):
         Returns:
             List of float values (embedding vector)
         """
+        if self.embedding_provider is None:
+            raise Exception(f"{type(self).__name__} has no embedding provider configured")
+        return await self.embedding_provider.create_embedding(text)
+    
+    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Create embeddings for many texts via the composed embedding provider
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            One embedding per text, in input order
+        """
+        if self.embedding_provider is None:
+            raise Exception(f"{type(self).__name__} has no embedding provider configured")
+        return await self.embedding_provider.create_embeddings(texts)
+    
+    async def warm_up(self):
+        """Open connections ahead of the first request (optional)"""
+        pass
+    
+    async def close(self):
+        """Release network resources held by the provider (optional)"""
         pass
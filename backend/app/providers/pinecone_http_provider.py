@@ -0,0 +1,108 @@
+from app.providers.vector_provider import VectorProvider
+from app.providers.http_client import AsyncHTTPClient
+from app.core.config import settings
+from typing import List, Dict, Optional
+import asyncio
+
+
+class PineconeHTTPProvider(VectorProvider):
+    """Pinecone provider using the data-plane REST API over pooled aiohttp connections"""
+
+    # Pinecone recommends at most 100 vectors per upsert request
+    UPSERT_BATCH_SIZE = 100
+    API_VERSION = "2024-07"
+
+    def __init__(self, http_client: AsyncHTTPClient):
+        self.http_client = http_client
+        self.index_name = settings.PINECONE_INDEX
+        host = settings.PINECONE_HOST.rstrip("/")
+        self.base_url = host if host.startswith("http") else f"https://{host}"
+        self.headers = {
+            "Api-Key": settings.PINECONE_API_KEY,
+            "X-Pinecone-API-Version": self.API_VERSION,
+        }
+
+    async def _post(self, path: str, payload: Dict) -> Dict:
+        return await self.http_client.post_json(f"{self.base_url}{path}", payload, headers=self.headers)
+
+    async def upsert(
+        self,
+        vectors: List[Dict],
+        namespace: Optional[str] = None
+    ):
+        """Upsert vectors to Pinecone"""
+        try:
+            formatted_vectors = [
+                {
+                    "id": str(v["id"]),
+                    "values": v["values"],
+                    "metadata": v.get("metadata", {})
+                }
+                for v in vectors
+            ]
+
+            # Batches go out concurrently over the shared connection pool
+            await asyncio.gather(*[
+                self._post("/vectors/upsert", {
+                    "vectors": formatted_vectors[i:i + self.UPSERT_BATCH_SIZE],
+                    "namespace": namespace or ""
+                })
+                for i in range(0, len(formatted_vectors), self.UPSERT_BATCH_SIZE)
+            ])
+        except Exception as e:
+            print(f"❌ Pinecone upsert failed: {str(e)}")
+            raise Exception(f"Pinecone upsert failed: {str(e)}")
+
+        print(f"✅ Successfully upserted {len(vectors)} vectors to Pinecone (namespace: {namespace})")
+
+    async def query(
+        self,
+        vector: List[float],
+        top_k: int = 10,
+        filter: Optional[Dict] = None,
+        namespace: Optional[str] = None
+    ) -> List[Dict]:
+        """Query Pinecone for similar vectors"""
+        try:
+            payload = {
+                "vector": vector,
+                "topK": top_k,
+                "namespace": namespace or "",
+                "includeMetadata": True
+            }
+            if filter:
+                payload["filter"] = filter
+
+            results = await self._post("/query", payload)
+
+            return [
+                {
+                    "id": match["id"],
+                    "score": match["score"],
+                    "metadata": match.get("metadata", {})
+                }
+                for match in results.get("matches", [])
+            ]
+        except Exception as e:
+            raise Exception(f"Pinecone query failed: {str(e)}")
+
+    async def delete(
+        self,
+        ids: List[str],
+        namespace: Optional[str] = None
+    ):
+        """Delete vectors from Pinecone"""
+        try:
+            await self._post("/vectors/delete", {
+                "ids": [str(id) for id in ids],
+                "namespace": namespace or ""
+            })
+        except Exception as e:
+            raise Exception(f"Pinecone delete failed: {str(e)}")
+
+    async def warm_up(self):
+        """Open a pooled connection to the index host before the first query"""
+        try:
+            await self._post("/describe_index_stats", {})
+        except Exception as e:
+            print(f"⚠️ Pinecone warm-up failed: {str(e)}")
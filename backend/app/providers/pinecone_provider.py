@@ -10,6 +10,9 @@ import math
 class PineconeProvider(VectorProvider):
     """Pinecone vector database implementation"""
     
+    # Pinecone recommends at most 100 vectors per upsert request
+    UPSERT_BATCH_SIZE = 100
+    
     def __init__(self):
         self.pc = Pinecone(api_key=settings.PINECONE_API_KEY)
         self.index_name = settings.PINECONE_INDEX
@@ -39,15 +42,17 @@ class PineconeProvider(VectorProvider):
                     "metadata": v.get("metadata", {})
                 })
             
-            # Upsert in thread pool
+            # Upsert in thread pool, one request per batch
             loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                lambda: self.index.upsert(
-                    vectors=formatted_vectors,
-                    namespace=namespace or ""
+            for i in range(0, len(formatted_vectors), self.UPSERT_BATCH_SIZE):
+                batch = formatted_vectors[i:i + self.UPSERT_BATCH_SIZE]
+                await loop.run_in_executor(
+                    None,
+                    lambda: self.index.upsert(
+                        vectors=batch,
+                        namespace=namespace or ""
+                    )
                 )
-            )
         except Exception as e:
             print(f"❌ Pinecone upsert failed: {str(e)}")
             traceback.print_exc()
@@ -107,3 +112,16 @@ class PineconeProvider(VectorProvider):
             )
         except Exception as e:
             raise Exception(f"Pinecone delete failed: {str(e)}")
+    
+    async def warm_up(self):
+        """Establish the index connection before the first query"""
+        try:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self.index.describe_index_stats)
+        except Exception as e:
+            print(f"⚠️ Pinecone warm-up failed: {str(e)}")
+    
+    async def close(self):
+        """Close the index connection pool"""
+        # Index only exposes cleanup through the context-manager protocol
+        self.index.__exit__(None, None, None)
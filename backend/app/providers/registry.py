@@ -0,0 +1,270 @@
+from app.providers.llm_provider import LLMProvider
+from app.providers.vector_provider import VectorProvider
+from app.providers.embedding_provider import EmbeddingProvider
+from app.providers.gemini_embedding_provider import GeminiEmbeddingProvider
+from app.providers.gemini_provider import GeminiProvider
+from app.providers.groq_provider import GroqProvider
+from app.providers.pinecone_provider import PineconeProvider
+from app.providers.gemini_http_embedding_provider import GeminiHTTPEmbeddingProvider
+from app.providers.gemini_http_provider import GeminiHTTPProvider
+from app.providers.groq_http_provider import GroqHTTPProvider
+from app.providers.pinecone_http_provider import PineconeHTTPProvider
+from app.providers.http_client import AsyncHTTPClient
+from app.providers.cached_embedding_provider import CachedEmbeddingProvider
+from app.core.cache import TieredCache
+from app.core.metrics import cache_metric_families, metrics
+from app.services.document_processor import DocumentProcessor
+from app.services.rule_relevance import RuleRelevanceRanker
+from app.core.config import settings
+from typing import Dict, Optional
+import asyncio
+import threading
+import tiktoken
+
+
+class ProviderRegistry:
+    """Application-lifetime registry of shared provider clients
+
+    Providers are built once (lazily, or eagerly via `warm_up` in the FastAPI
+    lifespan) and the same instances are handed to every request, so SDK
+    configuration and connection setup are not repeated per request.
+    All LLM providers are composed with one shared embedding provider, which
+    is wrapped with the embedding cache when enabled.
+    Construction is guarded by a lock so concurrent first requests cannot
+    build duplicate clients.
+
+    PROVIDER_TRANSPORT selects the implementation: "http" providers share one
+    pooled aiohttp client and never touch the default executor, "sdk" providers
+    wrap the blocking vendor SDKs in run_in_executor.
+    """
+
+    LLM_PROVIDERS = {
+        "sdk": {"gemini": GeminiProvider, "groq": GroqProvider},
+        "http": {"gemini": GeminiHTTPProvider, "groq": GroqHTTPProvider},
+    }
+
+    EMBEDDING_PROVIDERS = {
+        "sdk": {"gemini": GeminiEmbeddingProvider},
+        "http": {"gemini": GeminiHTTPEmbeddingProvider},
+    }
+
+    VECTOR_PROVIDERS = {
+        "sdk": PineconeProvider,
+        "http": PineconeHTTPProvider,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._llm_providers: Dict[str, LLMProvider] = {}
+        self._vector_provider: Optional[VectorProvider] = None
+        self._embedding_provider: Optional[EmbeddingProvider] = None
+        self._embedding_cache: Optional[TieredCache] = None
+        self._verdict_cache: Optional[TieredCache] = None
+        self._extraction_cache: Optional[TieredCache] = None
+        self._document_processor: Optional[DocumentProcessor] = None
+        self._rule_rankers: Dict[Optional[str], RuleRelevanceRanker] = {}
+        self._http_client: Optional[AsyncHTTPClient] = None
+
+    @property
+    def transport(self) -> str:
+        transport = settings.PROVIDER_TRANSPORT.lower()
+        if transport not in self.LLM_PROVIDERS:
+            raise ValueError(f"Unknown provider transport: {settings.PROVIDER_TRANSPORT}")
+        return transport
+
+    def _build(self, provider_class, **kwargs):
+        """Instantiate a provider, passing the shared HTTP client to HTTP-native ones"""
+        if self.transport == "http":
+            if self._http_client is None:
+                self._http_client = AsyncHTTPClient()
+            return provider_class(self._http_client, **kwargs)
+        return provider_class(**kwargs)
+
+    @staticmethod
+    def _normalize_llm_name(name: str) -> str:
+        """Map a configured provider name to a registry key (anything but gemini is groq)"""
+        return "gemini" if (name or "").lower() == "gemini" else "groq"
+
+    def get_llm(self, name: str) -> LLMProvider:
+        """Get the shared LLM provider for `name` ("gemini" or "groq")"""
+        key = self._normalize_llm_name(name)
+        provider = self._llm_providers.get(key)
+        if provider is None:
+            with self._lock:
+                provider = self._llm_providers.get(key)
+                if provider is None:
+                    provider = self._build(
+                        self.LLM_PROVIDERS[self.transport][key],
+                        embedding_provider=self._build_embedding_provider()
+                    )
+                    self._llm_providers[key] = provider
+        return provider
+
+    def get_embedding(self) -> EmbeddingProvider:
+        """Get the shared embedding provider"""
+        provider = self._embedding_provider
+        if provider is None:
+            with self._lock:
+                provider = self._build_embedding_provider()
+        return provider
+
+    def _build_embedding_provider(self) -> EmbeddingProvider:
+        """Build the shared embedding provider once; call with lock held"""
+        if self._embedding_provider is None:
+            name = settings.EMBEDDING_PROVIDER.lower()
+            providers = self.EMBEDDING_PROVIDERS[self.transport]
+            if name not in providers:
+                raise ValueError(f"Unknown embedding provider: {settings.EMBEDDING_PROVIDER}")
+            provider = self._build(providers[name])
+            if settings.EMBEDDING_CACHE_ENABLED:
+                provider = CachedEmbeddingProvider(provider, self._get_embedding_cache())
+            self._embedding_provider = provider
+        return self._embedding_provider
+
+    def get_vector(self) -> VectorProvider:
+        """Get the shared vector database provider"""
+        provider = self._vector_provider
+        if provider is None:
+            with self._lock:
+                provider = self._vector_provider
+                if provider is None:
+                    provider = self._build(self.VECTOR_PROVIDERS[self.transport])
+                    self._vector_provider = provider
+        return provider
+
+    def _get_embedding_cache(self) -> TieredCache:
+        """Shared embedding cache (keys include the embedding model); call with lock held"""
+        if self._embedding_cache is None:
+            self._embedding_cache = TieredCache(
+                name="embeddings",
+                path=settings.EMBEDDING_CACHE_PATH,
+                memory_size=settings.EMBEDDING_CACHE_MEMORY_SIZE,
+                max_disk_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES
+            )
+        return self._embedding_cache
+
+    def get_verdict_cache(self) -> Optional[TieredCache]:
+        """Shared cache of per-chunk LLM review verdicts (None when disabled)"""
+        if not settings.VERDICT_CACHE_ENABLED:
+            return None
+        cache = self._verdict_cache
+        if cache is None:
+            with self._lock:
+                if self._verdict_cache is None:
+                    self._verdict_cache = TieredCache(
+                        name="chunk_verdicts",
+                        path=settings.VERDICT_CACHE_PATH,
+                        memory_size=settings.VERDICT_CACHE_MEMORY_SIZE,
+                        max_disk_entries=settings.VERDICT_CACHE_MAX_ENTRIES,
+                        ttl_seconds=settings.VERDICT_CACHE_TTL_SECONDS
+                    )
+                cache = self._verdict_cache
+        return cache
+
+    def get_extraction_cache(self) -> Optional[TieredCache]:
+        """Shared cache of extracted document text by file hash (None when disabled)"""
+        if not settings.EXTRACTION_CACHE_ENABLED:
+            return None
+        cache = self._extraction_cache
+        if cache is None:
+            with self._lock:
+                if self._extraction_cache is None:
+                    self._extraction_cache = TieredCache(
+                        name="document_extractions",
+                        path=settings.EXTRACTION_CACHE_PATH,
+                        memory_size=settings.EXTRACTION_CACHE_MEMORY_SIZE,
+                        max_disk_entries=settings.EXTRACTION_CACHE_MAX_ENTRIES
+                    )
+                cache = self._extraction_cache
+        return cache
+
+    def get_document_processor(self) -> DocumentProcessor:
+        """Shared process pool for document extraction and tokenization"""
+        processor = self._document_processor
+        if processor is None:
+            with self._lock:
+                if self._document_processor is None:
+                    self._document_processor = DocumentProcessor()
+                processor = self._document_processor
+        return processor
+
+    def get_rule_relevance(self, encoding: Optional[str] = None) -> RuleRelevanceRanker:
+        """Shared rule relevance ranker, so its rule-set indexes outlive a request
+
+        Rule token costs are counted with the tiktoken `encoding`, or
+        estimated from the text length when None.
+        """
+        ranker = self._rule_rankers.get(encoding)
+        if ranker is None:
+            embedding_provider = self.get_embedding()
+            vector_provider = self.get_vector()
+            tokenizer = tiktoken.get_encoding(encoding) if encoding else None
+            with self._lock:
+                ranker = self._rule_rankers.get(encoding)
+                if ranker is None:
+                    ranker = RuleRelevanceRanker(
+                        embedding_provider=embedding_provider,
+                        vector_provider=vector_provider,
+                        tokenizer=tokenizer
+                    )
+                    self._rule_rankers[encoding] = ranker
+        return ranker
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the caches owned by the registry"""
+        return {
+            "embeddings": self._embedding_cache.stats() if self._embedding_cache else None,
+            "chunk_verdicts": self._verdict_cache.stats() if self._verdict_cache else None,
+            "document_extractions": self._extraction_cache.stats() if self._extraction_cache else None
+        }
+
+    async def warm_up(self):
+        """Build configured providers and open their connections"""
+        try:
+            providers = [
+                self.get_llm(settings.DEFAULT_LLM_PROVIDER),
+                self.get_llm(settings.REVIEWER_LLM_PROVIDER),
+                self.get_embedding(),
+                self.get_vector(),
+            ]
+        except Exception as e:
+            # Providers are built lazily on first use if startup fails
+            print(f"⚠️ Provider warm-up failed: {str(e)}")
+            return
+
+        for provider in {id(p): p for p in providers}.values():
+            await provider.warm_up()
+
+    async def shutdown(self):
+        """Close all providers and forget them"""
+        with self._lock:
+            providers = list(self._llm_providers.values())
+            for shared in (self._embedding_provider, self._vector_provider):
+                if shared is not None:
+                    providers.append(shared)
+            self._llm_providers = {}
+            self._embedding_provider = None
+            self._vector_provider = None
+            self._rule_rankers = {}
+            for cache in (self._embedding_cache, self._verdict_cache, self._extraction_cache):
+                if cache is not None:
+                    cache.close()
+            http_client, self._http_client = self._http_client, None
+            document_processor, self._document_processor = self._document_processor, None
+
+        for provider in providers:
+            try:
+                await provider.close()
+            except Exception as e:
+                print(f"⚠️ Failed to close {type(provider).__name__}: {str(e)}")
+
+        if http_client is not None:
+            await http_client.close()
+
+        if document_processor is not None:
+            # Waits for in-flight extractions; keep it off the event loop
+            await asyncio.to_thread(document_processor.shutdown)
+
+
+provider_registry = ProviderRegistry()
+metrics.register_collector(lambda: cache_metric_families(provider_registry.cache_stats()))
@@ -57,3 +57,11 @@ class VectorProvider(ABC):
             namespace: Optional namespace
         """
         pass
+    
+    async def warm_up(self):
+        """Open connections ahead of the first request (optional)"""
+        pass
+    
+    async def close(self):
+        """Release network resources held by the provider (optional)"""
+        pass
@@ -12,6 +12,13 @@ class ContentGenerateRequest(BaseModel):
     user_id: UUID = Field(default=UUID('00000000-0000-0000-0000-000000000001'))
 
 
+class KeywordMatch(BaseModel):
+    """Schema for a deterministic keyword hit in the content"""
+    keyword: str
+    start: int
+    end: int
+
+
 class RuleTriggered(BaseModel):
     """Schema for triggered rule info"""
     rule_id: str
@@ -19,6 +26,20 @@ class RuleTriggered(BaseModel):
     category: str
     severity: str
     status: str  # "triggered" or "violated"
+    matches: Optional[List[KeywordMatch]] = None  # Keyword hits for deterministic violations
+
+
+class StageTiming(BaseModel):
+    """Schema for one pipeline stage's timing"""
+    start_ms: float  # Since the pipeline started
+    duration_ms: float
+
+
+class PipelineTimings(BaseModel):
+    """Schema for per-stage pipeline timings"""
+    total_ms: float
+    stages: Dict[str, StageTiming]
+    critical_path: List[str]  # Stages that determined the total latency, in order
 
 
 class ContentGenerateResponse(BaseModel):
@@ -28,6 +49,7 @@ class ContentGenerateResponse(BaseModel):
     compliance_status: ComplianceStatus
     rules_triggered: List[RuleTriggered]
     created_at: datetime
+    timings: Optional[PipelineTimings] = None
 
 
 class DocumentCheckRequest(BaseModel):
@@ -50,6 +72,7 @@ class DocumentCheckResponse(BaseModel):
     compliance_status: ComplianceStatus
     violations: List[ViolationDetail]
     rules_triggered: List[RuleTriggered]
+    source_submission_id: Optional[UUID] = None  # Set when an earlier identical check was reused
 
 
 class ContentRewriteRequest(BaseModel):
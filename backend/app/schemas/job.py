@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+from app.models.job import JobStatus, JobType
+
+
+class JobResponse(BaseModel):
+    """Schema for background job status"""
+    job_id: UUID
+    job_type: JobType
+    status: JobStatus
+    completed_steps: int
+    total_steps: Optional[int] = None
+    attempts: int
+    cancel_requested: bool
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
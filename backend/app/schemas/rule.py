@@ -1,8 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, model_validator
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
-from app.models.rule import RuleCategory, RuleSeverity
+from app.models.rule import RuleCategory, RuleSeverity, RuleType
+from app.core.rule_params import validate_rule_params
 
 
 class RuleCreate(BaseModel):
@@ -10,6 +11,13 @@ class RuleCreate(BaseModel):
     rule_text: str = Field(..., min_length=10, description="Rule text content")
     category: RuleCategory
     severity: RuleSeverity
+    rule_type: RuleType = RuleType.SEMANTIC
+    rule_params: Optional[Dict[str, Any]] = Field(None, description="Check parameters for deterministic rule types")
+    
+    @model_validator(mode="after")
+    def check_rule_params(self):
+        self.rule_params = validate_rule_params(self.rule_type, self.rule_params)
+        return self
 
 
 class RuleUpdate(BaseModel):
@@ -17,6 +25,15 @@ class RuleUpdate(BaseModel):
     rule_text: Optional[str] = None
     category: Optional[RuleCategory] = None
     severity: Optional[RuleSeverity] = None
+    rule_type: Optional[RuleType] = None
+    rule_params: Optional[Dict[str, Any]] = None
+    
+    @model_validator(mode="after")
+    def check_rule_params(self):
+        # Params alone are checked against the current rule's type by RuleService
+        if self.rule_type is not None and self.rule_params is not None:
+            self.rule_params = validate_rule_params(self.rule_type, self.rule_params)
+        return self
 
 
 class RuleResponse(BaseModel):
@@ -25,6 +42,8 @@ class RuleResponse(BaseModel):
     rule_text: str
     category: RuleCategory
     severity: RuleSeverity
+    rule_type: RuleType = RuleType.SEMANTIC
+    rule_params: Optional[Dict[str, Any]] = None
     is_active: bool
     version: int
     created_by: UUID
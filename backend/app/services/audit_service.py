@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.audit import AuditLog
 from uuid import UUID
 from typing import Optional
@@ -8,8 +8,8 @@ class AuditService:
     """Service for audit logging"""
     
     @staticmethod
-    def log_action(
-        db: Session,
+    async def log_action(
+        db: AsyncSession,
         action_type: str,
         actor_id: UUID,
         resource_type: Optional[str] = None,
@@ -29,7 +29,7 @@ class AuditService:
         )
         
         db.add(audit_log)
-        db.commit()
-        db.refresh(audit_log)
+        await db.commit()
+        await db.refresh(audit_log)
         
         return audit_log
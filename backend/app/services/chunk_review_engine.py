@@ -0,0 +1,98 @@
+from app.core.config import settings
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+
+
+class ChunkReviewEngine:
+    """Concurrent chunk review with bounded parallelism
+
+    Each chunk is reviewed independently with its own timeout and retry budget.
+    If every attempt fails, the fallback is applied to that chunk only.
+    `run` returns results in chunk order; `iter_completed` yields them as
+    they finish.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_backoff: Optional[float] = None
+    ):
+        self.concurrency = max(1, concurrency or settings.COMPLIANCE_CHUNK_CONCURRENCY)
+        self.timeout = timeout or settings.COMPLIANCE_CHUNK_TIMEOUT
+        self.max_retries = max(0, settings.COMPLIANCE_CHUNK_MAX_RETRIES if max_retries is None else max_retries)
+        self.retry_backoff = settings.COMPLIANCE_CHUNK_RETRY_BACKOFF if retry_backoff is None else retry_backoff
+
+    async def run(
+        self,
+        chunks: List[Dict],
+        review: Callable[[Dict], Awaitable[Any]],
+        fallback: Callable[[Dict], Any]
+    ) -> List[Any]:
+        """Review all chunks concurrently
+
+        Args:
+            chunks: Chunks to review
+            review: Async callable reviewing a single chunk (may raise)
+            fallback: Sync callable used for a chunk once its retries are exhausted
+
+        Returns:
+            One result per chunk, in the same order as `chunks`
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        return await asyncio.gather(*[
+            self._review_chunk(index, chunk, review, fallback, semaphore)
+            for index, chunk in enumerate(chunks)
+        ])
+
+    async def iter_completed(
+        self,
+        chunks: List[Dict],
+        review: Callable[[Dict], Awaitable[Any]],
+        fallback: Callable[[Dict], Any]
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """Review all chunks concurrently, yielding (index, result) as each one finishes
+
+        Same timeout, retry and fallback handling as `run`. Reviews still
+        pending when the consumer stops iterating are cancelled.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def review_indexed(index: int, chunk: Dict) -> Tuple[int, Any]:
+            return index, await self._review_chunk(index, chunk, review, fallback, semaphore)
+
+        tasks = [asyncio.ensure_future(review_indexed(index, chunk)) for index, chunk in enumerate(chunks)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Retrieve the cancelled tasks' outcomes so none is left unawaited
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _review_chunk(
+        self,
+        index: int,
+        chunk: Dict,
+        review: Callable[[Dict], Awaitable[Any]],
+        fallback: Callable[[Dict], Any],
+        semaphore: asyncio.Semaphore
+    ) -> Any:
+        """Review one chunk with timeout and retries, falling back on failure"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with semaphore:
+                    return await asyncio.wait_for(review(chunk), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                print(f"Chunk {index} review timed out after {self.timeout}s (attempt {attempt + 1})")
+            except Exception as e:
+                print(f"Chunk {index} review failed (attempt {attempt + 1}): {str(e)}")
+
+            # Back off outside the semaphore so other chunks keep flowing
+            if attempt < self.max_retries and self.retry_backoff > 0:
+                await asyncio.sleep(self.retry_backoff * (2 ** attempt))
+
+        return fallback(chunk)
@@ -1,107 +1,406 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.content import ContentSubmission, ComplianceStatus, InputType
-from app.models.rule import Rule
-from app.providers.llm_provider import LLMProvider
+from app.services.rule_cache import ActiveRuleCache, active_rule_cache
+from app.services.rule_set import RuleSetSnapshot, RuleSnapshot
+from app.services.rule_relevance import RuleRelevanceRanker
+from app.providers.vector_provider import VectorProvider
+from app.providers.llm_provider import LLMProvider, StructuredOutputError
 from app.services.audit_service import AuditService
+from app.services.chunk_review_engine import ChunkReviewEngine
+from app.services.document_processor import DocumentProcessor, DocumentSource
+from app.core.config import settings
+from app.core.cache import TieredCache
+from app.core.metrics import stage_timer, timed_iteration
 from uuid import UUID
-from typing import List, Dict, Optional
+from typing import AsyncIterator, Collection, List, Dict, Optional, Sequence, Tuple
+import asyncio
+import hashlib
 import tiktoken
-import PyPDF2
-import docx
-import io
 
 
 class ComplianceService:
     """Service for document compliance checking"""
     
+    # Token chunking of uploaded documents
+    CHUNK_SIZE = 512
+    CHUNK_OVERLAP = 50
+    
+    # Bump when review prompts or violation records change so cached verdicts are not reused
+    VERDICT_CACHE_SCHEMA = "1"
+    
+    # Leading document text stored on the submission
+    FINAL_CONTENT_CHARS = 5000
+    
     def __init__(
         self,
-        db: Session,
-        llm_provider: LLMProvider
+        db: AsyncSession,
+        llm_provider: LLMProvider,
+        review_engine: Optional[ChunkReviewEngine] = None,
+        rule_cache: Optional[ActiveRuleCache] = None,
+        vector_provider: Optional[VectorProvider] = None,
+        rule_relevance: Optional[RuleRelevanceRanker] = None,
+        verdict_cache: Optional[TieredCache] = None,
+        extraction_cache: Optional[TieredCache] = None,
+        document_processor: Optional[DocumentProcessor] = None
     ):
         self.db = db
         self.llm_provider = llm_provider
+        self.review_engine = review_engine or ChunkReviewEngine()
+        self.rule_cache = rule_cache or active_rule_cache
         self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.rule_relevance = rule_relevance or RuleRelevanceRanker(
+            embedding_provider=llm_provider,
+            vector_provider=vector_provider,
+            tokenizer=self.tokenizer
+        )
+        self.verdict_cache = verdict_cache
+        self.extraction_cache = extraction_cache
+        # Without a shared pool, run document work in the default thread pool
+        self.document_processor = document_processor or DocumentProcessor(max_workers=0)
     
     async def check_document_compliance(
         self,
-        file_content: bytes,
+        source: DocumentSource,
         filename: str,
-        user_id: UUID
+        user_id: UUID,
+        file_hash: Optional[str] = None
     ) -> Dict:
         """Check uploaded document for compliance violations
         
+        `source` is the path of the spooled upload (or its bytes); pass
+        `file_hash` when the SHA-256 was already computed while spooling.
+        Runs `iter_document_compliance` to completion and returns its summary.
+        """
+        result = None
+        async for event in self.iter_document_compliance(source, filename, user_id, file_hash):
+            if event["type"] == "summary":
+                result = event["result"]
+        return result
+    
+    async def iter_document_compliance(
+        self,
+        source: DocumentSource,
+        filename: str,
+        user_id: UUID,
+        file_hash: Optional[str] = None,
+        resume: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """Check uploaded document for compliance violations, yielding progress events
+        
         Flow:
-        1. Extract text from document
-        2. Token-based chunking with metadata
-        3. Load active rules
-        4. Check each chunk against rules
-        5. Identify violations with context
-        6. Store submission
+        1. Fingerprint the file and load active rules; an earlier check of the
+           same bytes under the same rule-set version and reviewer model is
+           reused as is
+        2. Extract text from document (cached by file hash) and chunk by tokens
+        3. Evaluate deterministic rules locally, then check chunks against the
+           semantic rules concurrently (bounded by the review engine); chunks
+           with a cached verdict for the same rules and model are skipped
+        4. Identify violations with context
+        5. Store submission
+        
+        Events, in order:
+        - {"type": "started", "total_chunks": n, "rule_set_version": v}
+        - {"type": "document", "violation": {...}} when document-level rules are violated
+        - {"type": "chunk", "chunk_index": i, "completed": k, "total_chunks": n,
+          "violation": {...} or None, "fallback": bool}, one per chunk as soon as its
+          review completes; `fallback` is set when the LLM review failed and the
+          keyword fallback was used instead
+        - {"type": "summary", "result": {...}} last, once the submission is stored
+        A reused earlier check yields only the summary.
+        
+        `resume` continues an interrupted check from its chunk events:
+        {"rule_set_version": v, "chunks": {chunk_index: violation or None},
+        "fallback_chunks": [chunk_index, ...]}. Those chunks are reported
+        again without being reviewed; it is ignored if the rule set has
+        changed since.
+        
+        Only checks whose every chunk was reviewed by the LLM are stored for
+        reuse, so a transient LLM outage is not replayed to later uploads.
         """
         
-        # Step 1: Extract text
-        extracted_text, metadata = self._extract_document_text(file_content, filename)
+        # Step 1: Fingerprint the upload and load the compiled active rule set (shared snapshot)
+        if file_hash is None:
+            with stage_timer("check_document", "hash"):
+                file_hash = await asyncio.to_thread(self._hash_source, source)
+        with stage_timer("check_document", "load_rules"):
+            rule_set = await self.rule_cache.get_rule_set(self.db)
         
-        # Step 2: Token-based chunking
-        chunks = self._chunk_by_tokens(extracted_text, metadata)
+        if settings.DOCUMENT_REUSE_ENABLED:
+            with stage_timer("check_document", "find_previous"):
+                previous = await self._find_previous_check(file_hash, rule_set.version, self.llm_provider.model_name)
+            if previous is not None:
+                with stage_timer("check_document", "reuse"):
+                    result = await self._reuse_previous_check(previous, filename, user_id)
+                yield {"type": "summary", "result": result}
+                return
         
-        # Step 3: Load active rules
-        active_rules = self.db.query(Rule).filter(Rule.is_active == True).all()
+        # Step 2: Extract text and chunk by tokens, streamed page by page (cached by file hash);
+        # document-level rules are evaluated on the pages as they stream past
+        with stage_timer("check_document", "extract"):
+            preview, chunks, document_violations = await self._load_document(source, filename, file_hash, rule_set)
+        yield {"type": "started", "total_chunks": len(chunks), "rule_set_version": rule_set.version}
         
-        # Step 4: Check chunks against rules
-        violations = []
-        rules_triggered_set = {}
+        # Step 3a: Deterministic rules, evaluated locally before any LLM call
+        with stage_timer("check_document", "deterministic_rules"):
+            local_results = [rule_set.evaluator.check_text(chunk["text"]) for chunk in chunks]
         
-        for chunk in chunks:
-            chunk_violations = await self._check_chunk_compliance(chunk, active_rules)
-            if chunk_violations:
-                violations.append({
-                    "chunk_text": chunk["text"],
-                    "page_number": chunk.get("page"),
-                    "section": chunk.get("section"),
-                    "violated_rules": chunk_violations
-                })
-                
-                # Track all triggered rules
-                for violation in chunk_violations:
-                    rule_id = violation["rule_id"]
-                    if rule_id not in rules_triggered_set:
-                        rules_triggered_set[rule_id] = violation
+        # Document-level rules (required phrases, length limits) have no single chunk
+        document_violation = None
+        if document_violations:
+            document_violation = {
+                "chunk_text": "",
+                "page_number": None,
+                "section": "Entire document",
+                "violated_rules": document_violations
+            }
+            yield {"type": "document", "violation": document_violation}
+        
+        # Step 3b: LLM review of the semantic rules relevant to each chunk, reported as each completes
+        # (all chunks are embedded in one batch)
+        chunk_violations: List[Optional[Dict]] = [None] * len(chunks)
+        completed = 0
+        resumed, fallback_chunks = self._resumed_chunks(resume, rule_set, len(chunks))
+        for index, violation in resumed.items():
+            chunk_violations[index] = violation
+            completed += 1
+            yield {
+                "type": "chunk",
+                "chunk_index": index,
+                "completed": completed,
+                "total_chunks": len(chunks),
+                "violation": violation,
+                "fallback": index in fallback_chunks
+            }
+        
+        reviews = self._iter_llm_reviews(chunks, rule_set, skip=resumed.keys())
+        async for index, llm_result, fell_back in timed_iteration(reviews, "check_document", "llm_review"):
+            chunk_violations[index] = self._chunk_violation(chunks[index], local_results[index] + llm_result)
+            if fell_back:
+                fallback_chunks.add(index)
+            completed += 1
+            yield {
+                "type": "chunk",
+                "chunk_index": index,
+                "completed": completed,
+                "total_chunks": len(chunks),
+                "violation": chunk_violations[index],
+                "fallback": fell_back
+            }
+        
+        # Step 4: Violations in document order
+        violations = [violation for violation in chunk_violations if violation is not None]
+        if document_violation is not None:
+            violations.append(document_violation)
+        
+        rules_triggered_set = {}
+        for violation in violations:
+            # Track all triggered rules
+            for rule_violation in violation["violated_rules"]:
+                rules_triggered_set.setdefault(rule_violation["rule_id"], rule_violation)
         
         # Determine compliance status
         compliance_status = ComplianceStatus.VIOLATIONS if violations else ComplianceStatus.COMPLIANT
         rules_triggered = list(rules_triggered_set.values())
         
-        # Step 5: Store submission
+        # Step 5: Store submission (reusable only if no chunk fell back to keyword matching)
+        reusable = not fallback_chunks
         submission = ContentSubmission(
             user_id=user_id,
             input_type=InputType.DOCUMENT,
             input_reference=filename,
-            final_content=extracted_text[:5000],  # Store first 5000 chars
+            final_content=preview,
             compliance_status=compliance_status,
-            rules_triggered=rules_triggered
+            rules_triggered=rules_triggered,
+            violations=violations,
+            file_hash=file_hash if reusable else None,
+            rule_set_version=rule_set.version if reusable else None,
+            reviewer_model=self.llm_provider.model_name if reusable else None
+        )
+        
+        with stage_timer("check_document", "store"):
+            self.db.add(submission)
+            await self.db.commit()
+            await self.db.refresh(submission)
+            
+            # Audit log
+            await AuditService.log_action(
+                self.db,
+                action_type="document_checked",
+                actor_id=user_id,
+                resource_type="content",
+                resource_id=submission.submission_id,
+                decision_summary=f"Checked document: {len(violations)} violations found"
+            )
+        
+        yield {
+            "type": "summary",
+            "result": {
+                "submission_id": submission.submission_id,
+                "compliance_status": compliance_status,
+                "violations": violations,
+                "rules_triggered": rules_triggered
+            }
+        }
+    
+    async def _iter_llm_reviews(
+        self,
+        chunks: List[Dict],
+        rule_set: RuleSetSnapshot,
+        skip: Collection[int] = ()
+    ) -> AsyncIterator[Tuple[int, List[Dict], bool]]:
+        """LLM violations per chunk as (chunk index, violations, fell back), in completion order
+        
+        `fell back` is set for chunks whose review failed and were checked by
+        keyword matching instead. Chunks whose index is in `skip` are not
+        reviewed.
+        """
+        indices = [index for index in range(len(chunks)) if index not in skip]
+        if not rule_set.semantic_rules:
+            for index in indices:
+                yield index, [], False
+            return
+        
+        chunk_rules = await self.rule_relevance.select(rule_set, [chunks[index]["text"] for index in indices])
+        items = [(chunks[index], rules) for index, rules in zip(indices, chunk_rules)]
+        
+        # Cached verdicts first; only new or changed chunks reach the LLM
+        cached = await self._get_cached_verdicts(items, rule_set)
+        pending = []
+        pending_items = []
+        for position, result in enumerate(cached):
+            if result is None:
+                pending.append(indices[position])
+                pending_items.append(items[position])
+            else:
+                yield indices[position], result, False
+        
+        # Chunks (by identity) that the review engine handed to the keyword fallback
+        fell_back = set()
+        
+        def keyword_fallback(chunk: Dict) -> List[Dict]:
+            fell_back.add(id(chunk))
+            return self._check_rule_violation_keywords(chunk["text"], rule_set)
+        
+        if settings.COMPLIANCE_BATCH_REVIEW:
+            # Several chunks per LLM call, so the rules and instructions are sent once per batch
+            batches = self._build_review_batches(pending_items)
+            # Batches are consecutive runs of the pending chunks
+            batch_indices = []
+            offset = 0
+            for batch in batches:
+                batch_indices.append(pending[offset:offset + len(batch)])
+                offset += len(batch)
+            
+            async for batch_index, results in self.review_engine.iter_completed(
+                batches,
+                review=lambda batch: self._check_batch_compliance(batch, rule_set),
+                fallback=lambda batch: [keyword_fallback(chunk) for chunk, _ in batch]
+            ):
+                for index, result in zip(batch_indices[batch_index], results):
+                    yield index, result, id(chunks[index]) in fell_back
+        else:
+            async for pending_index, result in self.review_engine.iter_completed(
+                pending_items,
+                review=lambda item: self._check_chunk_compliance(item[0], item[1], rule_set),
+                fallback=lambda item: keyword_fallback(item[0])
+            ):
+                index = pending[pending_index]
+                yield index, result, id(chunks[index]) in fell_back
+    
+    @staticmethod
+    def _resumed_chunks(
+        resume: Optional[Dict],
+        rule_set: RuleSetSnapshot,
+        total_chunks: int
+    ) -> Tuple[Dict[int, Optional[Dict]], set]:
+        """Chunk results of an interrupted check that are still valid, by chunk index,
+        and the indices among them that were checked by the keyword fallback"""
+        if not resume or resume.get("rule_set_version") != rule_set.version:
+            return {}, set()
+        # Keys are strings once the progress has been stored as JSON
+        resumed = {int(index): violation for index, violation in (resume.get("chunks") or {}).items()}
+        resumed = {index: resumed[index] for index in sorted(resumed) if 0 <= index < total_chunks}
+        fallback_chunks = {int(index) for index in resume.get("fallback_chunks") or ()}
+        return resumed, fallback_chunks & resumed.keys()
+    
+    @staticmethod
+    def _chunk_violation(chunk: Dict, chunk_violations: List[Dict]) -> Optional[Dict]:
+        """Violation record for a chunk, or None if it is compliant"""
+        if not chunk_violations:
+            return None
+        return {
+            "chunk_text": chunk["text"],
+            "page_number": chunk.get("page"),
+            "section": chunk.get("section"),
+            "violated_rules": chunk_violations
+        }
+    
+    async def _find_previous_check(
+        self,
+        file_hash: str,
+        rule_set_version: int,
+        reviewer_model: str
+    ) -> Optional[ContentSubmission]:
+        """Latest fully LLM-reviewed check of the same file bytes under the same rule-set version and model"""
+        result = await self.db.execute(
+            select(ContentSubmission)
+            .where(
+                ContentSubmission.file_hash == file_hash,
+                ContentSubmission.rule_set_version == rule_set_version,
+                ContentSubmission.reviewer_model == reviewer_model,
+                ContentSubmission.input_type == InputType.DOCUMENT,
+                ContentSubmission.violations.isnot(None)
+            )
+            .order_by(ContentSubmission.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+    
+    async def _reuse_previous_check(
+        self,
+        previous: ContentSubmission,
+        filename: str,
+        user_id: UUID
+    ) -> Dict:
+        """Record a new submission carrying an earlier check's result, pointing back to the original"""
+        source_submission_id = previous.source_submission_id or previous.submission_id
+        submission = ContentSubmission(
+            user_id=user_id,
+            input_type=InputType.DOCUMENT,
+            input_reference=filename,
+            final_content=previous.final_content,
+            compliance_status=previous.compliance_status,
+            rules_triggered=previous.rules_triggered,
+            violations=previous.violations,
+            file_hash=previous.file_hash,
+            rule_set_version=previous.rule_set_version,
+            reviewer_model=previous.reviewer_model,
+            source_submission_id=source_submission_id
         )
         
         self.db.add(submission)
-        self.db.commit()
-        self.db.refresh(submission)
+        await self.db.commit()
+        await self.db.refresh(submission)
         
-        # Audit log
-        AuditService.log_action(
+        await AuditService.log_action(
             self.db,
             action_type="document_checked",
             actor_id=user_id,
             resource_type="content",
             resource_id=submission.submission_id,
-            decision_summary=f"Checked document: {len(violations)} violations found"
+            decision_summary=(
+                f"Checked document: {len(previous.violations)} violations found "
+                f"(identical to submission {source_submission_id})"
+            )
         )
         
         return {
             "submission_id": submission.submission_id,
-            "compliance_status": compliance_status,
-            "violations": violations,
-            "rules_triggered": rules_triggered
+            "compliance_status": submission.compliance_status,
+            "violations": submission.violations,
+            "rules_triggered": submission.rules_triggered or [],
+            "source_submission_id": source_submission_id
         }
     
     async def rewrite_compliant(
@@ -134,107 +433,82 @@ Provide a compliant version that preserves the original meaning while fixing vio
         
         return result["content"]
     
-    def _extract_document_text(self, file_content: bytes, filename: str) -> tuple:
-        """Extract text from various document formats"""
-        
-        ext = filename.lower().split('.')[-1]
-        
-        try:
-            if ext == 'pdf':
-                return self._extract_pdf(file_content)
-            elif ext in ['docx', 'doc']:
-                return self._extract_docx(file_content)
-            elif ext in ['txt', 'md']:
-                text = file_content.decode('utf-8')
-                return text, {"format": "text"}
-            else:
-                raise ValueError(f"Unsupported file format: {ext}")
-        except Exception as e:
-            raise Exception(f"Failed to extract text from document: {str(e)}")
-    
-    def _extract_pdf(self, pdf_content: bytes) -> tuple:
-        """Extract text from PDF with page metadata"""
-        pdf_file = io.BytesIO(pdf_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        text = ""
-        page_map = {}
-        
-        for page_num, page in enumerate(pdf_reader.pages, 1):
-            page_text = page.extract_text()
-            page_map[len(text)] = page_num
-            text += f"\n[PAGE {page_num}]\n{page_text}"
-        
-        return text, {"format": "pdf", "page_map": page_map, "total_pages": len(pdf_reader.pages)}
-    
-    def _extract_docx(self, docx_content: bytes) -> tuple:
-        """Extract text from DOCX with paragraph metadata"""
-        doc_file = io.BytesIO(docx_content)
-        doc = docx.Document(doc_file)
-        
-        text = "\n\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-        
-        return text, {"format": "docx", "paragraphs": len(doc.paragraphs)}
+    @staticmethod
+    def _hash_source(source: DocumentSource) -> str:
+        """SHA-256 of a document, read from disk in blocks when given a path"""
+        digest = hashlib.sha256()
+        if isinstance(source, bytes):
+            digest.update(source)
+        else:
+            with open(source, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+        return digest.hexdigest()
     
-    def _chunk_by_tokens(
+    async def _load_document(
         self,
-        text: str,
-        metadata: Dict,
-        chunk_size: int = 512,
-        overlap: int = 50
-    ) -> List[Dict]:
-        """Chunk text by tokens while preserving legal meaning"""
+        source: DocumentSource,
+        filename: str,
+        file_hash: str,
+        rule_set: RuleSetSnapshot
+    ) -> Tuple[str, List[Dict], List[Dict]]:
+        """Leading text, token chunks and document-level rule violations of a document
         
-        tokens = self.tokenizer.encode(text)
-        chunks = []
+        Pages are streamed from the document processor into the chunker and
+        the document-level rule check, and only the first FINAL_CONTENT_CHARS
+        characters are kept, so the whole text is never held; the chunks are
+        (they are reviewed next). Results are cached by file hash, with the
+        document-level violations per set of document-level rules: other rule
+        changes reuse the entry, while a change to required phrases or length
+        limits extracts the document again. Cache reads and writes (JSON of
+        all chunks, SQLite I/O) run in a thread, off the event loop.
+        """
+        # The extension selects the parser and the chunk settings shape the chunks
+        key = f"{file_hash}:{filename.lower().split('.')[-1]}:{self.CHUNK_SIZE}:{self.CHUNK_OVERLAP}"
+        rules_key = rule_set.evaluator.document_rules_key
+        if self.extraction_cache is not None:
+            cached = await asyncio.to_thread(self.extraction_cache.get, key)
+            if cached is not None and rules_key in cached.get("document_violations", {}):
+                return cached["preview"], cached["chunks"], cached["document_violations"][rules_key]
         
-        # Extract page markers if PDF
-        page_map = metadata.get("page_map", {})
+        preview = ""
+        chunks = []
+        checker = rule_set.evaluator.document_checker()
+        async for page_text, page_chunks in self.document_processor.iter_document(
+            source, filename, self.CHUNK_SIZE, self.CHUNK_OVERLAP
+        ):
+            if len(preview) < self.FINAL_CONTENT_CHARS:
+                preview += page_text[:self.FINAL_CONTENT_CHARS - len(preview)]
+            checker.feed(page_text)
+            chunks.extend(page_chunks)
+        document_violations = checker.finish()
         
-        start = 0
-        while start < len(tokens):
-            end = min(start + chunk_size, len(tokens))
-            chunk_tokens = tokens[start:end]
-            chunk_text = self.tokenizer.decode(chunk_tokens)
-            
-            # Determine page number for this chunk
-            page_num = None
-            if page_map:
-                char_pos = len(self.tokenizer.decode(tokens[:start]))
-                for pos, page in sorted(page_map.items(), reverse=True):
-                    if char_pos >= pos:
-                        page_num = page
-                        break
-            
-            # Extract section header if present
-            section = self._extract_section_header(chunk_text)
-            
-            chunks.append({
-                "text": chunk_text.strip(),
-                "tokens": len(chunk_tokens),
-                "page": page_num,
-                "section": section,
-                "start_token": start,
-                "end_token": end
+        if self.extraction_cache is not None:
+            await asyncio.to_thread(self.extraction_cache.set, key, {
+                "preview": preview,
+                "chunks": chunks,
+                "document_violations": {rules_key: document_violations}
             })
-            
-            start = end - overlap if end < len(tokens) else end
-        
-        return chunks
+        return preview, chunks, document_violations
     
     async def _check_chunk_compliance(
         self,
         chunk: Dict,
-        rules: List[Rule]
+        rules: Sequence[RuleSnapshot],
+        rule_set: RuleSetSnapshot
     ) -> List[Dict]:
-        """Check a chunk against all rules using LLM for accuracy"""
+        """Check a chunk against its relevant rules using LLM for accuracy
+        
+        Raises on LLM failure; the review engine retries and applies the
+        keyword fallback per chunk.
+        """
         
         # We use LLM for checking to avoid false positives from simple keyword matching
-        rules_text = "\n".join([f"- {r.rule_text}" for r in rules])
+        rules_text = rule_set.format_rules(rules)
         
         review_schema = {
             "compliance_issues": [
-                {"rule_violated": "string", "severity": "string", "category": "string", "explanation": "string"}
+                {"rule_id": "string", "explanation": "string"}
             ]
         }
         
@@ -253,7 +527,107 @@ INSTRUCTIONS:
 1. Identify specific violations of the regulations.
 2. Return ONLY violations that are clearly present.
 3. If no violations, return empty list.
-4. Categorize each violation (e.g. BRAND, IRDAI, SEO).
+4. Reference each violated regulation by its ID from the list (e.g. "R3F9A1C"); do not repeat the regulation text.
+"""
+        
+        result = await self.llm_provider.generate_structured(
+            prompt=review_prompt,
+            system_prompt="You are a strict but fair compliance auditor.",
+            response_schema=review_schema
+        )
+        
+        violations = self._issues_to_violations(result.get("compliance_issues", []), rule_set)
+        await self._store_verdicts([(chunk, rules)], [violations], rule_set)
+        return violations
+    
+    def _build_review_batches(
+        self,
+        items: List[Tuple[Dict, Sequence[RuleSnapshot]]]
+    ) -> List[List[Tuple[Dict, Sequence[RuleSnapshot]]]]:
+        """Group consecutive chunks into batches that fit the batch token budget
+        
+        A batch's cost is its chunk tokens plus the tokens of the union of
+        its chunks' rules, since each rule is listed once per prompt.
+        """
+        budget = settings.COMPLIANCE_BATCH_TOKEN_BUDGET
+        max_chunks = max(1, settings.COMPLIANCE_BATCH_MAX_CHUNKS)
+        rule_tokens: Dict[str, int] = {}
+        
+        def cost_of(rule: RuleSnapshot) -> int:
+            key = str(rule.rule_id)
+            if key not in rule_tokens:
+                rule_tokens[key] = len(self.tokenizer.encode(rule.rule_text))
+            return rule_tokens[key]
+        
+        batches = []
+        batch, batch_rules, used = [], set(), 0
+        for chunk, rules in items:
+            chunk_cost = chunk.get("tokens") or len(self.tokenizer.encode(chunk["text"]))
+            cost = chunk_cost + sum(cost_of(r) for r in rules if str(r.rule_id) not in batch_rules)
+            
+            if batch and (used + cost > budget or len(batch) >= max_chunks):
+                batches.append(batch)
+                batch, batch_rules, used = [], set(), 0
+                cost = chunk_cost + sum(cost_of(r) for r in rules)
+            
+            batch.append((chunk, rules))
+            batch_rules.update(str(r.rule_id) for r in rules)
+            used += cost
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def _check_batch_compliance(
+        self,
+        batch: List[Tuple[Dict, Sequence[RuleSnapshot]]],
+        rule_set: RuleSetSnapshot
+    ) -> List[List[Dict]]:
+        """Check several labelled chunks in one LLM call, returning violations per chunk
+        
+        If the response cannot be parsed or split back per chunk (typically a
+        truncated answer for a large batch), the batch is halved and each half
+        retried, down to single chunks. Other errors propagate to the review
+        engine's retry and fallback handling.
+        """
+        if len(batch) == 1:
+            chunk, rules = batch[0]
+            return [await self._check_chunk_compliance(chunk, rules, rule_set)]
+        
+        # Each rule is listed once even when several chunks selected it
+        rules = list({str(r.rule_id): r for _, chunk_rules in batch for r in chunk_rules}.values())
+        rules_text = rule_set.format_rules(rules)
+        chunk_ids = [f"C{i + 1}" for i in range(len(batch))]
+        sections_text = "\n\n".join([
+            f"[{chunk_id}]\n\"\"\"\n{chunk['text']}\n\"\"\""
+            for chunk_id, (chunk, _) in zip(chunk_ids, batch)
+        ])
+        
+        review_schema = {
+            "results": [
+                {
+                    "chunk_id": "string",
+                    "compliance_issues": [
+                        {"rule_id": "string", "explanation": "string"}
+                    ]
+                }
+            ]
+        }
+        
+        review_prompt = f"""Role: You are a precise Compliance Auditor.
+Check each of these document sections for compliance violations. Sections are labelled with IDs like [C1].
+
+Sections:
+{sections_text}
+
+Active Regulations:
+{rules_text}
+
+INSTRUCTIONS:
+1. Review every section independently and identify specific violations of the regulations.
+2. Return one entry in "results" per section, with its chunk_id (e.g. "C1").
+3. Return ONLY violations that are clearly present; use an empty list for compliant sections.
+4. Reference each violated regulation by its ID from the list (e.g. "R3F9A1C"); do not repeat the regulation text.
 """
         
         try:
@@ -262,53 +636,140 @@ INSTRUCTIONS:
                 system_prompt="You are a strict but fair compliance auditor.",
                 response_schema=review_schema
             )
-            
-            violations = []
-            for issue in result.get("compliance_issues", []):
-                # Find matching rule object if possible, otherwise use generic
-                matched_rule = next((r for r in rules if r.rule_text in issue.get("rule_violated", "")), None)
-                
+            issues_by_chunk = self._split_batch_result(result, chunk_ids)
+        except StructuredOutputError as e:
+            print(f"⚠️ Batch review of {len(batch)} chunks unparseable, splitting: {str(e)[:200]}")
+            middle = len(batch) // 2
+            halves = await asyncio.gather(
+                self._check_batch_compliance(batch[:middle], rule_set),
+                self._check_batch_compliance(batch[middle:], rule_set)
+            )
+            return halves[0] + halves[1]
+        
+        results = [
+            self._issues_to_violations(issues_by_chunk[chunk_id], rule_set)
+            for chunk_id in chunk_ids
+        ]
+        await self._store_verdicts(batch, results, rule_set)
+        return results
+    
+    def _verdict_key(self, chunk: Dict, rules: Sequence[RuleSnapshot], rule_set: RuleSetSnapshot) -> str:
+        """Content address of a chunk review: normalized text, rules shown, rule set and reviewer model"""
+        normalized = " ".join(chunk["text"].split())
+        text_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        rule_ids = ",".join(sorted(str(r.rule_id) for r in rules))
+        key = "\0".join([
+            self.VERDICT_CACHE_SCHEMA,
+            self.llm_provider.model_name,
+            rule_set.content_hash,
+            rule_ids,
+            text_hash
+        ])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+    
+    async def _get_cached_verdicts(
+        self,
+        items: List[Tuple[Dict, Sequence[RuleSnapshot]]],
+        rule_set: RuleSetSnapshot
+    ) -> List[Optional[List[Dict]]]:
+        """Cached violations per item, None where the chunk still needs review"""
+        if self.verdict_cache is None or not items:
+            return [None for _ in items]
+        keys = [self._verdict_key(chunk, rules, rule_set) for chunk, rules in items]
+        # The disk tier is SQLite, so cache I/O runs off the event loop
+        found = await asyncio.to_thread(self.verdict_cache.get_many, keys)
+        return [found.get(key) for key in keys]
+    
+    async def _store_verdicts(
+        self,
+        items: List[Tuple[Dict, Sequence[RuleSnapshot]]],
+        results: List[List[Dict]],
+        rule_set: RuleSetSnapshot
+    ):
+        """Cache LLM verdicts (fallback results are never stored)"""
+        if self.verdict_cache is None:
+            return
+        await asyncio.to_thread(self.verdict_cache.set_many, {
+            self._verdict_key(chunk, rules, rule_set): violations
+            for (chunk, rules), violations in zip(items, results)
+        })
+    
+    @staticmethod
+    def _split_batch_result(result: Dict, chunk_ids: List[str]) -> Dict[str, List[Dict]]:
+        """Issues per chunk ID; sections the model left out are treated as compliant"""
+        entries = result.get("results") if isinstance(result, dict) else None
+        if not isinstance(entries, list):
+            raise StructuredOutputError("Batch review response has no 'results' list")
+        
+        issues_by_chunk = {chunk_id: [] for chunk_id in chunk_ids}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                raise StructuredOutputError(f"Malformed batch review entry: {entry!r}")
+            chunk_id = str(entry.get("chunk_id", "")).strip("[] ").upper()
+            issues = entry.get("compliance_issues") or []
+            if chunk_id not in issues_by_chunk or not isinstance(issues, list):
+                raise StructuredOutputError(f"Unexpected batch review entry for chunk {chunk_id!r}")
+            issues_by_chunk[chunk_id].extend(i for i in issues if isinstance(i, dict))
+        return issues_by_chunk
+    
+    @staticmethod
+    def _issues_to_violations(issues: List[Dict], rule_set: RuleSetSnapshot) -> List[Dict]:
+        """Convert LLM-reported issues into violation records
+        
+        Issues reference rules by short ID, resolved with one dictionary
+        lookup; unknown IDs are kept as generic AI-detected violations.
+        """
+        violations = []
+        for issue in issues:
+            rule = rule_set.resolve(issue.get("rule_id"))
+            if rule is None:
                 violations.append({
-                    "rule_id": str(matched_rule.rule_id) if matched_rule else "ai_detected",
-                    "rule_text": issue.get("rule_violated"),
-                    "category": issue.get("category", "GENERAL").upper(),
-                    "severity": issue.get("severity", "MEDIUM").upper(),
+                    "rule_id": "ai_detected",
+                    "rule_text": issue.get("rule_violated") or f"Unlisted rule {issue.get('rule_id')}",
+                    "category": str(issue.get("category", "GENERAL")).upper(),
+                    "severity": str(issue.get("severity", "MEDIUM")).upper(),
                     "status": "violated",
                     "explanation": issue.get("explanation")
                 })
+                continue
             
-            return violations
-
-        except Exception as e:
-            print(f"Chunk AI review failed: {str(e)}")
-            # Fallback to keyword matching if LLM fails
-            return self._check_rule_violation_keywords(chunk["text"], rules)
+            violations.append({
+                "rule_id": str(rule.rule_id),
+                "rule_text": rule.rule_text,
+                "category": rule.category.value,
+                "severity": rule.severity.value,
+                "status": "violated",
+                "explanation": issue.get("explanation")
+            })
+        
+        return violations
             
-    def _check_rule_violation_keywords(self, text: str, rules: List[Rule]) -> List[Dict]:
-        """Fallback keyword matching"""
+    def _check_rule_violation_keywords(self, text: str, rules: RuleSetSnapshot) -> List[Dict]:
+        """Fallback keyword matching, used for a chunk whose LLM review failed
+        
+        Negative semantic rules (must not / never / prohibited) are reported
+        as violated when one of their keywords occurs in the text, in a single
+        pass of the rule set's keyword automaton.
+        """
         violations = []
-        text_lower = text.lower()
-        for rule in rules:
-             # Very simple negative check
-             if "must not" in rule.rule_text.lower() or "prohibited" in rule.rule_text.lower():
-                 # This is a placeholder for the previous logic, kept simple for fallback
-                 pass
+        for rule_id, hits in rules.keyword_automaton.match(text).items():
+            rule = rules.get(rule_id)
+            keywords = sorted({keyword for _, _, keyword in hits})
+            violations.append({
+                "rule_id": rule_id,
+                "rule_text": rule.rule_text,
+                "category": rule.category.value,
+                "severity": rule.severity.value,
+                "status": "violated",
+                "explanation": f"Keyword match (LLM review unavailable): {', '.join(repr(k) for k in keywords)}",
+                "matches": [{"keyword": keyword, "start": start, "end": end} for start, end, keyword in hits]
+            })
         return violations
 
-    def _check_rule_violation(self, text: str, rule: Rule) -> bool:
+    def _check_rule_violation(self, text: str, rule: RuleSnapshot) -> bool:
         """Deprecated: Use LLM instead"""
         return False
     
     @staticmethod
     def _extract_forbidden_terms(rule_text: str) -> List[str]:
         return []
-
-    @staticmethod
-    def _extract_section_header(text: str) -> Optional[str]:
-        """Extract section header from text chunk"""
-        lines = text.split('\n')
-        for line in lines[:3]:  # Check first 3 lines
-            line = line.strip()
-            if line and (line.isupper() or line.startswith('[PAGE')):
-                return line[:100]
-        return None
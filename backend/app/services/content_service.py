@@ -1,11 +1,14 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.content import ContentSubmission, ComplianceStatus, InputType
-from app.models.rule import Rule
+from app.services.rule_cache import ActiveRuleCache, active_rule_cache
+from app.services.rule_set import RuleSetSnapshot, RuleSnapshot
+from app.services.rule_relevance import RuleRelevanceRanker
 from app.providers.llm_provider import LLMProvider
 from app.providers.vector_provider import VectorProvider
 from app.services.audit_service import AuditService
+from app.services.stage_graph import StageGraph
 from uuid import UUID
-from typing import List, Dict
+from typing import AsyncIterator, Dict, Optional, Sequence, Tuple
 
 
 class ContentService:
@@ -13,15 +16,22 @@ class ContentService:
     
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
         generator_llm: LLMProvider,
         reviewer_llm: LLMProvider,
-        vector_provider: VectorProvider
+        vector_provider: VectorProvider,
+        rule_cache: Optional[ActiveRuleCache] = None,
+        rule_relevance: Optional[RuleRelevanceRanker] = None
     ):
         self.db = db
         self.generator_llm = generator_llm
         self.reviewer_llm = reviewer_llm
         self.vector_provider = vector_provider
+        self.rule_cache = rule_cache or active_rule_cache
+        self.rule_relevance = rule_relevance or RuleRelevanceRanker(
+            embedding_provider=generator_llm,
+            vector_provider=vector_provider
+        )
     
     async def generate_content(
         self,
@@ -31,46 +41,123 @@ class ContentService:
     ) -> Dict:
         """Generate compliant content from prompt
         
-        Flow:
-        1. Optional prompt enhancement
-        2. Load active rules
-        3. Retrieve regulatory context from Pinecone
-        4. Generate content
-        5. AI reviewer checks output
-        6. Deterministic rule validation
-        7. Store submission
+        Stages (see `_generation_graph`), each started as soon as its inputs are ready:
+        1. Optional prompt enhancement, while the active rules load
+        2. Regulatory context from Pinecone, while the rules relevant to the prompt are selected
+        3. Generate content
+        4. Deterministic rule validation (local, no LLM), while the AI reviewer
+           checks the output against the remaining semantic rules
+        5. Store submission
+        
+        The result carries per-stage `timings` and their critical path.
         """
+        graph = self._generation_graph(prompt, use_prompt_enhancer)
+        # Step 3: Generate content with compliance constraints
+        graph.add(
+            "generate",
+            lambda enhance_prompt, select_rules, retrieve_context: self._generate_with_compliance(
+                enhance_prompt, select_rules, retrieve_context
+            ),
+            "enhance_prompt", "select_rules", "retrieve_context"
+        )
+        self._add_review_stages(graph, user_id)
         
-        # Step 1: Enhance prompt if requested
-        if use_prompt_enhancer:
-            prompt = await self._enhance_prompt(prompt)
+        results = await graph.run()
+        return dict(results["store"], timings=graph.summary())
+    
+    async def generate_content_stream(
+        self,
+        prompt: str,
+        user_id: UUID,
+        use_prompt_enhancer: bool = False
+    ) -> AsyncIterator[Dict]:
+        """Generate content like `generate_content`, yielding tokens as the model produces them
         
-        # Step 2: Load active rules
-        active_rules = self.db.query(Rule).filter(Rule.is_active == True).all()
+        Events, in order:
+        - {"type": "token", "text": ...} for each fragment of generated text
+        - {"type": "verdict", "result": ...} once, after the finished text has
+          been validated, reviewed and stored; `result` is what
+          `generate_content` returns
         
-        # Step 3: Retrieve regulatory context
-        regulatory_context = await self._retrieve_regulatory_context(prompt, active_rules)
+        Tokens are unreviewed until the verdict arrives.
+        """
+        graph = self._generation_graph(prompt, use_prompt_enhancer)
+        context = await graph.run("enhance_prompt", "select_rules", "retrieve_context")
+        
+        # Generation streams here rather than in the graph; it is recorded as the same stage
+        started = graph.now()
+        parts = []
+        async for text in self.generator_llm.generate_stream(
+            prompt=context["enhance_prompt"],
+            system_prompt=self._build_generation_prompt(context["select_rules"], context["retrieve_context"]),
+            temperature=0.7,
+            max_tokens=1500
+        ):
+            parts.append(text)
+            yield {"type": "token", "text": text}
+        graph.complete("generate", "".join(parts), started, "enhance_prompt", "select_rules", "retrieve_context")
+        
+        self._add_review_stages(graph, user_id)
+        results = await graph.run()
+        yield {"type": "verdict", "result": dict(results["store"], timings=graph.summary())}
+    
+    def _generation_graph(self, prompt: str, use_prompt_enhancer: bool) -> StageGraph:
+        """Stages that prepare generation
         
-        # Step 4: Generate content with compliance constraints
-        generated_content = await self._generate_with_compliance(
-            prompt, 
-            active_rules, 
-            regulatory_context
+        enhance_prompt ──┬──────────────── retrieve_context
+        load_rules ──────┴─ select_rules
+        """
+        graph = StageGraph(pipeline="generate_content")
+        # Step 1: Enhance prompt if requested, while the compiled active rule set (shared snapshot) loads
+        graph.add("enhance_prompt", lambda: self._enhance_prompt(prompt) if use_prompt_enhancer else prompt)
+        graph.add("load_rules", lambda: self.rule_cache.get_rule_set(self.db))
+        # Step 2: Regulatory context and the rules to send with the prompt
+        graph.add("retrieve_context", lambda enhance_prompt: self._retrieve_regulatory_context(enhance_prompt), "enhance_prompt")
+        graph.add(
+            "select_rules",
+            lambda enhance_prompt, load_rules: self._select_generation_rules(enhance_prompt, load_rules),
+            "enhance_prompt", "load_rules"
         )
-        
-        # Step 5: AI reviewer check
-        review_result = await self._ai_review(generated_content, active_rules)
-        
-        # Step 6: Deterministic rule validation
-        validation_result = self._validate_against_rules(generated_content, active_rules)
-        
-        # Step 7: Determine compliance status
+        return graph
+    
+    def _add_review_stages(self, graph: StageGraph, user_id: UUID):
+        """Stages after generation: validate and review concurrently, then store"""
+        # Step 4: Deterministic rule validation alongside the AI reviewer check
+        graph.add(
+            "validate",
+            lambda generate, load_rules: self._validate_against_rules(generate, load_rules),
+            "generate", "load_rules"
+        )
+        graph.add(
+            "review",
+            lambda generate, load_rules: self._ai_review(generate, load_rules),
+            "generate", "load_rules"
+        )
+        # Step 5: Store submission
+        graph.add(
+            "store",
+            lambda enhance_prompt, generate, load_rules, validate, review: self._store_submission(
+                enhance_prompt, generate, load_rules, validate, review, user_id
+            ),
+            "enhance_prompt", "generate", "load_rules", "validate", "review"
+        )
+    
+    async def _store_submission(
+        self,
+        prompt: str,
+        generated_content: str,
+        rule_set: RuleSetSnapshot,
+        validation_result: Dict,
+        review_result: Dict,
+        user_id: UUID
+    ) -> Dict:
+        """Determine compliance status, then store and audit the submission"""
         compliance_status, rules_triggered = self._determine_compliance_status(
             review_result,
-            validation_result
+            validation_result,
+            rule_set
         )
         
-        # Step 8: Store submission
         submission = ContentSubmission(
             user_id=user_id,
             input_type=InputType.PROMPT,
@@ -81,11 +168,11 @@ class ContentService:
         )
         
         self.db.add(submission)
-        self.db.commit()
-        self.db.refresh(submission)
+        await self.db.commit()
+        await self.db.refresh(submission)
         
         # Audit log
-        AuditService.log_action(
+        await AuditService.log_action(
             self.db,
             action_type="content_generated",
             actor_id=user_id,
@@ -121,7 +208,7 @@ Return only the enhanced prompt, nothing else."""
         
         return result["content"].strip()
     
-    async def _retrieve_regulatory_context(self, prompt: str, rules: List[Rule]) -> str:
+    async def _retrieve_regulatory_context(self, prompt: str) -> str:
         """Retrieve relevant regulatory context from Pinecone"""
         try:
             # Create embedding for prompt
@@ -148,16 +235,27 @@ Return only the enhanced prompt, nothing else."""
     async def _generate_with_compliance(
         self,
         prompt: str,
-        rules: List[Rule],
+        rules: Sequence[RuleSnapshot],
         regulatory_context: str
     ) -> str:
         """Generate content with compliance constraints"""
+        result = await self.generator_llm.generate(
+            prompt=prompt,
+            system_prompt=self._build_generation_prompt(rules, regulatory_context),
+            temperature=0.7,
+            max_tokens=1500
+        )
+        
+        return result["content"]
+    
+    async def _select_generation_rules(self, prompt: str, rule_set: RuleSetSnapshot) -> Tuple[RuleSnapshot, ...]:
+        """Rules most relevant to the prompt (deterministic ones included as guidance)"""
+        return (await self.rule_relevance.select(rule_set, [prompt], semantic_only=False))[0]
+    
+    def _build_generation_prompt(self, rules: Sequence[RuleSnapshot], regulatory_context: str) -> str:
+        """Generator system prompt carrying the selected rules"""
         
-        # Build system prompt with rules
-        rules_text = "\n".join([
-            f"- [{r.severity.value}] {r.rule_text}" 
-            for r in rules[:10]  # Top 10 most relevant
-        ])
+        rules_text = "\n".join([f"- [{r.severity.value}] {r.rule_text}" for r in rules])
         
         system_prompt = f"""You are a specialized Insurance Compliance Content Generator for Bajaj Allianz.
 
@@ -183,23 +281,21 @@ Think step-by-step:
 - Final Output: The clean, compliant text.
 """
         
-        result = await self.generator_llm.generate(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            temperature=0.7,
-            max_tokens=1500
-        )
-        
-        return result["content"]
+        return system_prompt
     
-    async def _ai_review(self, content: str, rules: List[Rule]) -> Dict:
+    async def _ai_review(self, content: str, rule_set: RuleSetSnapshot) -> Dict:
         """AI reviewer model checks content for risks"""
         
-        rules_text = "\n".join([f"- {r.rule_text}" for r in rules[:15]])
+        # Every active rule is deterministic - nothing left for the reviewer
+        if not rule_set.semantic_rules:
+            return {"compliance_issues": [], "risk_level": "LOW", "recommendations": []}
+        
+        rules = (await self.rule_relevance.select(rule_set, [content]))[0]
+        rules_text = rule_set.format_rules(rules)
         
         review_schema = {
             "compliance_issues": [
-                {"rule_violated": "string", "severity": "string", "explanation": "string"}
+                {"rule_id": "string", "explanation": "string"}
             ],
             "risk_level": "string",  # LOW, MEDIUM, HIGH
             "recommendations": ["string"]
@@ -223,6 +319,7 @@ INSTRUCTIONS:
 4. **Logic Check**: If a rule says "Must not use fear", and the tone is neutral, it is COMPLIANT. 
 5. **Channel Checks**: If a rule mandates "official channels only", assume the platform generating this IS an official channel. Do not flag this unless the content explicitly tells users to use unofficial channels (e.g. "WhatsApp me personally").
 6. false positives are UNACCEPTABLE. If you are unsure, err on the side of COMPLIANT.
+7. Reference each violated rule by its ID from the list (e.g. "R3F9A1C"); do not repeat the rule text.
 
 Analyze carefully. Only report clear, material violations."""
         
@@ -237,29 +334,33 @@ Analyze carefully. Only report clear, material violations."""
             print(f"AI review failed: {str(e)}")
             return {"compliance_issues": [], "risk_level": "UNKNOWN", "recommendations": []}
     
-    def _validate_against_rules(self, content: str, rules: List[Rule]) -> Dict:
+    def _validate_against_rules(self, content: str, rule_set: RuleSetSnapshot) -> Dict:
         """Deterministic rule validation using pattern matching"""
         
-        violations = []
+        # Executable rules (forbidden/required phrases, regex, length limits)
+        violations = rule_set.evaluator.evaluate(content)
         triggered = []
         
-        content_lower = content.lower()
+        # Single pass over the content for every negative rule's keywords
+        keyword_hits = rule_set.keyword_automaton.match(content)
         
-        for rule in rules:
-            # Simple keyword-based checking (can be enhanced with regex)
-            rule_lower = rule.rule_text.lower()
+        for matcher in rule_set.keyword_matchers:
+            rule = matcher.rule
             
-            # Extract keywords from rule (simplified)
-            if "must not" in rule_lower or "never" in rule_lower or "prohibited" in rule_lower:
+            if matcher.negative:
                 # Negative rule - check if forbidden content present
-                forbidden_keywords = self._extract_keywords(rule_lower, negative=True)
-                if any(kw in content_lower for kw in forbidden_keywords):
+                hits = keyword_hits.get(str(rule.rule_id))
+                if hits:
                     violations.append({
                         "rule_id": str(rule.rule_id),
                         "rule_text": rule.rule_text,
                         "category": rule.category.value,
                         "severity": rule.severity.value,
-                        "status": "violated"
+                        "status": "violated",
+                        "matches": [
+                            {"keyword": keyword, "start": start, "end": end}
+                            for start, end, keyword in hits
+                        ]
                     })
             else:
                 # Positive rule - just mark as triggered for awareness
@@ -279,7 +380,8 @@ Analyze carefully. Only report clear, material violations."""
     def _determine_compliance_status(
         self,
         ai_review: Dict,
-        validation_result: Dict
+        validation_result: Dict,
+        rule_set: RuleSetSnapshot
     ) -> tuple:
         """Determine final compliance status"""
         
@@ -288,13 +390,23 @@ Analyze carefully. Only report clear, material violations."""
         # Add violations
         all_rules_triggered.extend(validation_result.get("violations", []))
         
-        # Add AI-detected issues
+        # Add AI-detected issues, resolving the reviewer's rule IDs in O(1)
         for issue in ai_review.get("compliance_issues", []):
+            rule = rule_set.resolve(issue.get("rule_id"))
+            if rule is None:
+                all_rules_triggered.append({
+                    "rule_id": "ai_detected",
+                    "rule_text": issue.get("rule_violated") or f"Unlisted rule {issue.get('rule_id')}",
+                    "category": "AI_REVIEW",
+                    "severity": issue.get("severity", "MEDIUM"),
+                    "status": "violated"
+                })
+                continue
             all_rules_triggered.append({
-                "rule_id": "ai_detected",
-                "rule_text": issue.get("rule_violated", ""),
-                "category": "AI_REVIEW",
-                "severity": issue.get("severity", "MEDIUM"),
+                "rule_id": str(rule.rule_id),
+                "rule_text": rule.rule_text,
+                "category": rule.category.value,
+                "severity": rule.severity.value,
                 "status": "violated"
             })
         
@@ -310,12 +422,3 @@ Analyze carefully. Only report clear, material violations."""
         status = ComplianceStatus.VIOLATIONS if has_violations else ComplianceStatus.COMPLIANT
         
         return status, all_rules_triggered
-    
-    @staticmethod
-    def _extract_keywords(rule_text: str, negative: bool = False) -> List[str]:
-        """Extract keywords from rule for matching (simplified)"""
-        # This is a basic implementation - can be enhanced with NLP
-        stop_words = {"must", "not", "never", "should", "be", "the", "a", "an", "is", "prohibited", "forbidden"}
-        words = rule_text.lower().split()
-        keywords = [w.strip(".,;:!?") for w in words if w not in stop_words and len(w) > 3]
-        return keywords[:5]  # Top 5 keywords
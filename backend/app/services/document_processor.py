@@ -0,0 +1,239 @@
+from app.services.token_chunker import StreamingTokenChunker
+from app.core.config import settings
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+import asyncio
+import multiprocessing
+import threading
+import PyPDF2
+import docx
+import io
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory limits are skipped there
+    resource = None
+
+
+# Worker-side functions. They run in pool processes, so they only take and
+# return picklable values and never touch the event loop or shared clients.
+
+_tokenizer = None
+
+# A document is either a file path (opened by the worker itself, nothing is
+# copied between processes) or its bytes
+DocumentSource = Union[str, bytes]
+
+
+def _init_worker(memory_limit_mb: int):
+    """Cap the worker's address space so one pathological file cannot exhaust the host"""
+    if memory_limit_mb > 0 and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _get_tokenizer():
+    """Tokenizer loaded once per worker process"""
+    global _tokenizer
+    if _tokenizer is None:
+        import tiktoken
+        _tokenizer = tiktoken.get_encoding("cl100k_base")
+    return _tokenizer
+
+
+def _open(source: DocumentSource):
+    """Path or seekable stream accepted by the PDF/DOCX readers"""
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+def _count_pdf_pages(source: DocumentSource) -> int:
+    return len(PyPDF2.PdfReader(_open(source)).pages)
+
+
+def _extract_pdf_pages(source: DocumentSource, start: int, end: int) -> List[str]:
+    """Text of pages [start, end) of a PDF"""
+    pages = PyPDF2.PdfReader(_open(source)).pages
+    return [pages[i].extract_text() for i in range(start, min(end, len(pages)))]
+
+
+def _tokenize_pdf_pages(source: DocumentSource, start: int, end: int) -> List[Tuple[int, str, List[int]]]:
+    """(page number, page text with its [PAGE n] marker, tokens) for pages [start, end)"""
+    pages = []
+    for page_num, page_text in enumerate(_extract_pdf_pages(source, start, end), start + 1):
+        page_text = f"\n[PAGE {page_num}]\n{page_text}"
+        pages.append((page_num, page_text, _get_tokenizer().encode(page_text)))
+    return pages
+
+
+def _extract_docx(source: DocumentSource) -> str:
+    """Extract paragraph text from DOCX"""
+    doc = docx.Document(_open(source))
+    return "\n\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+
+
+def _tokenize_document(source: DocumentSource, ext: str) -> Tuple[str, List[int]]:
+    """Text and tokens of a single-section (DOCX or plain text) document"""
+    if ext in ['docx', 'doc']:
+        text = _extract_docx(source)
+    elif isinstance(source, str):
+        with open(source, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        text = source.decode('utf-8')
+    return text, _get_tokenizer().encode(text)
+
+
+class DocumentProcessor:
+    """CPU-bound document work (extraction, tokenization) off the event loop
+
+    Work runs in a process pool, so parsing a large PDF does not stall other
+    requests on the worker and is not serialized by the GIL. PDFs with more
+    than DOCUMENT_PDF_PAGES_PER_TASK pages are split into page ranges parsed
+    by several processes at once; pages are streamed back in order as their
+    range completes. Each pool process has an address-space limit
+    (DOCUMENT_PROCESS_MEMORY_LIMIT_MB) and is recycled after
+    DOCUMENT_PROCESS_MAX_TASKS_PER_CHILD tasks.
+
+    With DOCUMENT_PROCESS_WORKERS = 0 the same functions run in the default
+    thread pool instead, which keeps the event loop free but shares the GIL.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        memory_limit_mb: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None
+    ):
+        self.max_workers = settings.DOCUMENT_PROCESS_WORKERS if max_workers is None else max_workers
+        self.memory_limit_mb = (
+            settings.DOCUMENT_PROCESS_MEMORY_LIMIT_MB if memory_limit_mb is None else memory_limit_mb
+        )
+        self.pages_per_task = max(1, pages_per_task or settings.DOCUMENT_PDF_PAGES_PER_TASK)
+        self.max_tasks_per_child = (
+            settings.DOCUMENT_PROCESS_MAX_TASKS_PER_CHILD if max_tasks_per_child is None else max_tasks_per_child
+        )
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Optional[Executor]:
+        """The process pool, created on first use (None runs work in the default thread pool)"""
+        if self.max_workers <= 0:
+            return None
+        executor = self._executor
+        if executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # Spawned (not forked) workers do not inherit the parent's threads, locks or sockets
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self.memory_limit_mb,),
+                        max_tasks_per_child=self.max_tasks_per_child or None
+                    )
+                executor = self._executor
+        return executor
+
+    async def _run(self, fn, *args):
+        """Run a worker function in the pool; a crashed pool is replaced for the next call"""
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            if executor is not None:
+                executor.shutdown(wait=False)
+            raise Exception(
+                "Document processing worker died (file too large or exceeded "
+                f"{self.memory_limit_mb} MB memory limit)"
+            )
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    async def _iter_page_ranges(self, fn: Callable, source: DocumentSource) -> AsyncIterator[List]:
+        """Results of `fn(source, start, end)` per PDF page range, in page order
+
+        Ranges are processed concurrently, but only a small window is in
+        flight at a time, so finished pages never pile up ahead of the consumer.
+        """
+        total_pages = await self._run(_count_pdf_pages, source)
+        window = max(1, self.max_workers) + 1
+        pending = deque()
+        try:
+            for start in range(0, total_pages, self.pages_per_task):
+                pending.append(asyncio.ensure_future(self._run(fn, source, start, start + self.pages_per_task)))
+                if len(pending) >= window:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def iter_pdf_pages(self, source: DocumentSource) -> AsyncIterator[Tuple[int, str]]:
+        """Yield (page number, text) for every page of a PDF, in page order"""
+        page_num = 0
+        async for page_texts in self._iter_page_ranges(_extract_pdf_pages, source):
+            for page_text in page_texts:
+                page_num += 1
+                yield page_num, page_text
+
+    async def iter_document(
+        self,
+        source: DocumentSource,
+        filename: str,
+        chunk_size: int = 512,
+        overlap: int = 50
+    ) -> AsyncIterator[Tuple[str, List[Dict]]]:
+        """Stream a document as (text piece, chunks completed by it)
+
+        PDFs are extracted and tokenized page by page in the pool and fed to a
+        StreamingTokenChunker, so neither the whole document's tokens nor a
+        page offset map are ever held. Joining the text pieces gives the full
+        extracted text (PDF pages carry their [PAGE n] markers). The last item
+        has an empty text piece and flushes the final chunk.
+        """
+        ext = filename.lower().split('.')[-1]
+        chunker = StreamingTokenChunker(_get_tokenizer(), chunk_size, overlap)
+
+        try:
+            if ext == 'pdf':
+                async for pages in self._iter_page_ranges(_tokenize_pdf_pages, source):
+                    for page_num, page_text, tokens in pages:
+                        yield page_text, chunker.feed(tokens, page_num)
+            elif ext in ['docx', 'doc', 'txt', 'md']:
+                text, tokens = await self._run(_tokenize_document, source, ext)
+                yield text, chunker.feed(tokens)
+            else:
+                raise ValueError(f"Unsupported file format: {ext}")
+            yield "", chunker.finish()
+        except Exception as e:
+            raise Exception(f"Failed to extract text from document: {str(e)}")
+
+    async def extract_pdf_text(self, source: DocumentSource, max_chars: Optional[int] = None) -> str:
+        """Plain text of a PDF, one line break after each page
+
+        With `max_chars`, stops parsing once that much text has been read.
+        """
+        parts = []
+        length = 0
+        pages = self.iter_pdf_pages(source)
+        try:
+            async for _, page_text in pages:
+                parts.append(page_text + "\n")
+                length += len(parts[-1])
+                if max_chars is not None and length >= max_chars:
+                    break
+        finally:
+            await pages.aclose()
+        text = "".join(parts)
+        return text if max_chars is None else text[:max_chars]
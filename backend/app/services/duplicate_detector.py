@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.rule import Rule
 from app.providers.llm_provider import LLMProvider
 from app.providers.vector_provider import VectorProvider
@@ -12,7 +13,7 @@ class DuplicateDetector:
     
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
         llm_provider: LLMProvider,
         vector_provider: VectorProvider
     ):
@@ -36,9 +37,9 @@ class DuplicateDetector:
         
         # Phase 1: SQL exact match
         normalized_text = self._normalize_text(rule_text)
-        exact_matches = self.db.query(Rule).filter(
-            Rule.rule_text.ilike(f"%{rule_text}%")
-        ).all()
+        exact_matches = (await self.db.execute(
+            select(Rule).where(Rule.rule_text.ilike(f"%{rule_text}%"))
+        )).scalars().all()
         
         for rule in exact_matches:
             if self._normalize_text(rule.rule_text) == normalized_text:
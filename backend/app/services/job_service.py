@@ -0,0 +1,196 @@
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.job import Job, JobStatus, JobType
+from datetime import datetime, timedelta
+from uuid import UUID
+from typing import Dict, List, Optional
+import os
+import uuid
+
+
+def discard_job_files(payload: Optional[Dict]):
+    """Delete the stored upload of a finished job (payload["path"])"""
+    path = (payload or {}).get("path")
+    if path:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class JobService:
+    """Persistent job queue on the jobs table
+
+    Any number of worker pools (in one or many processes) can claim from the
+    same table: claiming locks the row with SKIP LOCKED, so each job goes to
+    exactly one worker. A claimed job holds a lease that its worker renews;
+    if the worker dies, the job is claimed again once the lease expires and
+    its handler resumes from the last saved progress. Worker-side updates
+    are conditional on still holding the lease.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def submit(
+        self,
+        job_type: JobType,
+        payload: Dict,
+        created_by: UUID,
+        job_id: Optional[UUID] = None
+    ) -> Job:
+        """Queue a job"""
+        job = Job(
+            job_id=job_id or uuid.uuid4(),
+            job_type=job_type,
+            status=JobStatus.QUEUED,
+            created_by=created_by,
+            payload=payload
+        )
+        self.db.add(job)
+        await self.db.commit()
+        await self.db.refresh(job)
+        return job
+
+    async def get(self, job_id: UUID) -> Optional[Job]:
+        return await self.db.get(Job, job_id)
+
+    async def request_cancel(self, job_id: UUID) -> Optional[Job]:
+        """Cancel a queued job now, or ask the worker running it to stop
+
+        Finished jobs are left as they are.
+        """
+        result = await self.db.execute(select(Job).where(Job.job_id == job_id).with_for_update())
+        job = result.scalar_one_or_none()
+        if job is None:
+            return None
+
+        cancelled = job.status == JobStatus.QUEUED
+        if cancelled:
+            job.status = JobStatus.CANCELLED
+            job.finished_at = datetime.utcnow()
+        elif job.status == JobStatus.RUNNING:
+            job.cancel_requested = True
+
+        await self.db.commit()
+        # Only delete the upload once the cancellation is durable
+        if cancelled:
+            discard_job_files(job.payload)
+        await self.db.refresh(job)
+        return job
+
+    async def claim(self, worker_id: str, lease_seconds: float, max_attempts: int) -> Optional[Job]:
+        """Take the oldest runnable job: queued, or running under an expired lease"""
+        now = datetime.utcnow()
+        settled = await self._settle_abandoned(now, max_attempts)
+
+        result = await self.db.execute(
+            select(Job)
+            .where(or_(
+                Job.status == JobStatus.QUEUED,
+                and_(Job.status == JobStatus.RUNNING, Job.locked_until < now)
+            ))
+            .order_by(Job.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalar_one_or_none()
+        if job is not None:
+            job.status = JobStatus.RUNNING
+            job.locked_by = worker_id
+            job.locked_until = now + timedelta(seconds=lease_seconds)
+            job.attempts += 1
+            job.started_at = job.started_at or now
+        await self.db.commit()
+
+        for payload in settled:
+            discard_job_files(payload)
+        if job is not None:
+            await self.db.refresh(job)
+        return job
+
+    async def _settle_abandoned(self, now: datetime, max_attempts: int) -> List[Optional[Dict]]:
+        """Finish expired jobs that must not run again: cancelled, or out of attempts
+
+        Returns their payloads; the caller deletes their files after committing.
+        """
+        payloads = []
+        expired = and_(Job.status == JobStatus.RUNNING, Job.locked_until < now)
+        released = {"locked_by": None, "locked_until": None, "finished_at": now}
+        for condition, values in (
+            (Job.cancel_requested.is_(True), {"status": JobStatus.CANCELLED}),
+            (Job.attempts >= max_attempts, {
+                "status": JobStatus.FAILED,
+                "error": f"Worker lost {max_attempts} times; giving up"
+            }),
+        ):
+            result = await self.db.execute(
+                update(Job)
+                .where(expired, condition)
+                .values(**values, **released)
+                .returning(Job.payload)
+            )
+            payloads.extend(result.scalars())
+        return payloads
+
+    async def heartbeat(self, job_id: UUID, worker_id: str, lease_seconds: float) -> Optional[bool]:
+        """Extend the lease; returns whether cancellation was requested, or None if the lease was lost"""
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.job_id == job_id, Job.locked_by == worker_id, Job.status == JobStatus.RUNNING)
+            .values(locked_until=datetime.utcnow() + timedelta(seconds=lease_seconds))
+            .returning(Job.cancel_requested)
+        )
+        cancel_requested = result.scalar_one_or_none()
+        await self.db.commit()
+        return cancel_requested
+
+    async def save_progress(
+        self,
+        job_id: UUID,
+        worker_id: str,
+        progress: Dict,
+        completed_steps: int,
+        total_steps: Optional[int] = None
+    ) -> bool:
+        """Store the handler's checkpoint; False if the lease was lost"""
+        values = {"progress": progress, "completed_steps": completed_steps}
+        if total_steps is not None:
+            values["total_steps"] = total_steps
+        return await self._update_owned(job_id, worker_id, values)
+
+    async def finish(
+        self,
+        job_id: UUID,
+        worker_id: str,
+        status: JobStatus,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        """Move a running job to a final status and release it"""
+        return await self._update_owned(job_id, worker_id, {
+            "status": status,
+            "result": result,
+            "error": error,
+            "finished_at": datetime.utcnow(),
+            "locked_by": None,
+            "locked_until": None,
+        })
+
+    async def release(self, job_id: UUID, worker_id: str) -> bool:
+        """Put a job back in the queue (worker shutting down) without using up an attempt"""
+        return await self._update_owned(job_id, worker_id, {
+            "status": JobStatus.QUEUED,
+            "attempts": Job.attempts - 1,
+            "locked_by": None,
+            "locked_until": None,
+        })
+
+    async def _update_owned(self, job_id: UUID, worker_id: str, values: Dict) -> bool:
+        result = await self.db.execute(
+            update(Job)
+            .where(Job.job_id == job_id, Job.locked_by == worker_id, Job.status == JobStatus.RUNNING)
+            .values(**values)
+        )
+        await self.db.commit()
+        return result.rowcount > 0
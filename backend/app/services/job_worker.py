@@ -0,0 +1,176 @@
+from app.database import AsyncSessionLocal
+from app.models.job import Job, JobStatus, JobType
+from app.services.job_service import JobService, discard_job_files
+from app.core.config import settings
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+import asyncio
+import os
+import socket
+import time
+
+
+class JobContext:
+    """A running job as seen by its handler: input, saved progress and checkpointing"""
+
+    def __init__(self, pool: "JobWorkerPool", job: Job, worker_id: str):
+        self.job_id: UUID = job.job_id
+        self.job_type: JobType = job.job_type
+        self.created_by: UUID = job.created_by
+        self.payload: Dict = job.payload or {}
+        # Progress saved by an earlier, interrupted attempt (None on the first run)
+        self.progress: Optional[Dict] = job.progress
+        self.attempt: int = job.attempts
+        self._pool = pool
+        self._worker_id = worker_id
+        self._last_checkpoint = 0.0
+
+    async def checkpoint(
+        self,
+        progress: Dict,
+        completed_steps: int,
+        total_steps: Optional[int] = None,
+        force: bool = False
+    ):
+        """Save progress to resume from if this attempt is interrupted
+
+        Writes are throttled to one per JOB_CHECKPOINT_INTERVAL_SECONDS unless
+        `force` is set (for steps that must never be repeated).
+        """
+        now = time.monotonic()
+        if not force and now - self._last_checkpoint < self._pool.checkpoint_interval:
+            return
+        self._last_checkpoint = now
+        async with self._pool.session_factory() as db:
+            await JobService(db).save_progress(self.job_id, self._worker_id, progress, completed_steps, total_steps)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Dict]]
+
+
+class JobWorkerPool:
+    """In-process pool of job workers, started and stopped with the application
+
+    JOB_WORKERS concurrent jobs per process, independent of how many HTTP
+    requests the process serves. Each worker claims a job, runs its handler
+    (which returns the JSON result) and heartbeats the lease meanwhile; a
+    cancellation request or a lost lease stops the handler. On shutdown,
+    running jobs are released back to the queue so the next process resumes
+    them immediately.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[JobType, JobHandler],
+        workers: Optional[int] = None,
+        session_factory=AsyncSessionLocal,
+        poll_interval: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+        heartbeat_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        checkpoint_interval: Optional[float] = None
+    ):
+        self.handlers = handlers
+        self.workers = settings.JOB_WORKERS if workers is None else workers
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval or settings.JOB_POLL_INTERVAL_SECONDS
+        self.lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        self.heartbeat_interval = heartbeat_interval or settings.JOB_HEARTBEAT_SECONDS
+        self.max_attempts = max_attempts or settings.JOB_MAX_ATTEMPTS
+        self.checkpoint_interval = (
+            settings.JOB_CHECKPOINT_INTERVAL_SECONDS if checkpoint_interval is None else checkpoint_interval
+        )
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def start(self):
+        self._stopping = False
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = [
+            asyncio.create_task(self._work(f"{prefix}:{slot}"))
+            for slot in range(max(0, self.workers))
+        ]
+
+    async def stop(self):
+        """Stop claiming and release running jobs back to the queue"""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, worker_id: str):
+        while not self._stopping:
+            try:
+                async with self.session_factory() as db:
+                    job = await JobService(db).claim(worker_id, self.lease_seconds, self.max_attempts)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Job claim failed: {str(e)}")
+                job = None
+
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            await self._run(job, worker_id)
+
+    async def _run(self, job: Job, worker_id: str):
+        """Run one claimed job to a final status (or release it on shutdown)"""
+        handler = self.handlers.get(job.job_type)
+        if handler is None:
+            await self._finish(job, worker_id, JobStatus.FAILED, error=f"No handler for {job.job_type.value} jobs")
+            return
+
+        task = asyncio.create_task(handler(JobContext(self, job, worker_id)))
+        stop_reason = None
+        try:
+            while not task.done():
+                await asyncio.wait([task], timeout=self.heartbeat_interval)
+                if task.done():
+                    break
+                async with self.session_factory() as db:
+                    cancel_requested = await JobService(db).heartbeat(job.job_id, worker_id, self.lease_seconds)
+                if cancel_requested is None or cancel_requested:
+                    stop_reason = "lost" if cancel_requested is None else "cancelled"
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+        except asyncio.CancelledError:
+            # Application shutdown: hand the job back to the queue with its progress
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            async with self.session_factory() as db:
+                await JobService(db).release(job.job_id, worker_id)
+            raise
+        except Exception as e:
+            # Heartbeat failed (database unavailable): stop the handler and let the lease expire
+            print(f"⚠️ Job {job.job_id} heartbeat failed: {str(e)}")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return
+
+        if stop_reason == "lost":
+            print(f"⚠️ Job {job.job_id} lease lost; another worker has taken it over")
+        elif stop_reason == "cancelled":
+            await self._finish(job, worker_id, JobStatus.CANCELLED)
+        elif task.exception() is not None:
+            await self._finish(job, worker_id, JobStatus.FAILED, error=str(task.exception()))
+        else:
+            await self._finish(job, worker_id, JobStatus.COMPLETED, result=task.result())
+
+    async def _finish(
+        self,
+        job: Job,
+        worker_id: str,
+        status: JobStatus,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ):
+        try:
+            async with self.session_factory() as db:
+                finished = await JobService(db).finish(job.job_id, worker_id, status, result=result, error=error)
+        except Exception as e:
+            print(f"⚠️ Failed to record job {job.job_id} as {status.value}: {str(e)}")
+            return
+        if finished:
+            discard_job_files(job.payload)
@@ -0,0 +1,107 @@
+from collections import deque
+from typing import Dict, Generic, Hashable, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+# (start, end, keyword) with end exclusive, offsets into the scanned text
+KeywordHit = Tuple[int, int, str]
+
+
+class KeywordAutomaton(Generic[T]):
+    """Aho-Corasick automaton matching many keywords in a single pass
+
+    Built once from (keyword, value) pairs, e.g. one pair per rule keyword.
+    Scanning is linear in the text length plus the number of hits, no matter
+    how many keywords are registered, instead of one substring scan per
+    keyword. Matching is plain substring matching on lowercased text, the same
+    semantics as `keyword in text.lower()`.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, T]]):
+        # Trie nodes: goto transitions, failure links and outputs per node
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        # Keyword table; values are the owners of each keyword
+        self._keywords: List[str] = []
+        self._values: List[List[T]] = []
+        keyword_index: Dict[str, int] = {}
+
+        for keyword, value in entries:
+            keyword = keyword.lower()
+            if not keyword:
+                continue
+            index = keyword_index.get(keyword)
+            if index is None:
+                index = keyword_index[keyword] = len(self._keywords)
+                self._keywords.append(keyword)
+                self._values.append([])
+                self._insert(keyword, index)
+            if value not in self._values[index]:
+                self._values[index].append(value)
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def _insert(self, keyword: str, index: int):
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append(index)
+
+    def _build_failure_links(self):
+        """Breadth-first pass linking each node to its longest proper suffix in the trie"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit the suffix's outputs so the scan never walks failure chains for output
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def _scan(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (end offset, keyword index) for every occurrence in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for position, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                yield position + 1, index
+
+    def search(self, text: str) -> List[KeywordHit]:
+        """All keyword occurrences in text, in order of their end offset
+
+        Offsets refer to `text.lower()`, which has the same length as text for
+        all but a handful of special-cased characters.
+        """
+        return [
+            (end - len(self._keywords[index]), end, self._keywords[index])
+            for end, index in self._scan(text)
+        ]
+
+    def match(self, text: str) -> Dict[T, List[KeywordHit]]:
+        """Values whose keywords occur in text, each with its hits, in order of first hit"""
+        matches: Dict[T, List[KeywordHit]] = {}
+        for end, index in self._scan(text):
+            keyword = self._keywords[index]
+            hit = (end - len(keyword), end, keyword)
+            for value in self._values[index]:
+                matches.setdefault(value, []).append(hit)
+        return matches
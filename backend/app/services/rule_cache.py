@@ -0,0 +1,109 @@
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.rule import Rule, RuleSetVersion
+from app.services.rule_set import RuleSetSnapshot, RuleSnapshot
+from app.core.config import settings
+from datetime import datetime
+from typing import Optional, Tuple
+import asyncio
+import time
+
+
+class ActiveRuleCache:
+    """In-process cache of active rules with write-through invalidation
+
+    Rules are loaded once and compiled into an immutable RuleSetSnapshot that
+    every request shares. The compiled snapshot is also written to
+    RULE_SET_SNAPSHOT_PATH; a worker whose cache is cold loads it from there
+    when its version matches the database, skipping the rules query entirely.
+    `RuleService` bumps the shared `rule_set_versions` counter in the same
+    transaction as every rule change and invalidates the local cache; other
+    workers notice the new version on their next check (at most every
+    RULE_CACHE_VERSION_CHECK_INTERVAL seconds), so request paths only read the
+    one-row version table, never the `rules` table.
+    """
+
+    def __init__(self, version_check_interval: Optional[float] = None):
+        self.version_check_interval = (
+            settings.RULE_CACHE_VERSION_CHECK_INTERVAL if version_check_interval is None else version_check_interval
+        )
+        self.snapshot_path = settings.RULE_SET_SNAPSHOT_PATH
+        self._rule_set: Optional[RuleSetSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> Optional[int]:
+        """Rule-set version of the cached rules (None before first load)"""
+        return self._rule_set.version if self._rule_set else None
+
+    async def get_active_rules(self, db: AsyncSession) -> Tuple[RuleSnapshot, ...]:
+        """Get active rules, reloading only when the rule-set version changed"""
+        return (await self.get_rule_set(db)).rules
+
+    async def get_rule_set(self, db: AsyncSession) -> RuleSetSnapshot:
+        """Get the compiled rule set, rebuilding only when the rule-set version changed"""
+        if self._is_fresh():
+            return self._rule_set
+
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            if self._is_fresh():
+                return self._rule_set
+
+            version = await self.read_version(db)
+            if self._rule_set is None or version != self._rule_set.version:
+                self._rule_set = await self._load_rule_set(db, version)
+            self._checked_at = time.monotonic()
+            return self._rule_set
+
+    async def _load_rule_set(self, db: AsyncSession, version: int) -> RuleSetSnapshot:
+        """Load the compiled rule set from disk if current, else build it from the database"""
+        # Version 0 means no change was ever recorded, so a file could predate the data
+        if version > 0 and self.snapshot_path:
+            rule_set = RuleSetSnapshot.load(self.snapshot_path)
+            if rule_set is not None and rule_set.version == version:
+                return rule_set
+
+        rules = (await db.execute(
+            select(Rule).where(Rule.is_active == True)
+        )).scalars().all()
+        rule_set = RuleSetSnapshot([RuleSnapshot.from_rule(r) for r in rules], version)
+
+        if self.snapshot_path:
+            try:
+                rule_set.save(self.snapshot_path)
+            except OSError as e:
+                print(f"⚠️ Failed to save rule set snapshot: {str(e)}")
+        return rule_set
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._rule_set is not None and
+            time.monotonic() - self._checked_at < self.version_check_interval
+        )
+
+    def invalidate(self):
+        """Drop the cached rules so the next request reloads them"""
+        self._rule_set = None
+
+    @staticmethod
+    async def read_version(db: AsyncSession) -> int:
+        """Current rule-set version (0 if no rule change was ever recorded)"""
+        version = (await db.execute(
+            select(RuleSetVersion.version).where(RuleSetVersion.id == 1)
+        )).scalar()
+        return version or 0
+
+    @staticmethod
+    async def bump_version(db: AsyncSession):
+        """Increment the shared rule-set version; call before committing a rule change"""
+        statement = insert(RuleSetVersion).values(id=1, version=1)
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[RuleSetVersion.id],
+            set_={"version": RuleSetVersion.version + 1, "updated_at": datetime.utcnow()}
+        ))
+
+
+active_rule_cache = ActiveRuleCache()
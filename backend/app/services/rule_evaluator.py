@@ -0,0 +1,192 @@
+from app.models.rule import RuleType
+from app.core.rule_params import compile_pattern
+from app.services.keyword_matcher import KeywordAutomaton
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import json
+
+if TYPE_CHECKING:
+    from app.services.rule_set import RuleSnapshot
+
+
+# Rule types checked once against the whole document rather than per chunk
+DOCUMENT_RULE_TYPES = {RuleType.REQUIRED_PHRASE, RuleType.LENGTH_LIMIT}
+
+
+class RuleEvaluator:
+    """Evaluates deterministic rules locally, without any LLM call
+
+    Compiled once per rule set: forbidden phrases share one keyword
+    automaton and regex patterns are precompiled, so a check costs a single
+    pass over the text per pattern. Semantic rules are ignored here and left
+    to the LLM reviewers.
+    """
+
+    def __init__(self, rules: Sequence["RuleSnapshot"]):
+        self.rules = tuple(r for r in rules if r.rule_type != RuleType.SEMANTIC)
+        self._rules_by_id = {str(r.rule_id): r for r in self.rules}
+
+        self._forbidden: KeywordAutomaton[str] = KeywordAutomaton(
+            (phrase, str(r.rule_id))
+            for r in self.rules if r.rule_type == RuleType.FORBIDDEN_PHRASE
+            for phrase in r.rule_params["phrases"]
+        )
+        self._regexes: Tuple[Tuple["RuleSnapshot", Pattern], ...] = tuple(
+            (r, compile_pattern(r.rule_params["pattern"], r.rule_params.get("ignore_case", True)))
+            for r in self.rules if r.rule_type == RuleType.REGEX
+        )
+        self._required = tuple(r for r in self.rules if r.rule_type == RuleType.REQUIRED_PHRASE)
+        self._length_limits: Tuple[Tuple["RuleSnapshot", Optional[Pattern]], ...] = tuple(
+            (r, compile_pattern(r.rule_params["target_pattern"]) if r.rule_params.get("target_pattern") else None)
+            for r in self.rules if r.rule_type == RuleType.LENGTH_LIMIT
+        )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def evaluate(self, text: str) -> List[Dict]:
+        """All deterministic violations for a standalone piece of content"""
+        return self.check_text(text) + self.check_document(text)
+
+    def check_text(self, text: str) -> List[Dict]:
+        """Violations that can be found in any part of the text (forbidden phrases, regex)
+
+        Safe to run per chunk: a hit in any chunk is a hit in the document.
+        """
+        violations = []
+
+        for rule_id, hits in self._forbidden.match(text).items():
+            phrases = sorted({keyword for _, _, keyword in hits})
+            violations.append(self._violation(
+                self._rules_by_id[rule_id],
+                f"Forbidden phrase found: {', '.join(repr(p) for p in phrases)}",
+                [{"keyword": keyword, "start": start, "end": end} for start, end, keyword in hits]
+            ))
+
+        for rule, pattern in self._regexes:
+            hits = [{"keyword": m.group(0), "start": m.start(), "end": m.end()} for m in pattern.finditer(text)]
+            if hits:
+                violations.append(self._violation(rule, f"Prohibited pattern matched {len(hits)} time(s)", hits))
+
+        return violations
+
+    def check_document(self, text: str) -> List[Dict]:
+        """Violations that need the whole document (required phrases, length limits)"""
+        checker = self.document_checker()
+        checker.feed(text)
+        return checker.finish()
+
+    def document_checker(self) -> "DocumentRuleChecker":
+        """Document-level rule check for a document read piece by piece (e.g. page by page)"""
+        return DocumentRuleChecker(self)
+
+    @property
+    def document_rules_key(self) -> str:
+        """Hash of the document-level rules, for caching their results per document"""
+        rules = [
+            [str(r.rule_id), r.rule_text, r.category.value, r.severity.value, r.rule_params]
+            for r in self._required + tuple(r for r, _ in self._length_limits)
+        ]
+        return hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _length_violation(rule: "RuleSnapshot", length: int) -> Optional[Dict]:
+        max_chars = rule.rule_params.get("max_chars")
+        min_chars = rule.rule_params.get("min_chars")
+        if max_chars is not None and length > max_chars:
+            return RuleEvaluator._violation(rule, f"Text is {length} characters (maximum {max_chars})")
+        if min_chars is not None and length < min_chars:
+            return RuleEvaluator._violation(rule, f"Text is {length} characters (minimum {min_chars})")
+        return None
+
+    @staticmethod
+    def _violation(rule: "RuleSnapshot", explanation: str, matches: Optional[List[Dict]] = None) -> Dict:
+        violation = {
+            "rule_id": str(rule.rule_id),
+            "rule_text": rule.rule_text,
+            "category": rule.category.value,
+            "severity": rule.severity.value,
+            "status": "violated",
+            "explanation": explanation
+        }
+        if matches is not None:
+            violation["matches"] = matches
+        return violation
+
+
+class DocumentRuleChecker:
+    """Required phrases and length limits over a document fed in pieces
+
+    Only what the rules need is kept between pieces: the phrases found so
+    far, a tail of the previous piece as long as the longest phrase (so a
+    phrase split across pieces is still found), the stripped length of the
+    text and the lengths of target-pattern matches. Target patterns are
+    matched within each piece, so a match cannot span two pieces (PDF
+    pages). Fed a single piece, the result equals a check of that text.
+    """
+
+    def __init__(self, evaluator: RuleEvaluator):
+        self._evaluator = evaluator
+        self._phrases = {p.lower() for r in evaluator._required for p in r.rule_params["phrases"]}
+        self._found: set = set()
+        self._tail = ""
+        self._tail_chars = max((len(p) for p in self._phrases), default=1) - 1
+
+        # Length of the stripped text so far, and whitespace after its last non-space character
+        self._started = False
+        self._length = 0
+        self._trailing = 0
+        self._segment_lengths: Dict[str, List[int]] = {
+            str(rule.rule_id): [] for rule, target in evaluator._length_limits if target
+        }
+
+    def feed(self, text: str):
+        """Add the next piece of the document"""
+        if not text:
+            return
+
+        if self._phrases:
+            window = self._tail + text.lower()
+            self._found.update(p for p in self._phrases if p not in self._found and p in window)
+            self._tail = window[-self._tail_chars:] if self._tail_chars else ""
+
+        core = text.rstrip()
+        if not self._started:
+            core = core.lstrip()
+            if core:
+                self._started = True
+                self._length = len(core)
+                self._trailing = len(text) - len(text.rstrip())
+        elif core:
+            self._length += self._trailing + len(core)
+            self._trailing = len(text) - len(core)
+        else:
+            self._trailing += len(text)
+
+        for rule, target in self._evaluator._length_limits:
+            if target:
+                self._segment_lengths[str(rule.rule_id)].extend(
+                    len((m.group(1) or "").strip()) for m in target.finditer(text)
+                )
+
+    def finish(self) -> List[Dict]:
+        """Violations of the document fed so far"""
+        violations = []
+
+        for rule in self._evaluator._required:
+            phrases = rule.rule_params["phrases"]
+            missing = [p for p in phrases if p.lower() not in self._found]
+            satisfied = len(missing) < len(phrases) if rule.rule_params.get("match") == "any" else not missing
+            if not satisfied:
+                violations.append(RuleEvaluator._violation(
+                    rule, f"Required phrase missing: {', '.join(repr(p) for p in missing)}"
+                ))
+
+        for rule, target in self._evaluator._length_limits:
+            lengths = self._segment_lengths[str(rule.rule_id)] if target else [self._length]
+            for length in lengths:
+                violation = RuleEvaluator._length_violation(rule, length)
+                if violation is not None:
+                    violations.append(violation)
+
+        return violations
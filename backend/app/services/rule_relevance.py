@@ -0,0 +1,196 @@
+from app.models.rule import RuleSeverity
+from app.providers.embedding_provider import EmbeddingProvider
+from app.providers.vector_provider import VectorProvider
+from app.services.rule_set import RuleSetSnapshot, RuleSnapshot
+from app.core.config import settings
+from operator import mul
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import math
+
+
+# Prompt overhead per rule line ("- [SEVERITY] " and the newline)
+RULE_LINE_OVERHEAD_TOKENS = 6
+
+
+def _normalize(vector: Sequence[float]) -> Tuple[float, ...]:
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return tuple(v / norm for v in vector)
+
+
+class _RuleIndex:
+    """Per rule-set data reused by every ranking: token costs and normalized rule vectors"""
+
+    def __init__(self, rules: Tuple[RuleSnapshot, ...], token_costs: Dict[str, int]):
+        self.rules = rules
+        self.token_costs = token_costs
+        self.vectors: Optional[Tuple[Tuple[float, ...], ...]] = None
+
+
+class RuleRelevanceRanker:
+    """Selects the rules worth sending with each chunk or prompt
+
+    Rules are ranked by embedding similarity to the text, either locally
+    against cached rule vectors or through a Pinecone query on the `rules`
+    namespace (RULE_RELEVANCE_SOURCE). HIGH-severity rules are mandatory and
+    always included; the rest are packed by relevance into
+    RULE_PROMPT_TOKEN_BUDGET. If ranking is disabled or fails, rules are packed
+    in rule-set order so prompts stay bounded either way.
+
+    Reviewers only need semantic rules (deterministic ones are checked
+    locally); the generator also gets deterministic rules as guidance.
+    """
+
+    SOURCES = ("local", "pinecone", "none")
+
+    def __init__(
+        self,
+        embedding_provider: EmbeddingProvider,
+        vector_provider: Optional[VectorProvider] = None,
+        tokenizer=None,
+        source: Optional[str] = None,
+        token_budget: Optional[int] = None,
+        top_k: Optional[int] = None
+    ):
+        self.embedding_provider = embedding_provider
+        self.vector_provider = vector_provider
+        self.tokenizer = tokenizer
+        self.source = (source or settings.RULE_RELEVANCE_SOURCE).lower()
+        if self.source not in self.SOURCES:
+            raise ValueError(f"Unknown rule relevance source: {self.source}")
+        if self.source == "pinecone" and vector_provider is None:
+            self.source = "local"
+        self.token_budget = settings.RULE_PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+        self.top_k = top_k or settings.RULE_RELEVANCE_TOP_K
+        # Rule-set indexes keyed by (embedding model, rule-set content hash); share
+        # the ranker (see provider_registry.get_rule_relevance) to reuse them across requests
+        self._indexes: Dict[Tuple[str, str], _RuleIndex] = {}
+        self._index_lock = asyncio.Lock()
+
+    async def select(
+        self,
+        rule_set: RuleSetSnapshot,
+        texts: List[str],
+        semantic_only: bool = True
+    ) -> List[Tuple[RuleSnapshot, ...]]:
+        """Relevant rules for each text, in input order
+
+        All texts are embedded in one batch request.
+        """
+        if not texts:
+            return []
+
+        index = await self._get_index(rule_set)
+        if not (rule_set.semantic_rules if semantic_only else index.rules):
+            return [() for _ in texts]
+
+        rankings: List[Optional[List[RuleSnapshot]]] = [None] * len(texts)
+        if self.source != "none":
+            try:
+                embeddings = await self.embedding_provider.create_embeddings(texts)
+                if self.source == "pinecone":
+                    rankings = await self._rank_with_pinecone(rule_set, embeddings)
+                else:
+                    rankings = await self._rank_locally(index, embeddings)
+            except Exception as e:
+                print(f"⚠️ Rule relevance ranking failed, packing rules in order: {str(e)}")
+
+        return [self._pack(index, ranking, semantic_only) for ranking in rankings]
+
+    async def _get_index(self, rule_set: RuleSetSnapshot) -> _RuleIndex:
+        key = (self.embedding_provider.embedding_model, rule_set.content_hash)
+        index = self._indexes.get(key)
+        if index is not None and (index.vectors is not None or self.source != "local"):
+            return index
+
+        async with self._index_lock:
+            index = self._indexes.get(key)
+            if index is None:
+                rules = rule_set.rules
+                index = _RuleIndex(rules, {str(r.rule_id): self._count_tokens(r.rule_text) for r in rules})
+
+            if self.source == "local" and index.vectors is None and index.rules:
+                try:
+                    # One batch request; the embedding cache makes rebuilds after a rule change cheap
+                    vectors = await self.embedding_provider.create_embeddings([r.rule_text for r in index.rules])
+                    index.vectors = tuple(_normalize(v) for v in vectors)
+                except Exception as e:
+                    print(f"⚠️ Failed to embed rules for relevance ranking: {str(e)}")
+
+            # Only the current rule set is worth keeping per embedding model
+            for stale in [k for k in self._indexes if k[0] == key[0] and k != key]:
+                del self._indexes[stale]
+            self._indexes[key] = index
+            return index
+
+    def _count_tokens(self, text: str) -> int:
+        if self.tokenizer is None:
+            return len(text) // 4 + RULE_LINE_OVERHEAD_TOKENS
+        return len(self.tokenizer.encode(text)) + RULE_LINE_OVERHEAD_TOKENS
+
+    async def _rank_locally(
+        self,
+        index: _RuleIndex,
+        embeddings: List[List[float]]
+    ) -> List[Optional[List[RuleSnapshot]]]:
+        if index.vectors is None:
+            return [None for _ in embeddings]
+
+        def rank_all():
+            rankings = []
+            for embedding in embeddings:
+                query = _normalize(embedding)
+                scores = [sum(map(mul, query, vector)) for vector in index.vectors]
+                order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+                rankings.append([index.rules[i] for i in order])
+            return rankings
+
+        # Pure-Python similarity over the whole rulebook; keep it off the event loop
+        return await asyncio.to_thread(rank_all)
+
+    async def _rank_with_pinecone(
+        self,
+        rule_set: RuleSetSnapshot,
+        embeddings: List[List[float]]
+    ) -> List[Optional[List[RuleSnapshot]]]:
+        results = await asyncio.gather(*[
+            self.vector_provider.query(
+                vector=embedding,
+                top_k=self.top_k,
+                filter={"is_active": True},
+                namespace="rules"
+            )
+            for embedding in embeddings
+        ])
+
+        rankings = []
+        for matches in results:
+            # Vectors of rules outside the current snapshot (stale versions) are skipped
+            ranked = [rule_set.get(match["id"]) for match in matches]
+            rankings.append([r for r in ranked if r is not None])
+        return rankings
+
+    def _pack(
+        self,
+        index: _RuleIndex,
+        ranking: Optional[List[RuleSnapshot]],
+        semantic_only: bool
+    ) -> Tuple[RuleSnapshot, ...]:
+        """Mandatory rules first, then ranked rules while they fit the token budget"""
+        mandatory = [
+            r for r in index.rules
+            if r.severity == RuleSeverity.HIGH and not (semantic_only and r.is_deterministic)
+        ]
+        selected = list(mandatory)
+        used = sum(index.token_costs[str(r.rule_id)] for r in mandatory)
+
+        for rule in (index.rules if ranking is None else ranking):
+            if rule.severity == RuleSeverity.HIGH or (semantic_only and rule.is_deterministic):
+                continue
+            cost = index.token_costs[str(rule.rule_id)]
+            if used + cost > self.token_budget:
+                continue
+            selected.append(rule)
+            used += cost
+
+        return tuple(selected)
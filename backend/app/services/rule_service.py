@@ -1,57 +1,87 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from app.models.rule import Rule, RuleCategory, RuleSeverity
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.rule import Rule, RuleCategory, RuleSeverity, RuleType
 from app.providers.llm_provider import LLMProvider
 from app.providers.vector_provider import VectorProvider
 from app.services.audit_service import AuditService
+from app.services.rule_cache import ActiveRuleCache, active_rule_cache
+from app.services.rule_set import RuleSnapshot
+from app.core.rule_params import validate_rule_params
+from app.services.document_processor import DocumentProcessor, DocumentSource
+from app.core.metrics import stage_timer
 from uuid import UUID
-from typing import List, Optional
-import PyPDF2
-import io
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import traceback
 
 
 class RuleService:
     """Service for rule management with versioning"""
     
+    # Document text sent to the LLM when extracting rules from a PDF
+    EXTRACTION_PROMPT_CHARS = 4000
+    
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
         llm_provider: LLMProvider,
-        vector_provider: VectorProvider
+        vector_provider: VectorProvider,
+        rule_cache: Optional[ActiveRuleCache] = None,
+        document_processor: Optional[DocumentProcessor] = None
     ):
         self.db = db
         self.llm_provider = llm_provider
         self.vector_provider = vector_provider
+        self.rule_cache = rule_cache or active_rule_cache
+        # Without a shared pool, run PDF parsing in the default thread pool
+        self.document_processor = document_processor or DocumentProcessor(max_workers=0)
     
     async def create_rule(
         self,
         rule_text: str,
         category: RuleCategory,
         severity: RuleSeverity,
-        created_by: UUID
+        created_by: UUID,
+        rule_type: RuleType = RuleType.SEMANTIC,
+        rule_params: Optional[Dict] = None
     ) -> Rule:
         """Create a new rule with version 1"""
         
+        rule = await self._insert_rule(rule_text, category, severity, created_by, rule_type, rule_params)
+        
+        # Create embedding and store in Pinecone
+        await self._store_rule_embeddings([rule])
+        
+        return rule
+    
+    async def _insert_rule(
+        self,
+        rule_text: str,
+        category: RuleCategory,
+        severity: RuleSeverity,
+        created_by: UUID,
+        rule_type: RuleType = RuleType.SEMANTIC,
+        rule_params: Optional[Dict] = None
+    ) -> Rule:
+        """Persist a version 1 rule and audit it (no embedding)"""
+        
         # Create rule
         rule = Rule(
             rule_text=rule_text,
             category=category,
             severity=severity,
+            rule_type=rule_type,
+            rule_params=validate_rule_params(rule_type, rule_params),
             version=1,
             is_active=True,
             created_by=created_by
         )
         
         self.db.add(rule)
-        self.db.commit()
-        self.db.refresh(rule)
-        
-        # Create embedding and store in Pinecone
-        await self._store_rule_embedding(rule)
+        await self._commit_rule_change()
+        await self.db.refresh(rule)
         
         # Audit log
-        AuditService.log_action(
+        await AuditService.log_action(
             self.db,
             action_type="rule_created",
             actor_id=created_by,
@@ -68,19 +98,29 @@ class RuleService:
         updated_by: UUID,
         rule_text: Optional[str] = None,
         category: Optional[RuleCategory] = None,
-        severity: Optional[RuleSeverity] = None
+        severity: Optional[RuleSeverity] = None,
+        rule_type: Optional[RuleType] = None,
+        rule_params: Optional[Dict] = None
     ) -> Rule:
         """Update a rule by creating a new version (immutable versioning)"""
         
         # Get current rule
-        current_rule = self.db.query(Rule).filter(Rule.rule_id == rule_id).first()
+        current_rule = await self.db.get(Rule, rule_id)
         if not current_rule:
             raise ValueError("Rule not found")
         
+        # Params carry over only while the rule type stays the same
+        new_type = rule_type or current_rule.rule_type or RuleType.SEMANTIC
+        if rule_params is None and new_type == current_rule.rule_type:
+            rule_params = current_rule.rule_params
+        rule_params = validate_rule_params(new_type, rule_params)
+        
         # Get max version for this rule text pattern
-        max_version = self.db.query(Rule).filter(
-            Rule.rule_text == (rule_text or current_rule.rule_text)
-        ).order_by(desc(Rule.version)).first()
+        max_version = (await self.db.execute(
+            select(Rule).where(
+                Rule.rule_text == (rule_text or current_rule.rule_text)
+            ).order_by(desc(Rule.version)).limit(1)
+        )).scalars().first()
         
         new_version = (max_version.version if max_version else 0) + 1
         
@@ -89,6 +129,8 @@ class RuleService:
             rule_text=rule_text or current_rule.rule_text,
             category=category or current_rule.category,
             severity=severity or current_rule.severity,
+            rule_type=new_type,
+            rule_params=rule_params,
             version=new_version,
             is_active=True,
             created_by=updated_by
@@ -98,14 +140,14 @@ class RuleService:
         current_rule.is_active = False
         
         self.db.add(new_rule)
-        self.db.commit()
-        self.db.refresh(new_rule)
+        await self._commit_rule_change()
+        await self.db.refresh(new_rule)
         
         # Update embedding in Pinecone
-        await self._store_rule_embedding(new_rule)
+        await self._store_rule_embeddings([new_rule])
         
         # Audit log
-        AuditService.log_action(
+        await AuditService.log_action(
             self.db,
             action_type="rule_updated",
             actor_id=updated_by,
@@ -117,16 +159,16 @@ class RuleService:
         
         return new_rule
     
-    def activate_rule(self, rule_id: UUID, actor_id: UUID) -> Rule:
+    async def activate_rule(self, rule_id: UUID, actor_id: UUID) -> Rule:
         """Activate a rule"""
-        rule = self.db.query(Rule).filter(Rule.rule_id == rule_id).first()
+        rule = await self.db.get(Rule, rule_id)
         if not rule:
             raise ValueError("Rule not found")
         
         rule.is_active = True
-        self.db.commit()
+        await self._commit_rule_change()
         
-        AuditService.log_action(
+        await AuditService.log_action(
             self.db,
             action_type="rule_activated",
             actor_id=actor_id,
@@ -136,16 +178,16 @@ class RuleService:
         
         return rule
     
-    def deactivate_rule(self, rule_id: UUID, actor_id: UUID) -> Rule:
+    async def deactivate_rule(self, rule_id: UUID, actor_id: UUID) -> Rule:
         """Deactivate a rule"""
-        rule = self.db.query(Rule).filter(Rule.rule_id == rule_id).first()
+        rule = await self.db.get(Rule, rule_id)
         if not rule:
             raise ValueError("Rule not found")
         
         rule.is_active = False
-        self.db.commit()
+        await self._commit_rule_change()
         
-        AuditService.log_action(
+        await AuditService.log_action(
             self.db,
             action_type="rule_deactivated",
             actor_id=actor_id,
@@ -155,23 +197,101 @@ class RuleService:
         
         return rule
     
-    def get_active_rules(self) -> List[Rule]:
-        """Get all active rules"""
-        return self.db.query(Rule).filter(Rule.is_active == True).all()
+    async def get_active_rules(self) -> Tuple[RuleSnapshot, ...]:
+        """Get all active rules (immutable cached snapshots)"""
+        return await self.rule_cache.get_active_rules(self.db)
     
-    def get_all_rules(self) -> List[Rule]:
+    async def get_all_rules(self) -> List[Rule]:
         """Get all rules including inactive versions"""
-        return self.db.query(Rule).order_by(desc(Rule.created_at)).all()
+        return (await self.db.execute(
+            select(Rule).order_by(desc(Rule.created_at))
+        )).scalars().all()
+    
+    async def _commit_rule_change(self):
+        """Commit a rule change together with a rule-set version bump
+        
+        The version bump lets other workers notice the change; the local
+        cache is invalidated right away.
+        """
+        await ActiveRuleCache.bump_version(self.db)
+        await self.db.commit()
+        self.rule_cache.invalidate()
     
     async def extract_rules_from_pdf(
         self,
-        pdf_content: bytes,
+        pdf_source: DocumentSource,
         created_by: UUID
     ) -> List[Rule]:
-        """Extract rules from uploaded PDF using LLM"""
+        """Extract rules from uploaded PDF (path of the spooled upload, or bytes) using LLM
+        
+        Runs `iter_rule_extraction` to completion and returns the created rules.
+        """
+        rules = []
+        async for event in self.iter_rule_extraction(pdf_source, created_by):
+            if event["type"] == "summary":
+                rules = event["rules"]
+        return rules
+    
+    async def iter_rule_extraction(
+        self,
+        pdf_source: DocumentSource,
+        created_by: UUID,
+        resume: Optional[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """Extract rules from a PDF using LLM, yielding progress events
+        
+        Events, in order:
+        - {"type": "extracted", "candidates": [...]} the rules proposed by the LLM
+        - {"type": "rule", "index": i, "rule_id": ...} as each candidate is stored
+        - {"type": "summary", "rules": [...]} last, once all rules are stored and indexed
         
-        # Extract text from PDF
-        pdf_text = self._extract_pdf_text(pdf_content)
+        `resume` continues an interrupted extraction from its events:
+        {"candidates": [...], "created": {index: rule_id}}. The LLM is not
+        called again and stored candidates are not inserted twice.
+        """
+        resume = resume or {}
+        try:
+            candidates = resume.get("candidates")
+            if candidates is None:
+                candidates = await self._extract_rule_candidates(pdf_source)
+            yield {"type": "extracted", "candidates": candidates}
+            
+            # Create rules (earlier runs' rules are loaded instead)
+            created = {int(index): UUID(str(rule_id)) for index, rule_id in (resume.get("created") or {}).items()}
+            rules_by_id = {}
+            if created:
+                result = await self.db.execute(select(Rule).where(Rule.rule_id.in_(list(created.values()))))
+                rules_by_id = {rule.rule_id: rule for rule in result.scalars()}
+            
+            created_rules = []
+            for index, item in enumerate(candidates):
+                rule = rules_by_id.get(created.get(index))
+                if rule is None:
+                    with stage_timer("extract_rules", "store_rule"):
+                        rule = await self._insert_rule(
+                            rule_text=item["rule_text"],
+                            category=RuleCategory[item["category"]],
+                            severity=RuleSeverity[item["severity"]],
+                            created_by=created_by
+                        )
+                    yield {"type": "rule", "index": index, "rule_id": str(rule.rule_id)}
+                created_rules.append(rule)
+            
+            # Embed and index all extracted rules in one batch
+            with stage_timer("extract_rules", "index_rules"):
+                await self._store_rule_embeddings(created_rules)
+            
+            yield {"type": "summary", "rules": created_rules}
+            
+        except Exception as e:
+            raise Exception(f"Failed to extract rules from PDF: {str(e)}")
+    
+    async def _extract_rule_candidates(self, pdf_source: DocumentSource) -> List[Dict]:
+        """Rules proposed by the LLM for a PDF, as {"rule_text", "category", "severity"}"""
+        
+        # Extract text from PDF; only the opening pages fit in the prompt, so parsing stops there
+        with stage_timer("extract_rules", "extract_text"):
+            pdf_text = await self._extract_pdf_text(pdf_source, max_chars=self.EXTRACTION_PROMPT_CHARS)
         
         # Use LLM to extract rules
         extraction_prompt = f"""Extract compliance rules from this regulatory document.
@@ -182,7 +302,7 @@ For each rule you find:
 3. Assign severity: LOW, MEDIUM, or HIGH
 
 Document:
-{pdf_text[:4000]}  
+{pdf_text}  
 
 Respond with JSON array:
 [
@@ -191,33 +311,19 @@ Respond with JSON array:
 ]
 """
         
-        try:
-            result = await self.llm_provider.generate_structured(
+        with stage_timer("extract_rules", "llm_extract"):
+            return await self.llm_provider.generate_structured(
                 prompt=extraction_prompt,
                 system_prompt="You are a compliance rule extraction system. Extract clear, actionable rules.",
             )
-            
-            # Create rules
-            created_rules = []
-            for item in result:
-                rule = await self.create_rule(
-                    rule_text=item["rule_text"],
-                    category=RuleCategory[item["category"]],
-                    severity=RuleSeverity[item["severity"]],
-                    created_by=created_by
-                )
-                created_rules.append(rule)
-            
-            return created_rules
-            
-        except Exception as e:
-            raise Exception(f"Failed to extract rules from PDF: {str(e)}")
     
-    async def _store_rule_embedding(self, rule: Rule):
-        """Store rule embedding in Pinecone"""
+    async def _store_rule_embeddings(self, rules: List[Rule]):
+        """Store rule embeddings in Pinecone (one batch embedding request)"""
+        if not rules:
+            return
         try:
-            # Create embedding
-            embedding = await self.llm_provider.create_embedding(rule.rule_text)
+            # Create embeddings
+            embeddings = await self.llm_provider.create_embeddings([r.rule_text for r in rules])
             
             # Store in Pinecone
             await self.vector_provider.upsert(
@@ -231,24 +337,16 @@ Respond with JSON array:
                         "version": rule.version,
                         "is_active": rule.is_active
                     }
-                }],
+                } for rule, embedding in zip(rules, embeddings)],
                 namespace="rules"
             )
         except Exception as e:
-            print(f"❌ Failed to store embedding for rule {rule.rule_id}: {str(e)}")
+            print(f"❌ Failed to store embeddings for rules {[str(r.rule_id) for r in rules]}: {str(e)}")
             traceback.print_exc()
     
-    @staticmethod
-    def _extract_pdf_text(pdf_content: bytes) -> str:
-        """Extract text from PDF bytes"""
+    async def _extract_pdf_text(self, pdf_source: DocumentSource, max_chars: Optional[int] = None) -> str:
+        """Extract text from a PDF (parsed in the document processing pool)"""
         try:
-            pdf_file = io.BytesIO(pdf_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return text
+            return await self.document_processor.extract_pdf_text(pdf_source, max_chars=max_chars)
         except Exception as e:
             raise Exception(f"Failed to extract PDF text: {str(e)}")
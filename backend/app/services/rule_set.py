@@ -0,0 +1,215 @@
+from app.models.rule import Rule, RuleCategory, RuleSeverity, RuleType
+from app.services.keyword_matcher import KeywordAutomaton
+from app.services.rule_evaluator import RuleEvaluator
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+import hashlib
+import json
+import os
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    """Immutable copy of an active rule, safe to share across requests"""
+    rule_id: UUID
+    rule_text: str
+    category: RuleCategory
+    severity: RuleSeverity
+    version: int
+    is_active: bool = True
+    rule_type: RuleType = RuleType.SEMANTIC
+    rule_params: Optional[Dict] = field(default=None, hash=False)
+
+    @classmethod
+    def from_rule(cls, rule: Rule) -> "RuleSnapshot":
+        return cls(
+            rule_id=rule.rule_id,
+            rule_text=rule.rule_text,
+            category=rule.category,
+            severity=rule.severity,
+            version=rule.version,
+            is_active=rule.is_active,
+            rule_type=rule.rule_type or RuleType.SEMANTIC,
+            rule_params=rule.rule_params
+        )
+
+    @property
+    def is_deterministic(self) -> bool:
+        """Whether the rule is checked by code instead of an LLM"""
+        return self.rule_type != RuleType.SEMANTIC
+
+    def to_dict(self) -> Dict:
+        return {
+            "rule_id": str(self.rule_id),
+            "rule_text": self.rule_text,
+            "category": self.category.value,
+            "severity": self.severity.value,
+            "version": self.version,
+            "is_active": self.is_active,
+            "rule_type": self.rule_type.value,
+            "rule_params": self.rule_params,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RuleSnapshot":
+        return cls(
+            rule_id=UUID(data["rule_id"]),
+            rule_text=data["rule_text"],
+            category=RuleCategory(data["category"]),
+            severity=RuleSeverity(data["severity"]),
+            version=data["version"],
+            is_active=data.get("is_active", True),
+            rule_type=RuleType(data.get("rule_type", RuleType.SEMANTIC.value)),
+            rule_params=data.get("rule_params")
+        )
+
+
+@dataclass(frozen=True)
+class KeywordMatcher:
+    """Precomputed keyword check for one rule"""
+    rule: RuleSnapshot
+    negative: bool  # Negative rules are violated when a keyword is present
+    keywords: Tuple[str, ...]
+
+
+def extract_keywords(rule_text: str) -> List[str]:
+    """Extract keywords from rule for matching (simplified)"""
+    # This is a basic implementation - can be enhanced with NLP
+    stop_words = {"must", "not", "never", "should", "be", "the", "a", "an", "is", "prohibited", "forbidden"}
+    words = rule_text.lower().split()
+    keywords = [w.strip(".,;:!?") for w in words if w not in stop_words and len(w) > 3]
+    return keywords[:5]  # Top 5 keywords
+
+
+def is_negative_rule(rule_text: str) -> bool:
+    """Whether the rule forbids something (must not / never / prohibited)"""
+    rule_lower = rule_text.lower()
+    return "must not" in rule_lower or "never" in rule_lower or "prohibited" in rule_lower
+
+
+class RuleSetSnapshot:
+    """Immutable, versioned compilation of the active rule set
+
+    Built once per rule change and shared by every consumer: keyword matchers,
+    the deterministic rule evaluator and the ID lookup table are computed here
+    instead of on each request. `content_hash` identifies the rule set's contents and can be
+    used as a cache key by other caches. Snapshots serialize to JSON so new
+    workers can start from disk without querying the rules table.
+    """
+
+    # Short prompt IDs are "R" plus the shortest unique rule_id hex prefix of at least this length
+    SHORT_ID_MIN_LENGTH = 6
+
+    def __init__(self, rules: Sequence[RuleSnapshot], version: int):
+        self.rules: Tuple[RuleSnapshot, ...] = tuple(rules)
+        self.version = version
+        self.content_hash = self._hash_rules(self.rules)
+        self.rules_by_id: Mapping[str, RuleSnapshot] = MappingProxyType(
+            {str(r.rule_id): r for r in self.rules}
+        )
+
+        # Stable short IDs used to reference rules in LLM prompts and answers
+        self.short_ids: Mapping[str, str] = MappingProxyType(self._assign_short_ids(self.rules))
+        self.rules_by_short_id: Mapping[str, RuleSnapshot] = MappingProxyType(
+            {self.short_ids[str(r.rule_id)]: r for r in self.rules}
+        )
+
+        # Deterministic rules are checked locally and kept out of the LLM reviewer prompts
+        self.semantic_rules: Tuple[RuleSnapshot, ...] = tuple(r for r in self.rules if not r.is_deterministic)
+        self.evaluator = RuleEvaluator(self.rules)
+
+        # Keyword heuristics for semantic rules
+        self.keyword_matchers: Tuple[KeywordMatcher, ...] = tuple(
+            KeywordMatcher(
+                rule=r,
+                negative=is_negative_rule(r.rule_text),
+                keywords=tuple(extract_keywords(r.rule_text))
+            )
+            for r in self.semantic_rules
+        )
+        # One automaton over every negative rule's keywords, valued by rule ID
+        self.keyword_automaton: KeywordAutomaton[str] = KeywordAutomaton(
+            (keyword, str(m.rule.rule_id))
+            for m in self.keyword_matchers if m.negative
+            for keyword in m.keywords
+        )
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def get(self, rule_id: str) -> Optional[RuleSnapshot]:
+        """Look up a rule by its ID string"""
+        return self.rules_by_id.get(rule_id)
+
+    def short_id(self, rule: RuleSnapshot) -> str:
+        """Prompt ID of a rule in this snapshot, e.g. R3F9A1C"""
+        return self.short_ids[str(rule.rule_id)]
+
+    def resolve(self, reference: str) -> Optional[RuleSnapshot]:
+        """Rule for a short ID (or full rule_id) returned by an LLM, or None"""
+        if not isinstance(reference, str):
+            return None
+        key = reference.strip().strip("[]").strip().upper()
+        return self.rules_by_short_id.get(key) or self.rules_by_id.get(reference.strip().lower())
+
+    def format_rules(self, rules: Sequence[RuleSnapshot]) -> str:
+        """Prompt block listing rules under their short IDs"""
+        return "\n".join([f"- [{self.short_id(r)}] {r.rule_text}" for r in rules])
+
+    @classmethod
+    def _assign_short_ids(cls, rules: Sequence[RuleSnapshot]) -> Dict[str, str]:
+        """Shortest unique rule_id hex prefix, so IDs only grow on an actual collision"""
+        hexes = [r.rule_id.hex.upper() for r in rules]
+        length = cls.SHORT_ID_MIN_LENGTH
+        while len({h[:length] for h in hexes}) < len(hexes):
+            length += 1
+        return {str(r.rule_id): f"R{h[:length]}" for r, h in zip(rules, hexes)}
+
+    @staticmethod
+    def _hash_rules(rules: Sequence[RuleSnapshot]) -> str:
+        """Order-independent hash of the rules' identity and content"""
+        digest = hashlib.sha256()
+        for rule in sorted(rules, key=lambda r: str(r.rule_id)):
+            digest.update(json.dumps(rule.to_dict(), sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "content_hash": self.content_hash,
+            "rules": [r.to_dict() for r in self.rules],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RuleSetSnapshot":
+        snapshot = cls([RuleSnapshot.from_dict(r) for r in data["rules"]], data["version"])
+        if snapshot.content_hash != data.get("content_hash"):
+            raise ValueError("Rule set snapshot content hash mismatch")
+        return snapshot
+
+    def save(self, path: str):
+        """Write the snapshot atomically so concurrent readers never see a partial file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RuleSetSnapshot"]:
+        """Load a snapshot from disk, or None if missing or unreadable"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable rule set snapshot {path}: {str(e)}")
+            return None
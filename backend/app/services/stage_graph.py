@@ -0,0 +1,128 @@
+from app.core.metrics import STAGE_DURATION
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import inspect
+import time
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """When a stage ran, in seconds since its graph was created"""
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class StageGraph:
+    """Pipeline stages wired by their dependencies, each started as soon as its inputs are ready
+
+    A stage is a function called with its dependencies' results as keyword
+    arguments (named after the stages) and may return an awaitable.
+    Independent stages run concurrently. Dependencies must be added before
+    the stages that use them, so the graph cannot have cycles. If a stage
+    fails, the stages still running are cancelled and the error is raised.
+
+    Start and end times are recorded per stage; `critical_path` walks back
+    from the last stage to finish through whichever dependency finished
+    last, which is the chain that determined the total latency. With a
+    `pipeline` name, stage durations are also recorded in the
+    compliance_stage_duration_seconds metric.
+    """
+
+    def __init__(self, pipeline: Optional[str] = None):
+        self.pipeline = pipeline
+        self._stages: Dict[str, Tuple[Optional[Callable], Tuple[str, ...]]] = {}
+        self._tasks: Dict[str, asyncio.Future] = {}
+        self._origin = time.perf_counter()
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, StageTiming] = {}
+
+    def add(self, name: str, fn: Callable, *deps: str):
+        """Add a stage that runs after `deps`"""
+        self._check_new(name, deps)
+        self._stages[name] = (fn, deps)
+
+    def complete(self, name: str, result: Any, started: float, *deps: str):
+        """Record a stage that ran outside the graph (e.g. while streaming), started at `now()`"""
+        self._check_new(name, deps)
+        self._stages[name] = (None, deps)
+        self.results[name] = result
+        self._record(name, StageTiming(started, self.now()))
+
+    def now(self) -> float:
+        """Seconds since the graph was created"""
+        return time.perf_counter() - self._origin
+
+    def _check_new(self, name: str, deps: Tuple[str, ...]):
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {', '.join(missing)}")
+
+    async def run(self, *targets: str) -> Dict[str, Any]:
+        """Run the target stages (default: all) and what they depend on; returns every result so far"""
+        tasks = [self._task(name) for name in (targets or tuple(self._stages))]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in self._tasks.values():
+                task.cancel()
+            raise
+        return self.results
+
+    def _task(self, name: str) -> asyncio.Future:
+        task = self._tasks.get(name)
+        if task is None:
+            fn, deps = self._stages[name]
+            if fn is None:
+                task = asyncio.get_running_loop().create_future()
+                task.set_result(self.results[name])
+            else:
+                task = asyncio.ensure_future(self._run_stage(name, fn, deps, [self._task(dep) for dep in deps]))
+            self._tasks[name] = task
+        return task
+
+    async def _run_stage(self, name: str, fn: Callable, deps: Tuple[str, ...], dep_tasks: List[asyncio.Future]):
+        await asyncio.gather(*dep_tasks)
+        start = self.now()
+        result = fn(**{dep: self.results[dep] for dep in deps})
+        if inspect.isawaitable(result):
+            result = await result
+        self._record(name, StageTiming(start, self.now()))
+        self.results[name] = result
+        return result
+
+    def _record(self, name: str, timing: StageTiming):
+        self.timings[name] = timing
+        if self.pipeline:
+            STAGE_DURATION.observe(timing.duration, pipeline=self.pipeline, stage=name)
+
+    def critical_path(self) -> List[str]:
+        """Stages that determined the total latency, in execution order"""
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda stage: self.timings[stage].end)
+        path = [name]
+        while True:
+            deps = [dep for dep in self._stages[name][1] if dep in self.timings]
+            if not deps:
+                break
+            name = max(deps, key=lambda dep: self.timings[dep].end)
+            path.append(name)
+        return path[::-1]
+
+    def summary(self) -> Dict:
+        """Per-stage timings in milliseconds plus the critical path, JSON-ready"""
+        return {
+            "total_ms": round(max((t.end for t in self.timings.values()), default=0.0) * 1000, 1),
+            "stages": {
+                name: {"start_ms": round(t.start * 1000, 1), "duration_ms": round(t.duration * 1000, 1)}
+                for name, t in sorted(self.timings.items(), key=lambda item: item[1].start)
+            },
+            "critical_path": self.critical_path(),
+        }
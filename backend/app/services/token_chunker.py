@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from bisect import bisect_right
+
+
+class TokenChunker:
+    """Token-based chunker with precomputed character offsets
+
+    The text is encoded once and token-to-character offsets are computed in a
+    single pass, so locating a chunk in the source text (and therefore its page)
+    is O(1) per chunk instead of re-decoding the whole prefix. Page numbers are
+    resolved with a binary search over the sorted page map.
+    """
+
+    def __init__(self, tokenizer, chunk_size: int = 512, overlap: int = 50):
+        if overlap >= chunk_size:
+            raise ValueError("Chunk overlap must be smaller than chunk size")
+        self.tokenizer = tokenizer
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+    def chunk(self, text: str, metadata: Dict) -> List[Dict]:
+        """Chunk text by tokens while preserving legal meaning
+
+        Returns:
+            List of dicts with 'text', 'tokens', 'page', 'section',
+            'start_token' and 'end_token' keys
+        """
+        tokens = self.tokenizer.encode(text)
+        if not tokens:
+            return []
+
+        # Character offset of every token start, computed once (linear)
+        _, char_offsets = self.tokenizer.decode_with_offsets(tokens)
+
+        # Extract page markers if PDF
+        page_map = metadata.get("page_map", {})
+        page_positions = sorted(page_map)
+        page_numbers = [page_map[pos] for pos in page_positions]
+
+        chunks = []
+        start = 0
+        while start < len(tokens):
+            end = min(start + self.chunk_size, len(tokens))
+            chunk_tokens = tokens[start:end]
+            chunk_text = self.tokenizer.decode(chunk_tokens)
+
+            # Determine page number for this chunk
+            page_num = None
+            if page_positions:
+                idx = bisect_right(page_positions, char_offsets[start]) - 1
+                if idx >= 0:
+                    page_num = page_numbers[idx]
+
+            chunks.append({
+                "text": chunk_text.strip(),
+                "tokens": len(chunk_tokens),
+                "page": page_num,
+                "section": self.extract_section_header(chunk_text),
+                "start_token": start,
+                "end_token": end
+            })
+
+            start = end - self.overlap if end < len(tokens) else end
+
+        return chunks
+
+    @staticmethod
+    def extract_section_header(text: str) -> Optional[str]:
+        """Extract section header from text chunk"""
+        lines = text.split('\n')
+        for line in lines[:3]:  # Check first 3 lines
+            line = line.strip()
+            if line and (line.isupper() or line.startswith('[PAGE')):
+                return line[:100]
+        return None
+
+
+class StreamingTokenChunker:
+    """Incremental TokenChunker fed one page of tokens at a time
+
+    Only the tokens of the chunk being filled (plus the overlap carried into
+    the next one) are buffered, so the chunker's own memory is bounded by
+    chunk and page size rather than document size, and no whole-document
+    token or offset arrays are built; the emitted chunks are the caller's.
+    Chunk boundaries are the same as TokenChunker.chunk over the concatenated
+    fed tokens, and a chunk's page is the page of its first token. Pages are
+    encoded separately, though, and BPE merges across a page boundary can
+    differ from encoding the whole text at once, so chunks may differ slightly
+    from TokenChunker.chunk over the joined text.
+    """
+
+    def __init__(self, tokenizer, chunk_size: int = 512, overlap: int = 50):
+        if overlap >= chunk_size:
+            raise ValueError("Chunk overlap must be smaller than chunk size")
+        self.tokenizer = tokenizer
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+        self._tokens: List[int] = []
+        self._pages: List[Tuple[int, Optional[int]]] = []  # (buffer index where a page starts, page number)
+        self._offset = 0  # Document token index of the first buffered token
+        self._fresh = 0  # Buffered tokens not yet covered by an emitted chunk
+
+    def feed(self, tokens: Sequence[int], page: Optional[int] = None) -> List[Dict]:
+        """Add the tokens of the next page; returns the chunks completed by it"""
+        if tokens:
+            self._pages.append((len(self._tokens), page))
+            self._tokens.extend(tokens)
+            self._fresh += len(tokens)
+
+        chunks = []
+        while len(self._tokens) >= self.chunk_size and self._fresh > 0:
+            chunks.append(self._emit(self.chunk_size))
+            self._advance(self.chunk_size - self.overlap)
+        return chunks
+
+    def finish(self) -> List[Dict]:
+        """Flush the last, partial chunk"""
+        if self._fresh <= 0:
+            return []
+        chunk = self._emit(len(self._tokens))
+        self._advance(len(self._tokens))
+        return [chunk]
+
+    def _emit(self, size: int) -> Dict:
+        chunk_tokens = self._tokens[:size]
+        chunk_text = self.tokenizer.decode(chunk_tokens)
+        self._fresh = len(self._tokens) - size
+        return {
+            "text": chunk_text.strip(),
+            "tokens": len(chunk_tokens),
+            "page": self._pages[0][1] if self._pages else None,
+            "section": TokenChunker.extract_section_header(chunk_text),
+            "start_token": self._offset,
+            "end_token": self._offset + size
+        }
+
+    def _advance(self, count: int):
+        """Drop the first `count` buffered tokens"""
+        del self._tokens[:count]
+        self._offset += count
+        pages = [(start - count, page) for start, page in self._pages]
+        # Keep the page containing the new first token and every page after it
+        while len(pages) > 1 and pages[1][0] <= 0:
+            pages.pop(0)
+        self._pages = pages if self._tokens else []
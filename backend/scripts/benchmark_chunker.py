@@ -0,0 +1,107 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tiktoken
+from app.services.token_chunker import TokenChunker
+
+WORDS = (
+    "insurance policy premium benefit exclusion claim coverage insurer nominee "
+    "regulation disclosure returns guaranteed rider maturity surrender IRDAI "
+    "the of and to in is for with on that as by this be"
+).split()
+
+
+def build_document(pages: int, words_per_page: int = 450, seed: int = 42) -> tuple:
+    """Build a synthetic PDF-like document with a page map, like _extract_pdf"""
+    rng = random.Random(seed)
+    parts = []
+    page_map = {}
+    length = 0
+    for page_num in range(1, pages + 1):
+        page_text = " ".join(rng.choice(WORDS) for _ in range(words_per_page))
+        part = f"\n[PAGE {page_num}]\n{page_text}"
+        page_map[length] = page_num
+        parts.append(part)
+        length += len(part)
+    return "".join(parts), {"format": "pdf", "page_map": page_map, "total_pages": pages}
+
+
+def legacy_chunk(tokenizer, text: str, metadata: dict, chunk_size: int = 512, overlap: int = 50) -> list:
+    """Previous quadratic implementation (prefix re-decode + page_map re-sort per chunk)"""
+    tokens = tokenizer.encode(text)
+    chunks = []
+    page_map = metadata.get("page_map", {})
+    start = 0
+    while start < len(tokens):
+        end = min(start + chunk_size, len(tokens))
+        chunk_tokens = tokens[start:end]
+        chunk_text = tokenizer.decode(chunk_tokens)
+        page_num = None
+        if page_map:
+            char_pos = len(tokenizer.decode(tokens[:start]))
+            for pos, page in sorted(page_map.items(), reverse=True):
+                if char_pos >= pos:
+                    page_num = page
+                    break
+        chunks.append({
+            "text": chunk_text.strip(),
+            "tokens": len(chunk_tokens),
+            "page": page_num,
+            "section": TokenChunker.extract_section_header(chunk_text),
+            "start_token": start,
+            "end_token": end
+        })
+        start = end - overlap if end < len(tokens) else end
+    return chunks
+
+
+def time_call(fn, *args) -> tuple:
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark token chunking scalability")
+    parser.add_argument("--sizes", default="125,250,500,1000", help="Comma-separated page counts")
+    parser.add_argument("--legacy-max-pages", type=int, default=250,
+                        help="Largest input to run the legacy chunker on (it is quadratic)")
+    args = parser.parse_args()
+
+    tokenizer = tiktoken.get_encoding("cl100k_base")
+    chunker = TokenChunker(tokenizer)
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    print(f"{'pages':>6} {'chunks':>7} {'offset-indexed (s)':>19} {'ms/page':>8} {'legacy (s)':>11}")
+    baseline = None
+    for pages in sizes:
+        text, metadata = build_document(pages)
+        elapsed, chunks = time_call(chunker.chunk, text, metadata)
+
+        legacy = "-"
+        if pages <= args.legacy_max_pages:
+            legacy_elapsed, legacy_chunks = time_call(legacy_chunk, tokenizer, text, metadata)
+            assert legacy_chunks == chunks, "Chunker output diverged from legacy implementation"
+            legacy = f"{legacy_elapsed:.3f}"
+
+        per_page = elapsed / pages * 1000
+        baseline = baseline or per_page
+        print(f"{pages:>6} {len(chunks):>7} {elapsed:>19.3f} {per_page:>8.3f} {legacy:>11}")
+
+    # Linear scaling: cost per page should stay roughly flat as input grows
+    ratio = per_page / baseline
+    print(f"\nPer-page cost at {sizes[-1]} pages is {ratio:.2f}x the cost at {sizes[0]} pages")
+    if ratio > 2.0:
+        print("⚠️ Chunking does not scale linearly")
+        sys.exit(1)
+    print("✅ Chunking scales linearly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import sys
+import os
+import time
+import random
+import argparse
+from uuid import UUID
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.rule import RuleCategory, RuleSeverity
+from app.services.rule_set import RuleSetSnapshot, RuleSnapshot
+
+VOCABULARY_SIZE = 20000
+
+
+def build_vocabulary(seed: int = 7) -> list:
+    """Pseudo-words so rule keywords are distinct, like a large real rule book"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(5, 10))))
+    return sorted(words)
+
+
+def build_rules(count: int, vocabulary: list, seed: int = 42) -> list:
+    """Half negative rules ("must not ..."), half positive ones"""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        words = " ".join(rng.choice(vocabulary) for _ in range(6))
+        text = f"Content must not mention {words}" if i % 2 == 0 else f"Content should include {words}"
+        rules.append(RuleSnapshot(
+            rule_id=UUID(int=i + 1),
+            rule_text=text,
+            category=RuleCategory.IRDAI,
+            severity=RuleSeverity.MEDIUM,
+            version=1
+        ))
+    return rules
+
+
+def build_content(vocabulary: list, words: int = 1500, seed: int = 99) -> str:
+    """Generated-content sized text drawing from the same vocabulary"""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+
+def legacy_violations(rule_set: RuleSetSnapshot, content: str) -> list:
+    """Previous implementation: one substring scan per keyword per negative rule"""
+    content_lower = content.lower()
+    return [
+        str(m.rule.rule_id)
+        for m in rule_set.keyword_matchers
+        if m.negative and any(kw in content_lower for kw in m.keywords)
+    ]
+
+
+def automaton_violations(rule_set: RuleSetSnapshot, content: str) -> list:
+    hits = rule_set.keyword_automaton.match(content)
+    return [
+        str(m.rule.rule_id)
+        for m in rule_set.keyword_matchers
+        if m.negative and str(m.rule.rule_id) in hits
+    ]
+
+
+def time_call(fn, *args, repeat: int = 5) -> tuple:
+    """Best-of-N wall time"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark deterministic keyword validation")
+    parser.add_argument("--rules", default="1000,10000", help="Comma-separated active rule counts")
+    parser.add_argument("--words", type=int, default=1500, help="Words in the scanned content")
+    args = parser.parse_args()
+
+    vocabulary = build_vocabulary()
+    content = build_content(vocabulary, args.words)
+
+    print(f"{'rules':>6} {'keywords':>9} {'build (s)':>10} {'automaton (ms)':>15} {'legacy (ms)':>12} {'violations':>11}")
+    for count in [int(c) for c in args.rules.split(",")]:
+        build_elapsed, rule_set = time_call(RuleSetSnapshot, build_rules(count, vocabulary), 1, repeat=1)
+        elapsed, violations = time_call(automaton_violations, rule_set, content)
+        legacy_elapsed, legacy = time_call(legacy_violations, rule_set, content)
+        assert violations == legacy, "Automaton output diverged from legacy implementation"
+
+        print(
+            f"{count:>6} {len(rule_set.keyword_automaton):>9} {build_elapsed:>10.3f} "
+            f"{elapsed * 1000:>15.2f} {legacy_elapsed * 1000:>12.2f} {len(violations):>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.database import SessionLocal
 from app.models import Rule
-from app.providers.gemini_provider import GeminiProvider
-from app.providers.pinecone_provider import PineconeProvider
+from app.providers.registry import provider_registry
+from app.core.config import settings
 
 async def sync_embeddings():
     """Sync all rule embeddings from DB to Pinecone"""
@@ -28,17 +28,17 @@ async def sync_embeddings():
 
         # Initialize providers
         print("🔌 Initializing providers...")
-        llm_provider = GeminiProvider()
-        vector_provider = PineconeProvider()
+        # Embeddings go through the shared embedding cache, so unchanged rules are not re-embedded
+        embedding_provider = provider_registry.get_embedding()
+        vector_provider = provider_registry.get_vector()
         
-        print(f"🤖 Using Embedding Model: {llm_provider.embedding_model}")
+        print(f"🤖 Using Embedding Model: {embedding_provider.embedding_model}")
         print(f"🌲 Using Pinecone Index: {vector_provider.index_name}")
         
-        vectors = []
         failed_count = 0
         
-        # Process in batches of 10 to avoid hitting rate limits too hard
-        batch_size = 10
+        # One batch embedding request and one upsert per batch
+        batch_size = settings.EMBEDDING_BATCH_SIZE
         total_batches = (len(rules) + batch_size - 1) // batch_size
         
         for i in range(0, len(rules), batch_size):
@@ -46,49 +46,50 @@ async def sync_embeddings():
             current_batch_num = (i // batch_size) + 1
             print(f"📦 Processing batch {current_batch_num}/{total_batches} ({len(batch)} rules)...")
             
-            for rule in batch:
-                try:
-                    # Create embedding
-                    print(f"   Generating embedding for rule {rule.rule_id}...")
-                    embedding = await llm_provider.create_embedding(rule.rule_text)
-                    
-                    vector = {
-                        "id": str(rule.rule_id),
-                        "values": embedding,
-                        "metadata": {
-                            "rule_text": rule.rule_text,
-                            "category": rule.category.value,
-                            "severity": rule.severity.value,
-                            "version": rule.version,
-                            "is_active": rule.is_active
-                        }
+            try:
+                # Create embeddings
+                embeddings = await embedding_provider.create_embeddings([rule.rule_text for rule in batch])
+                print(f"   ✅ Generated {len(embeddings)} embeddings (dim: {len(embeddings[0])})")
+            except Exception as e:
+                print(f"   ❌ Failed to generate embeddings for batch {current_batch_num}: {str(e)}")
+                failed_count += len(batch)
+                continue
+            
+            vectors = [
+                {
+                    "id": str(rule.rule_id),
+                    "values": embedding,
+                    "metadata": {
+                        "rule_text": rule.rule_text,
+                        "category": rule.category.value,
+                        "severity": rule.severity.value,
+                        "version": rule.version,
+                        "is_active": rule.is_active
                     }
-                    vectors.append(vector)
-                    print(f"   ✅ Generated embedding (dim: {len(embedding)})")
-                    
-                except Exception as e:
-                    print(f"   ❌ Failed to generate embedding for rule {rule.rule_id}: {str(e)}")
-                    failed_count += 1
+                }
+                for rule, embedding in zip(batch, embeddings)
+            ]
             
             # Upsert batch
-            if vectors:
-                try:
-                    print(f"   ⬆️  Upserting {len(vectors)} vectors to Pinecone...")
-                    await vector_provider.upsert(vectors, namespace="rules")
-                    vectors = [] # Clear buffer after upsert
-                except Exception as e:
-                    print(f"   ❌ Batch upsert failed: {str(e)}")
-                    traceback.print_exc()
+            try:
+                print(f"   ⬆️  Upserting {len(vectors)} vectors to Pinecone...")
+                await vector_provider.upsert(vectors, namespace="rules")
+            except Exception as e:
+                print(f"   ❌ Batch upsert failed: {str(e)}")
+                traceback.print_exc()
+                failed_count += len(batch)
 
         print("\n🏁 Sync completed")
         print(f"✅ Successfully synced: {len(rules) - failed_count}")
         print(f"❌ Failed: {failed_count}")
+        print(f"🗄️  Embedding cache: {provider_registry.cache_stats()['embeddings']}")
 
     except Exception as e:
         print(f"❌ Fatal error during sync: {str(e)}")
         traceback.print_exc()
     finally:
         db.close()
+        await provider_registry.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(sync_embeddings())
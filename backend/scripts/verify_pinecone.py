@@ -6,24 +6,19 @@ import sys
 # Add the parent directory to sys.path to resolve imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.providers.pinecone_provider import PineconeProvider
-from app.providers.gemini_provider import GeminiProvider
-from app.providers.groq_provider import GroqProvider
+from app.providers.registry import provider_registry
 from app.core.config import settings
 
 async def verify_pinecone():
     print("Initializing providers...")
     
     # Initialize embedding provider (needed to create query vector)
-    if settings.DEFAULT_LLM_PROVIDER == "gemini":
-        llm = GeminiProvider()
-    else:
-        llm = GroqProvider()
+    embedder = provider_registry.get_embedding()
         
-    print(f"Using LLM Provider: {settings.DEFAULT_LLM_PROVIDER}")
+    print(f"Using Embedding Provider: {settings.EMBEDDING_PROVIDER} ({embedder.embedding_model})")
     
     # Initialize Pinecone provider
-    pinecone = PineconeProvider()
+    pinecone = provider_registry.get_vector()
     
     # The rule text to verify
     rule_text = "Insurance marketing content must clearly state that all policy benefits are subject to specific exclusions, limitations, and terms and conditions. The disclosure must be written in plain, consumer-friendly language and must not be hidden or implied."
@@ -32,7 +27,7 @@ async def verify_pinecone():
     
     # 1. Generate embedding for the rule text
     print("Generating embedding...")
-    embedding = await llm.create_embedding(rule_text)
+    embedding = await embedder.create_embedding(rule_text)
     
     # 2. Query Pinecone
     print("Querying Pinecone...")
@@ -8,9 +8,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.database import SessionLocal, engine, Base
 from app.models import User, Rule
 from app.models.user import UserRole
-from app.models.rule import RuleCategory, RuleSeverity
-from app.providers.gemini_provider import GeminiProvider
-from app.providers.pinecone_provider import PineconeProvider
+from app.models.rule import RuleCategory, RuleSeverity, RuleSetVersion, RuleType
+from sqlalchemy.dialects.postgresql import insert
+from app.providers.registry import provider_registry
 import uuid
 
 
@@ -64,7 +64,9 @@ async def seed_database():
             {
                 "rule_text": "Insurance products must not use terms like 'guaranteed returns' or 'assured returns' without explicit regulatory approval.",
                 "category": RuleCategory.IRDAI,
-                "severity": RuleSeverity.HIGH
+                "severity": RuleSeverity.HIGH,
+                "rule_type": RuleType.FORBIDDEN_PHRASE,
+                "rule_params": {"phrases": ["guaranteed returns", "assured returns"]}
             },
             {
                 "rule_text": "All insurance policy terms must include clear disclosure of exclusions and limitations in plain language.",
@@ -94,6 +96,8 @@ async def seed_database():
                 rule_text=rule_data["rule_text"],
                 category=rule_data["category"],
                 severity=rule_data["severity"],
+                rule_type=rule_data.get("rule_type", RuleType.SEMANTIC),
+                rule_params=rule_data.get("rule_params"),
                 version=1,
                 is_active=True,
                 created_by=super_admin.user_id
@@ -101,21 +105,27 @@ async def seed_database():
             db.add(rule)
             created_rules.append(rule)
         
+        # Bump the rule-set version so cached rule-set snapshots are rebuilt
+        db.execute(insert(RuleSetVersion).values(id=1, version=1).on_conflict_do_update(
+            index_elements=[RuleSetVersion.id],
+            set_={"version": RuleSetVersion.version + 1}
+        ))
         db.commit()
         print(f"✅ Created {len(created_rules)} rules")
         
         # Create embeddings and store in Pinecone
         print("🔮 Creating rule embeddings for Pinecone...")
-        llm_provider = GeminiProvider()
-        vector_provider = PineconeProvider()
+        embedding_provider = provider_registry.get_embedding()
+        vector_provider = provider_registry.get_vector()
         
-        vectors = []
         for rule in created_rules:
             db.refresh(rule)  # Ensure we have the rule_id
-            
-            # Create embedding
-            embedding = await llm_provider.create_embedding(rule.rule_text)
-            
+        
+        # Create all embeddings in one batch request
+        embeddings = await embedding_provider.create_embeddings([rule.rule_text for rule in created_rules])
+        
+        vectors = []
+        for rule, embedding in zip(created_rules, embeddings):
             vectors.append({
                 "id": str(rule.rule_id),
                 "values": embedding,
@@ -140,6 +150,7 @@ async def seed_database():
         raise
     finally:
         db.close()
+        await provider_registry.shutdown()
 
 
 if __name__ == "__main__":